@@ -13,6 +13,36 @@ const nextConfig = {
   eslint: {
     ignoreDuringBuilds: true,
   },
+  // 静态快照（scripts/publish_snapshots.py）：文件名包含内容哈希，可以永久缓存；manifest每次重新验证（后面的规则覆盖前面的规则）
+  async headers() {
+    return [
+      {
+        source: '/snapshots/:path*.json',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=31536000, immutable' }],
+      },
+      // 预压缩文件：由页面显式请求，浏览器按Content-Encoding透明解压
+      {
+        source: '/snapshots/:path*.json.gz',
+        headers: [
+          { key: 'Cache-Control', value: 'public, max-age=31536000, immutable' },
+          { key: 'Content-Type', value: 'application/json; charset=utf-8' },
+          { key: 'Content-Encoding', value: 'gzip' },
+        ],
+      },
+      {
+        source: '/snapshots/:path*.json.br',
+        headers: [
+          { key: 'Cache-Control', value: 'public, max-age=31536000, immutable' },
+          { key: 'Content-Type', value: 'application/json; charset=utf-8' },
+          { key: 'Content-Encoding', value: 'br' },
+        ],
+      },
+      {
+        source: '/snapshots/manifest.json',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=0, must-revalidate' }],
+      },
+    ]
+  },
 }
 
 export default nextConfig; 
\ No newline at end of file
@@ -8,75 +8,94 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
 import os
+import sys
 
-def read_excel_file(file_path, year):
-    """读取单个Excel文件"""
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from industry_workbooks import WORKBOOK_DIR, discover_workbooks, load_workbooks
+from industry_cubes import build_cubes, report_cube_sizes, write_cube_files, upload_cubes
+
+
+# 816502工作簿前七列对应的记录字段
+RECORD_COLUMNS = ['industry', 'state', 'employee_category', 'entry_count', 'exit_count', 'net_change', 'final_count']
+COUNT_COLUMNS = RECORD_COLUMNS[3:]
+
+def _parse_float(value):
+    """与float()相同的转换，无法转换时返回None"""
     try:
-        print(f"Reading {year} data from: {file_path}")
-        
-        # 根据文件扩展名选择引擎
-        if file_path.endswith('.xls'):
-            df = pd.read_excel(file_path, engine='xlrd')
-        else:
-            df = pd.read_excel(file_path, engine='openpyxl')
-        
-        print(f"File {year} loaded successfully - Shape: {df.shape}")
-        print(f"Columns: {list(df.columns)}")
-        
-        return df, year
-    except Exception as e:
-        print(f"Error reading {year} file: {str(e)}")
-        return None, year
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def build_records(df, year, timestamp=None):
+    """
+    按列把一个工作簿转换为记录列表
 
-def process_excel_data():
-    """处理所有Excel文件"""
+    前七列只选取、重命名一次，数值列用pd.to_numeric整列转换，空行用掩码过滤，ID用向量化字符串操作生成。
+    结果与逐行处理相同：第一列为空的行跳过，数值列有无法转换的值时整行跳过，
+    缺失的文本字段为'ALL'，缺失的数值为0。
+
+    参数:
+        timestamp: created_at/updated_at，默认为调用时的时间（每次运行只取一次）
+    """
+    timestamp = timestamp or datetime.now().isoformat()
+    
+    # 选取并重命名前七列，不足七列时补空列；
+    # 和iterrows一样取df.values，全为数值列时的类型提升（例如整数变为浮点数）与逐行处理一致
+    values = df.values[:, :len(RECORD_COLUMNS)]
+    frame = pd.DataFrame(values, index=df.index, columns=RECORD_COLUMNS[:values.shape[1]])
+    frame = frame.reindex(columns=RECORD_COLUMNS)
+    
+    # 跳过空行或无效数据
+    industry = frame['industry'].astype(str).str.strip()
+    keep = frame['industry'].notna() & (industry != '')
     
-    # 文件路径
-    files = {
-        2019: "QX Net company data/数据可视化/2019-816502.xls",
-        2020: "QX Net company data/数据可视化/2020-816502.xlsx", 
-        2021: "QX Net company data/数据可视化/2021-816502.xlsx"
-    }
+    # 数值列整列转换；to_numeric无法转换的少数单元格再用float()确认（例如'nan'）
+    present = frame[COUNT_COLUMNS].notna()
+    counts = frame[COUNT_COLUMNS].apply(pd.to_numeric, errors='coerce').astype(float)
+    unparsed = present & counts.isna()
+    failed = pd.Series(False, index=frame.index)
+    for column in COUNT_COLUMNS:
+        cells = unparsed[column] & keep
+        if cells.any():
+            parsed = [_parse_float(value) for value in frame.loc[cells, column]]
+            failed[cells[cells].index[[value is None for value in parsed]]] = True
+            counts.loc[cells, column] = [float('nan') if value is None else value for value in parsed]
+    invalid = keep & failed
+    if invalid.any():
+        print(f"Skipped {int(invalid.sum())} rows in {year} with non-numeric counts: {list(frame.index[invalid])}")
+    keep &= ~invalid
+    
+    frame = frame[keep]
+    records = pd.DataFrame({
+        'id': f"industry_viz_{year}_" + pd.Series(frame.index.astype(str), index=frame.index).str.zfill(4),
+        'year': year,
+        'industry': industry[keep],
+    })
+    for column in ('state', 'employee_category'):
+        records[column] = frame[column].astype(str).str.strip().astype(object).where(frame[column].notna(), 'ALL')
+    for column in COUNT_COLUMNS:
+        records[column] = counts.loc[keep, column].astype(object).where(present.loc[keep, column], 0)
+    records['created_at'] = timestamp
+    records['updated_at'] = timestamp
+    
+    return records.to_dict('records')
+
+def process_excel_data(directory=WORKBOOK_DIR):
+    """处理目录中所有年份的Excel文件"""
     
+    # 每次运行只取一次时间戳
+    timestamp = datetime.now().isoformat()
     all_records = []
     
-    for year, file_path in files.items():
-        df, _ = read_excel_file(file_path, year)
+    # 未变化的工作簿从Parquet缓存读取，新增或修改的工作簿并行解析
+    for year, df in load_workbooks(directory).items():
+        print(f"\nProcessing {year} data...")
+        print(f"File {year} loaded successfully - Shape: {df.shape}")
+        print(f"Columns found: {list(df.columns)}")
+        print(f"First few rows:")
+        print(df.head())
         
-        if df is not None:
-            print(f"\nProcessing {year} data...")
-            print(f"Columns found: {list(df.columns)}")
-            print(f"First few rows:")
-            print(df.head())
-            
-            # 处理每一行数据
-            for index, row in df.iterrows():
-                # 跳过空行或无效数据
-                if pd.isna(row.iloc[0]) or str(row.iloc[0]).strip() == '':
-                    continue
-                
-                try:
-                    # 基于实际Excel结构调整字段映射
-                    # 这里需要根据实际Excel文件的列结构来调整
-                    record = {
-                        'id': f"industry_viz_{year}_{index:04d}",
-                        'year': year,
-                        'industry': str(row.iloc[0]).strip() if not pd.isna(row.iloc[0]) else 'Unknown',
-                        'state': str(row.iloc[1]).strip() if len(row) > 1 and not pd.isna(row.iloc[1]) else 'ALL',
-                        'employee_category': str(row.iloc[2]).strip() if len(row) > 2 and not pd.isna(row.iloc[2]) else 'ALL',
-                        'entry_count': float(row.iloc[3]) if len(row) > 3 and not pd.isna(row.iloc[3]) else 0,
-                        'exit_count': float(row.iloc[4]) if len(row) > 4 and not pd.isna(row.iloc[4]) else 0,
-                        'net_change': float(row.iloc[5]) if len(row) > 5 and not pd.isna(row.iloc[5]) else 0,
-                        'final_count': float(row.iloc[6]) if len(row) > 6 and not pd.isna(row.iloc[6]) else 0,
-                        'created_at': datetime.now().isoformat(),
-                        'updated_at': datetime.now().isoformat()
-                    }
-                    
-                    all_records.append(record)
-                    
-                except Exception as e:
-                    print(f"Error processing row {index} in {year}: {str(e)}")
-                    continue
+        all_records.extend(build_records(df, year, timestamp))
     
     return all_records
 
@@ -103,8 +122,12 @@ def save_to_csv(records):
     
     return csv_path
 
-def upload_to_firebase(records):
-    """上传到Firebase Firestore"""
+def upload_to_firebase(records, cubes=None):
+    """
+    上传到Firebase Firestore
+
+    指定cubes时同时写入预聚合的立方体文档（industry_visualization_cubes集合）
+    """
     
     if not records:
         print("No records to upload")
@@ -143,6 +166,9 @@ def upload_to_firebase(records):
             batch.commit()
             print(f"✅ Uploaded batch {batch_num + 1}/{total_batches} ({len(batch_data)} records)")
         
+        if cubes:
+            upload_cubes(db, cubes)
+        
         print("✅ Firebase upload completed successfully!")
         return True
         
@@ -213,11 +239,7 @@ if __name__ == "__main__":
     print("=== Industry Data Visualization Processing ===")
     
     # 检查Excel文件是否存在
-    files_exist = all([
-        os.path.exists("QX Net company data/数据可视化/2019-816502.xls"),
-        os.path.exists("QX Net company data/数据可视化/2020-816502.xlsx"),
-        os.path.exists("QX Net company data/数据可视化/2021-816502.xlsx")
-    ])
+    files_exist = os.path.isdir(WORKBOOK_DIR) and bool(discover_workbooks(WORKBOOK_DIR))
     
     if files_exist:
         print("✅ Excel files found, processing real data...")
@@ -232,8 +254,13 @@ if __name__ == "__main__":
         # 保存为CSV
         csv_path = save_to_csv(records)
         
+        # 预聚合立方体，页面读取少数几个小文档而不是逐行记录
+        cubes = build_cubes(records)
+        report_cube_sizes(cubes, records)
+        write_cube_files(cubes)
+        
         # 上传到Firebase
-        upload_success = upload_to_firebase(records)
+        upload_success = upload_to_firebase(records, cubes)
         
         if upload_success:
             print("\n🎉 Data processing completed successfully!")
@@ -1,138 +1,309 @@
 import pandas as pd
 import re
+import os
+import sys
 import json
+import hashlib
+import argparse
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from import_manifest import ImportManifest
+
+INPUT_FILE = 'QX Net company data/australian-industry-classification-csv.xlsx'
+OUTPUT_FILE = 'firebase_industry_data.json'
+
+# 增量上传清单：{集合}/{文档ID} -> 内容哈希
+UPLOAD_MANIFEST = 'industry_data_upload_manifest.json'
+
+# JSON中的键 -> Firestore集合；使用专用集合，不与公司服务（services）和ANZSIC分类（industry_categories）混用
+UPLOAD_COLLECTIONS = {
+    'industry_categories': 'industry_taxonomy_categories',
+    'services': 'industry_taxonomy_services',
+}
+
+# ID中每一级的哈希长度（十六进制位数）；出现冲突时生成会报错，需要加长
+ID_HASH_LENGTH = 6
+
+TIMESTAMP_FIELDS = ('created_at', 'updated_at')
+
 def clean_text(text):
     if pd.isna(text):
         return ""
     return str(text).strip()
 
+def normalize_path(*parts):
+    """名称路径的规范形式：小写、合并多余空格；大小写或空格不同的名称视为同一个"""
+    return tuple(re.sub(r'\s+', ' ', part).strip().lower() for part in parts)
+
+def stable_hash(*parts, length=ID_HASH_LENGTH):
+    """
+    由名称路径得到稳定的短哈希
+
+    与Python内置的hash()不同，结果不随解释器进程变化；按normalize_path规范化后计算
+    """
+    normalized = '\x1f'.join(normalize_path(*parts))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:length]
+
 def generate_category_id(primary, secondary=None, tertiary=None):
+    """
+    生成分类ID，格式为 A{一级}.{二级}.{三级}
+
+    每一级是从一级分类到该级的完整名称路径的稳定哈希，
+    同名的二级、三级分类在不同父分类下得到不同的ID
+    """
     # 生成一级分类ID
     if not secondary and not tertiary:
-        # 使用字母+数字格式，如A01, A02等
-        return f"A{len(primary.split()) + 1:02d}"
-    
+        return f"A{stable_hash(primary)}"
+
     # 生成二级分类ID
     if not tertiary:
-        primary_id = generate_category_id(primary)
-        # 使用二级分类名称生成序号
-        return f"{primary_id}.{len(secondary.split()) + 1:02d}"
-    
+        return f"{generate_category_id(primary)}.{stable_hash(primary, secondary)}"
+
     # 生成三级分类ID
-    secondary_id = generate_category_id(primary, secondary)
-    return f"{secondary_id}.{len(tertiary.split()) + 1:02d}"
+    return f"{generate_category_id(primary, secondary)}.{stable_hash(primary, secondary, tertiary)}"
 
 def generate_service_id(category_id, service_name):
-    # 使用服务名称生成三位序号
-    service_num = abs(hash(service_name)) % 1000
-    return f"{category_id}.{service_num:03d}"
+    """服务ID为 {分类ID}.{分类ID和服务名称的稳定哈希}"""
+    return f"{category_id}.{stable_hash(category_id, service_name)}"
 
-# 读取Excel文件
-df = pd.read_excel('QX Net company data/australian-industry-classification-csv.xlsx')
+def _register_id(registry, doc_id, *parts):
+    """检查ID冲突：规范化后不同的名称路径得到相同的ID（真正的哈希冲突）时报错"""
+    key = normalize_path(*parts)
+    existing = registry.setdefault(doc_id, key)
+    if existing != key:
+        raise ValueError(f"ID冲突: {doc_id} 同时对应 {existing} 和 {key}，请加大ID_HASH_LENGTH")
 
-# 创建Firebase数据结构
-firebase_data = {
-    "industry_categories": {},
-    "services": {}
-}
+def build_industry_data(df):
+    """
+    生成Firebase数据结构（不含时间戳）
 
-# 处理行业分类数据
-categories = set()
-category_data = []
-
-for _, row in df.iterrows():
-    primary = clean_text(row['Primary Category'])
-    secondary = clean_text(row['Secondary Category'])
-    tertiary = clean_text(row['Tertiary Category'])
-    
-    # 生成一级分类
-    if primary and primary not in categories:
-        primary_id = generate_category_id(primary)
-        categories.add(primary)
-        category_data.append({
-            "id": primary_id,
-            "primary_category": primary,
-            "level": 1,
-            "parent_id": None,
-            "sort_order": 10,
-            "status": 1,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        })
-    
-    # 生成二级分类
-    if secondary and (primary, secondary) not in categories:
-        secondary_id = generate_category_id(primary, secondary)
-        categories.add((primary, secondary))
-        primary_id = generate_category_id(primary)
-        category_data.append({
-            "id": secondary_id,
-            "primary_category": primary,
-            "secondary_category": secondary,
-            "level": 2,
-            "parent_id": primary_id,
-            "sort_order": 20,
-            "status": 1,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        })
-    
-    # 生成三级分类
-    if tertiary and (primary, secondary, tertiary) not in categories:
-        tertiary_id = generate_category_id(primary, secondary, tertiary)
-        categories.add((primary, secondary, tertiary))
-        secondary_id = generate_category_id(primary, secondary)
-        category_data.append({
-            "id": tertiary_id,
-            "primary_category": primary,
-            "secondary_category": secondary,
-            "tertiary_category": tertiary,
-            "level": 3,
-            "parent_id": secondary_id,
-            "sort_order": 30,
-            "status": 1,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        })
-
-# 将分类数据添加到Firebase数据结构中
-for category in category_data:
-    firebase_data["industry_categories"][category["id"]] = category
-
-# 处理服务数据
-for _, row in df.iterrows():
-    primary = clean_text(row['Primary Category'])
-    secondary = clean_text(row['Secondary Category'])
-    tertiary = clean_text(row['Tertiary Category'])
-    service = clean_text(row['Services'])
-    description = clean_text(row['Service Description'])
-    
-    # 确定服务所属的分类ID
-    if tertiary:
-        category_id = generate_category_id(primary, secondary, tertiary)
-    elif secondary:
-        category_id = generate_category_id(primary, secondary)
-    else:
-        category_id = generate_category_id(primary)
-    
-    service_id = generate_service_id(category_id, service)
-    
-    # 添加服务数据
-    firebase_data["services"][service_id] = {
-        "id": service_id,
-        "category_id": category_id,
-        "service_name": service,
-        "service_description": description,
-        "sort_order": 0,
-        "status": 1,
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat()
+    返回:
+        {'industry_categories': {ID: 分类}, 'services': {ID: 服务}}，按Excel中首次出现的顺序排列
+    """
+    firebase_data = {
+        "industry_categories": {},
+        "services": {}
     }
+    registry = {}
+
+    # 处理行业分类数据
+    for _, row in df.iterrows():
+        primary = clean_text(row['Primary Category'])
+        secondary = clean_text(row['Secondary Category'])
+        tertiary = clean_text(row['Tertiary Category'])
+
+        # 生成一级分类
+        if primary:
+            primary_id = generate_category_id(primary)
+            _register_id(registry, primary_id, primary)
+            firebase_data["industry_categories"].setdefault(primary_id, {
+                "id": primary_id,
+                "primary_category": primary,
+                "level": 1,
+                "parent_id": None,
+                "sort_order": 10,
+                "status": 1
+            })
+
+        # 生成二级分类
+        if secondary:
+            secondary_id = generate_category_id(primary, secondary)
+            _register_id(registry, secondary_id, primary, secondary)
+            firebase_data["industry_categories"].setdefault(secondary_id, {
+                "id": secondary_id,
+                "primary_category": primary,
+                "secondary_category": secondary,
+                "level": 2,
+                "parent_id": generate_category_id(primary),
+                "sort_order": 20,
+                "status": 1
+            })
+
+        # 生成三级分类
+        if tertiary:
+            tertiary_id = generate_category_id(primary, secondary, tertiary)
+            _register_id(registry, tertiary_id, primary, secondary, tertiary)
+            firebase_data["industry_categories"].setdefault(tertiary_id, {
+                "id": tertiary_id,
+                "primary_category": primary,
+                "secondary_category": secondary,
+                "tertiary_category": tertiary,
+                "level": 3,
+                "parent_id": generate_category_id(primary, secondary),
+                "sort_order": 30,
+                "status": 1
+            })
+
+    # 处理服务数据
+    duplicates = 0
+    for _, row in df.iterrows():
+        primary = clean_text(row['Primary Category'])
+        secondary = clean_text(row['Secondary Category'])
+        tertiary = clean_text(row['Tertiary Category'])
+        service = clean_text(row['Services'])
+        description = clean_text(row['Service Description'])
+
+        # 确定服务所属的分类ID
+        if tertiary:
+            category_id = generate_category_id(primary, secondary, tertiary)
+        elif secondary:
+            category_id = generate_category_id(primary, secondary)
+        else:
+            category_id = generate_category_id(primary)
+
+        service_id = generate_service_id(category_id, service)
+        _register_id(registry, service_id, category_id, service)
+
+        # 同一分类下的同名服务（忽略大小写和多余空格）只保留一个，后出现的描述覆盖先出现的
+        if service_id in firebase_data["services"]:
+            duplicates += 1
+        firebase_data["services"][service_id] = {
+            "id": service_id,
+            "category_id": category_id,
+            "service_name": service,
+            "service_description": description,
+            "sort_order": 0,
+            "status": 1
+        }
+
+    if duplicates:
+        print(f"⚠️  {duplicates} 行是同一分类下的重复服务，已合并")
+
+    return firebase_data
+
+def load_previous_data(path=OUTPUT_FILE):
+    """读取上次生成的数据文件，不存在时返回空结构"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def apply_timestamps(firebase_data, previous_data, now=None):
+    """
+    添加created_at/updated_at
+
+    内容与上次生成时相同的文档沿用原来的时间戳，重新生成的文件逐字节相同；
+    内容变化的文档保留created_at、更新updated_at；新文档两者都是本次运行的时间（每次运行只取一次）
+    """
+    now = now or datetime.now().isoformat()
+    for collection, documents in firebase_data.items():
+        previous_documents = previous_data.get(collection, {})
+        for doc_id, document in documents.items():
+            previous = previous_documents.get(doc_id)
+            if previous is None:
+                document.update(created_at=now, updated_at=now)
+                continue
+            previous_content = {key: value for key, value in previous.items() if key not in TIMESTAMP_FIELDS}
+            unchanged = previous_content == document
+            document['created_at'] = previous.get('created_at', now)
+            document['updated_at'] = previous.get('updated_at', now) if unchanged else now
+    return firebase_data
+
+def reconcile_manifest(manifest, db, collections=UPLOAD_COLLECTIONS.values()):
+    """
+    用集合中实际存在的文档ID校正清单
+
+    清单中有、集合中已不存在的文档（例如集合被清空过）移出清单，本次会重新写入；
+    集合中有、清单中没有的文档（清单为空的第一次运行，或旧ID方案留下的文档）记为内容未知，
+    本次数据中有的会重写，没有的会删除。只读取文档ID，不读取内容。
+
+    返回:
+        (重新写入的文档数, 新纳入清单的文档数)
+    """
+    restored = adopted = 0
+    for collection in collections:
+        live_ids = {snapshot.id for snapshot in db.collection(collection).select([]).stream()}
+        prefix = f"{collection}/"
+        for path in [path for path in manifest.hashes if path.startswith(prefix)]:
+            if path[len(prefix):] not in live_ids:
+                del manifest.hashes[path]
+                restored += 1
+        for doc_id in live_ids:
+            path = f"{prefix}{doc_id}"
+            if path not in manifest.hashes:
+                manifest.hashes[path] = ''
+                adopted += 1
+    return restored, adopted
+
+def upload_changes(firebase_data, manifest_path=UPLOAD_MANIFEST, dry_run=False, delete_missing=True):
+    """
+    增量上传：只写入内容变化的分类和服务，删除数据中已不存在的文档
+
+    写入UPLOAD_COLLECTIONS中的专用集合；上传前先用集合中的文档ID校正清单（dry run不连接Firestore，只按清单统计）。
+    清单只在写入成功后更新，失败的文档下次运行会重新写入
+    """
+    manifest = ImportManifest(manifest_path)
+
+    db = None
+    if not dry_run:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate("firebase-admin-key.json"))
+        db = firestore.client()
+
+        restored, adopted = reconcile_manifest(manifest, db)
+        if restored or adopted:
+            print(f"清单校正: {restored} 个文档已不在集合中，{adopted} 个集合中的文档不在清单中")
+
+    changes = []
+    for key, documents in firebase_data.items():
+        collection = UPLOAD_COLLECTIONS[key]
+        for doc_id, document in documents.items():
+            if manifest.classify(f"{collection}/{doc_id}", document) != 'skip':
+                changes.append((collection, doc_id, document))
+    # 清单中其他集合的文档是旧版本写入的，同样删除
+    deletions = manifest.missing() if delete_missing else []
+    for path in deletions:
+        manifest.mark_deleted(path)
+
+    print(f"\n=== 增量上传 ({'dry run' if dry_run else 'Firestore'}) ===")
+    manifest.summary()
+    print(f"需要写入: {len(changes) + len(deletions)}")
+    if dry_run or (not changes and not deletions):
+        # 校正后的清单也需要保存
+        if not dry_run:
+            manifest.commit()
+        return manifest.counts
+
+    from firestore_batch_writer import BatchWriter
+
+    with BatchWriter(db) as writer:
+        for collection, doc_id, document in changes:
+            writer.set(db.collection(collection).document(doc_id), document)
+        for path in deletions:
+            collection, doc_id = path.split('/', 1)
+            writer.delete(db.collection(collection).document(doc_id))
+    writer.report()
+
+    # 只记录成功写入的文档
+    manifest.commit(failed_ids=[f"{doc_ref.parent.id}/{doc_ref.id}" for doc_ref in writer.failed_references])
+    return manifest.counts
+
+def main():
+    parser = argparse.ArgumentParser(description='生成行业分类和服务数据，并增量上传到Firestore')
+    parser.add_argument('--upload', action='store_true', help='把内容变化的分类和服务写入Firestore')
+    parser.add_argument('--dry-run', action='store_true', help='只按本地清单统计需要写入的文档，不连接Firestore')
+    parser.add_argument('--manifest', default=UPLOAD_MANIFEST, help=f'增量上传清单 (默认: {UPLOAD_MANIFEST})')
+    args = parser.parse_args()
+
+    # 读取Excel文件
+    df = pd.read_excel(INPUT_FILE)
+
+    # 创建Firebase数据结构
+    firebase_data = build_industry_data(df)
+    firebase_data = apply_timestamps(firebase_data, load_previous_data(OUTPUT_FILE))
+
+    # 将数据写入JSON文件
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(firebase_data, f, ensure_ascii=False, indent=2)
+
+    print(f"Firebase数据文件生成完成！分类: {len(firebase_data['industry_categories'])}，服务: {len(firebase_data['services'])}")
 
-# 将数据写入JSON文件
-with open('firebase_industry_data.json', 'w', encoding='utf-8') as f:
-    json.dump(firebase_data, f, ensure_ascii=False, indent=2)
+    if args.upload or args.dry_run:
+        upload_changes(firebase_data, args.manifest, dry_run=args.dry_run)
 
-print("Firebase数据文件生成完成！") 
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -4,57 +4,28 @@ import json
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from industry_workbooks import WORKBOOK_DIR, load_workbooks
+from industry_cubes import build_cubes, report_cube_sizes, write_cube_files, upload_cubes
+from process_excel_to_firebase import build_records
 
 def read_and_process_data():
     """读取Excel文件并处理数据"""
     
-    # 文件路径
-    files = {
-        2019: "QX Net company data/数据可视化/2019-816502.xls",
-        2020: "QX Net company data/数据可视化/2020-816502.xlsx", 
-        2021: "QX Net company data/数据可视化/2021-816502.xlsx"
-    }
-    
+    # 每次运行只取一次时间戳
+    timestamp = datetime.now().isoformat()
     all_records = []
     
-    for year, file_path in files.items():
-        try:
-            print(f"Processing {year} data...")
-            
-            # 读取Excel文件
-            if file_path.endswith('.xls'):
-                df = pd.read_excel(file_path, engine='xlrd')
-            else:
-                df = pd.read_excel(file_path, engine='openpyxl')
-            
-            print(f"File {year} - Shape: {df.shape}")
-            print(f"Columns: {list(df.columns)}")
-            
-            # 处理每一行数据
-            for index, row in df.iterrows():
-                # 跳过空行
-                if pd.isna(row.iloc[0]):
-                    continue
-                
-                # 根据实际数据结构调整字段映射
-                record = {
-                    'id': f"industry_viz_{year}_{index:04d}",
-                    'year': year,
-                    'industry': str(row.iloc[0]) if not pd.isna(row.iloc[0]) else '',
-                    'state': str(row.iloc[1]) if len(row) > 1 and not pd.isna(row.iloc[1]) else 'ALL',
-                    'employee_category': str(row.iloc[2]) if len(row) > 2 and not pd.isna(row.iloc[2]) else 'ALL',
-                    'entry_count': float(row.iloc[3]) if len(row) > 3 and not pd.isna(row.iloc[3]) else 0,
-                    'exit_count': float(row.iloc[4]) if len(row) > 4 and not pd.isna(row.iloc[4]) else 0,
-                    'net_change': float(row.iloc[5]) if len(row) > 5 and not pd.isna(row.iloc[5]) else 0,
-                    'final_count': float(row.iloc[6]) if len(row) > 6 and not pd.isna(row.iloc[6]) else 0,
-                    'created_at': datetime.now().isoformat(),
-                    'updated_at': datetime.now().isoformat()
-                }
-                
-                all_records.append(record)
-                
-        except Exception as e:
-            print(f"Error processing {year}: {str(e)}")
+    # 与process_excel_to_firebase.py共用工作簿加载器（Parquet缓存）和按列的记录转换
+    for year, df in load_workbooks(WORKBOOK_DIR).items():
+        print(f"Processing {year} data...")
+        print(f"File {year} - Shape: {df.shape}")
+        print(f"Columns: {list(df.columns)}")
+        
+        all_records.extend(build_records(df, year, timestamp))
     
     return all_records
 
@@ -75,8 +46,8 @@ def save_to_files(records):
     
     return csv_path, json_path
 
-def upload_to_firebase(records):
-    """上传到Firebase"""
+def upload_to_firebase(records, cubes=None):
+    """上传到Firebase；指定cubes时同时写入预聚合的立方体文档"""
     
     try:
         # 初始化Firebase
@@ -111,6 +82,9 @@ def upload_to_firebase(records):
             batch.commit()
             print(f"Uploaded batch {batch_num + 1}/{total_batches}")
         
+        if cubes:
+            upload_cubes(db, cubes)
+        
         print("✅ Firebase upload completed!")
         return True
         
@@ -144,7 +118,12 @@ if __name__ == "__main__":
         # 保存文件
         csv_path, json_path = save_to_files(records)
         
+        # 预聚合立方体
+        cubes = build_cubes(records)
+        report_cube_sizes(cubes, records)
+        write_cube_files(cubes)
+        
         # 上传到Firebase
-        upload_to_firebase(records)
+        upload_to_firebase(records, cubes)
     else:
         print("No records processed!")
\ No newline at end of file
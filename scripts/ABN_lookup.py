@@ -16,26 +16,97 @@ from datetime import datetime
 import time
 from pathlib import Path
 import os
+import sys
+import argparse
+from abn_cache import ABNResponseCache
+from abn_crawl_log import CrawlLog
+
+# 可选的更快JSON解析库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+JSONP_PREFIX = b'callback('
+JSONP_PATTERN = re.compile(r'callback\((.*)\)')
+
+def parse_jsonp(body) -> Dict:
+    """
+    解析ABR的JSONP响应 callback({...})
+
+    直接对响应字节去掉固定的callback(...)包装后解析，不做正则匹配和解码后的字符串复制；
+    安装了orjson时使用orjson。包装不符合预期时退回正则解析。
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    view = memoryview(body)
+    
+    # 去掉首尾空白和结尾可能的分号
+    start, end = 0, len(body)
+    while start < end and body[start] in b' \t\r\n':
+        start += 1
+    while end > start and body[end - 1] in b' \t\r\n;':
+        end -= 1
+    
+    if body.startswith(JSONP_PREFIX, start) and end > start and body[end - 1] == ord(')'):
+        payload = view[start + len(JSONP_PREFIX):end - 1]
+        return _json_loads(payload if orjson else bytes(payload))
+    
+    return json.loads(JSONP_PATTERN.search(body.decode('utf-8')).group(1))
+
+# 结果日志和检查点所在的子目录
+CRAWL_LOG_DIR = 'abn_crawl'
+
+# 默认搜索的行业关键词
+INDUSTRY_KEYWORDS = [
+    'Logistics',  # 物流
+    'Transport',  # 运输
+    'Warehouse',  # 仓储
+    'Import',     # 进口
+    'Export',     # 出口
+    'Freight',    # 货运
+    'Shipping',   # 航运
+    'Storage',    # 储存
+    'Distribution', # 配送
+    'Supply Chain' # 供应链
+]
 
 class ABNLookup:
-    def __init__(self, guid: str):
+    def __init__(self, guid: str, cache=None):
         self.guid = guid
         self.base_url = "https://abr.business.gov.au/json"
         self.session = requests.Session()
         self.results = []
         self.processed_abns = set()  # 用于跟踪已处理的ABN
+        self.cache = cache  # ABNResponseCache，跨运行复用已解析的响应
+        self.crawl_log = None  # CrawlLog，结果追加日志和断点
+        self.network_requests = 0  # 实际发出的HTTP请求数，缓存命中不计入
+        
+    def _from_cache(self, endpoint: str, key: str) -> Optional[Dict]:
+        """从本地缓存读取未过期的响应"""
+        return self.cache.get(endpoint, key) if self.cache else None
+
+    def _to_cache(self, endpoint: str, key: str, data: Dict):
+        """保存成功的响应到本地缓存"""
+        if self.cache and data:
+            self.cache.set(endpoint, key, data)
         
-    def _parse_jsonp(self, jsonp_str: str) -> Dict:
-        """解析JSONP响应为JSON对象"""
+    def _parse_jsonp(self, jsonp) -> Dict:
+        """解析JSONP响应（bytes或str）为JSON对象"""
         try:
-            json_str = re.search(r'callback\((.*)\)', jsonp_str).group(1)
-            return json.loads(json_str)
+            return parse_jsonp(jsonp)
         except Exception as e:
             logging.error(f"Error parsing JSONP response: {str(e)}")
             return None
 
     def search_by_name(self, name: str) -> Optional[List[Dict]]:
         """使用公司名称搜索"""
+        cached = self._from_cache("MatchingNames", name)
+        if cached is not None:
+            return cached.get('Names', [])
+        
         try:
             url = f"{self.base_url}/MatchingNames.aspx"
             params = {
@@ -43,14 +114,16 @@ class ABNLookup:
                 "guid": self.guid,
                 "maxResults": 100  # 获取最多结果
             }
+            self.network_requests += 1
             response = self.session.get(url, params=params)
             response.raise_for_status()
             
-            data = self._parse_jsonp(response.text)
+            data = self._parse_jsonp(response.content)
             if data and isinstance(data, dict) and "Message" in data and data["Message"]:
                 logging.error(f"API Error for name search '{name}': {data['Message']}")
                 return None
             
+            self._to_cache("MatchingNames", name, data)
             return data.get('Names', []) if data else None
         except Exception as e:
             logging.error(f"Error searching name '{name}': {str(e)}")
@@ -58,20 +131,26 @@ class ABNLookup:
 
     def get_abn_details(self, abn: str) -> Optional[Dict]:
         """获取ABN详细信息"""
+        cached = self._from_cache("AbnDetails", abn)
+        if cached is not None:
+            return cached
+        
         try:
             url = f"{self.base_url}/AbnDetails.aspx"
             params = {
                 "abn": abn,
                 "guid": self.guid
             }
+            self.network_requests += 1
             response = self.session.get(url, params=params)
             response.raise_for_status()
             
-            data = self._parse_jsonp(response.text)
+            data = self._parse_jsonp(response.content)
             if data and "Message" in data and data["Message"]:
                 logging.error(f"API Error for ABN {abn}: {data['Message']}")
                 return None
             
+            self._to_cache("AbnDetails", abn, data)
             return data
         except Exception as e:
             logging.error(f"Error getting ABN details for {abn}: {str(e)}")
@@ -81,20 +160,65 @@ class ABNLookup:
         """检查ABN是否已经处理过"""
         return abn in self.processed_abns
         
-    def search_by_industry(self, keywords: List[str], delay: float = 1.0, output_dir: str = None):
-        """按行业关键词搜索公司"""
+    def open_crawl_log(self, output_dir: str, resume: bool = False, fresh: bool = False):
+        """
+        在输出目录下打开结果日志
+
+        resume=True时载入之前运行保存的结果和已完成的关键词；
+        fresh=True时把之前的日志改名备份后重新开始。两者都未指定且已有日志时抛出FileExistsError
+        """
+        self.crawl_log = CrawlLog(Path(output_dir) / CRAWL_LOG_DIR, resume=resume, fresh=fresh)
+        self.results = list(self.crawl_log.results)
+        self.processed_abns.update(self.crawl_log.processed_abns)
+
+    def _is_keyword_completed(self, keyword: str) -> bool:
+        """关键词是否已在之前的运行中完成（--resume）"""
+        if self.crawl_log and self.crawl_log.is_completed(keyword):
+            logging.info(f"Skipping completed keyword: {keyword}")
+            return True
+        return False
+
+    def _save_result(self, abn: str, details: Dict):
+        """保存一个结果，并追加到结果日志"""
+        self.results.append(details)
+        self.processed_abns.add(abn)
+        if self.crawl_log:
+            self.crawl_log.append(details)
+
+    def _complete_keyword(self, keyword: str):
+        """关键词完成后更新检查点"""
+        if self.crawl_log:
+            self.crawl_log.complete_keyword(keyword)
+
+    def search_by_industry(self, keywords: List[str], delay: float = 1.0, output_dir: str = None,
+                           resume: bool = False, fresh: bool = False):
+        """
+        按行业关键词搜索公司
+
+        指定output_dir时，每个结果追加写入结果日志，每完成一个关键词更新检查点；
+        resume=True时从检查点继续，fresh=True时备份之前的日志后重新开始。Excel由调用方在最后通过save_to_excel一次生成。
+        """
         total_matches = 0
         total_unique = 0
         duplicates = 0
         inactive = 0
         
+        if output_dir and self.crawl_log is None:
+            self.open_crawl_log(output_dir, resume=resume, fresh=fresh)
+        
         for i, keyword in enumerate(keywords, 1):
+            if self._is_keyword_completed(keyword):
+                continue
+            
             logging.info(f"Searching for keyword: {keyword} ({i}/{len(keywords)})")
             
             # 搜索匹配的公司
             matches = self.search_by_name(keyword)
             if not matches:
                 logging.warning(f"No matches found for keyword: {keyword}")
+                # 搜索失败(None)时不标记完成，续传时会重新搜索
+                if matches is not None:
+                    self._complete_keyword(keyword)
                 continue
             
             total_matches += len(matches)
@@ -114,7 +238,12 @@ class ABNLookup:
                         logging.info(f"Processed {j}/{len(matches)} companies for '{keyword}' (Unique: {total_unique}, Duplicates: {duplicates}, Inactive: {inactive})")
                     continue
                 
+                requests_before = self.network_requests
                 details = self.get_abn_details(abn)
+                # 只在实际请求了API后等待，避免请求过快；缓存命中时不等待
+                if self.network_requests > requests_before:
+                    time.sleep(delay)
+                
                 if details:
                     # 只保存Active状态的公司
                     if details.get('AbnStatus') != 'Active':
@@ -124,26 +253,19 @@ class ABNLookup:
                     # 添加搜索关键词和时间戳
                     details['SearchKeyword'] = keyword
                     details['QueryTime'] = datetime.now().isoformat()
-                    self.results.append(details)
-                    self.processed_abns.add(abn)
+                    self._save_result(abn, details)
                     total_unique += 1
                 
                 # 显示进度
                 if j % 10 == 0:
                     logging.info(f"Processed {j}/{len(matches)} companies for '{keyword}' (Unique: {total_unique}, Duplicates: {duplicates}, Inactive: {inactive})")
-                
-                time.sleep(delay)  # 避免请求过快
             
             # 显示当前关键词的结果统计
             new_results = len(self.results) - initial_results_count
             logging.info(f"Added {new_results} new unique active results for keyword '{keyword}'")
             
-            # 每完成一个关键词就保存一次结果
-            if output_dir:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_file = f"{output_dir}/industry_search_{keyword.lower()}_{timestamp}.xlsx"
-                self.save_to_excel(output_file)
-                logging.info(f"Saved intermediate results after processing '{keyword}'")
+            # 结果已逐条追加到日志，这里只更新检查点
+            self._complete_keyword(keyword)
         
         # 显示最终统计信息
         logging.info(f"""
@@ -219,22 +341,17 @@ def main():
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
     
-    # 创建查询器
-    abn_lookup = ABNLookup("253136de-6266-47f6-a28d-b729867f4b1c")
+    parser = argparse.ArgumentParser(description='按行业关键词搜索ABN')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--resume', action='store_true', help='从上次中断的检查点继续')
+    group.add_argument('--fresh', action='store_true', help='备份之前的结果日志后重新开始')
+    args = parser.parse_args()
+    
+    # 创建查询器，已查询过的响应从本地缓存读取
+    abn_lookup = ABNLookup("253136de-6266-47f6-a28d-b729867f4b1c", cache=ABNResponseCache())
     
     # 定义要搜索的行业关键词
-    industry_keywords = [
-        'Logistics',  # 物流
-        'Transport',  # 运输
-        'Warehouse',  # 仓储
-        'Import',     # 进口
-        'Export',     # 出口
-        'Freight',    # 货运
-        'Shipping',   # 航运
-        'Storage',    # 储存
-        'Distribution', # 配送
-        'Supply Chain' # 供应链
-    ]
+    industry_keywords = INDUSTRY_KEYWORDS
     
     # 设置输出目录
     output_dir = "/Users/alex/Desktop/QX Net/Qixin-Company Profile"
@@ -243,21 +360,28 @@ def main():
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     try:
-        # 执行搜索，并传入输出目录用于定期保存
-        abn_lookup.search_by_industry(industry_keywords, output_dir=output_dir)
+        # 执行搜索，结果逐条追加到输出目录下的日志
+        abn_lookup.search_by_industry(industry_keywords, output_dir=output_dir, resume=args.resume, fresh=args.fresh)
         
-        # 最终保存
+        # 最终一次性生成Excel
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = f"{output_dir}/industry_search_FINAL_{timestamp}.xlsx"
         abn_lookup.save_to_excel(output_file)
         
         logging.info("Process completed successfully")
+        logging.info(abn_lookup.cache.summary())
+    except FileExistsError as e:
+        logging.error(str(e))
+        sys.exit(1)
     except KeyboardInterrupt:
         logging.info("\nProcess interrupted by user. Saving current results...")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = f"{output_dir}/industry_search_INTERRUPTED_{timestamp}.xlsx"
         abn_lookup.save_to_excel(output_file)
-        logging.info("Partial results saved successfully")
+        logging.info("Partial results saved successfully (run with --resume to continue)")
+    finally:
+        if abn_lookup.crawl_log:
+            abn_lookup.crawl_log.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Async ABN Lookup Client
+Concurrent, rate-limited version of ABNLookup.search_by_industry built on asyncio/aiohttp.
+
+Local testing against recorded responses:
+    python scripts/abn_stub_server.py --fixtures abn_fixtures --port 8765
+    python scripts/abn_async_client.py --base-url http://localhost:8765/json Logistics
+"""
+
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import aiohttp
+
+from ABN_lookup import ABNLookup, INDUSTRY_KEYWORDS
+from abn_cache import ABNResponseCache, DEFAULT_CACHE_PATH, DEFAULT_TTL
+
+DEFAULT_GUID = "253136de-6266-47f6-a28d-b729867f4b1c"
+DEFAULT_BASE_URL = "https://abr.business.gov.au/json"
+
+# ABR允许的请求速率（每秒请求数），可通过--qps调整
+DEFAULT_QPS = 5.0
+DEFAULT_CONCURRENCY = 8
+
+# 需要重试的HTTP状态码
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """令牌桶限速器：平均每秒rate个请求，最多允许capacity个突发请求"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取得一个令牌，令牌不足时等待"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RetryableResponse(Exception):
+    """服务器返回了可重试的HTTP状态码"""
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class AsyncABNLookup(ABNLookup):
+    """
+    ABNLookup的异步版本
+
+    - 所有请求经过令牌桶限速，同时进行的请求数不超过max_concurrency
+    - 连接错误、超时和429/5xx响应按指数退避（带抖动）重试
+    - 去重语义与ABNLookup相同：只有Active且已保存的ABN进入processed_abns；
+      同一个关键词中重复出现的ABN只请求一次
+    """
+
+    def __init__(self, guid: str, base_url: str = DEFAULT_BASE_URL, qps: float = DEFAULT_QPS,
+                 max_concurrency: int = DEFAULT_CONCURRENCY, max_retries: int = 4,
+                 backoff_base: float = 0.5, backoff_max: float = 10.0, timeout: float = 30.0,
+                 record_dir: str = None, cache: ABNResponseCache = None):
+        super().__init__(guid, cache=cache)
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = TokenBucket(qps)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.record_dir = Path(record_dir) if record_dir else None
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0}
+        self._http = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._http = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._http.close()
+        self._http = None
+        return False
+
+    def _record(self, endpoint: str, key: str, body: bytes):
+        """把原始响应保存为stub服务器可以回放的fixture"""
+        folder = self.record_dir / endpoint
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"{quote(key, safe='')}.jsonp").write_bytes(body)
+
+    async def _fetch(self, endpoint: str, params: Dict) -> bytes:
+        """限速、限并发地请求一个接口，可重试的错误按退避重试，返回响应字节"""
+        url = f"{self.base_url}/{endpoint}"
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    async with self._http.get(url, params=params) as response:
+                        if response.status in RETRYABLE_STATUS:
+                            raise RetryableResponse(response.status)
+                        response.raise_for_status()
+                        return await response.read()
+            except (RetryableResponse, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.5)
+                logging.warning(f"{endpoint} {e!r}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                self.stats['retries'] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def fetch_matching_names(self, name: str) -> Optional[List[Dict]]:
+        """使用公司名称搜索（search_by_name的异步版本）"""
+        cached = self._from_cache("MatchingNames", name)
+        if cached is not None:
+            return cached.get('Names', [])
+
+        try:
+            body = await self._fetch("MatchingNames.aspx", {
+                "name": name,
+                "guid": self.guid,
+                "maxResults": 100  # 获取最多结果
+            })
+            if self.record_dir:
+                self._record("MatchingNames", name, body)
+
+            data = self._parse_jsonp(body)
+            if data and isinstance(data, dict) and "Message" in data and data["Message"]:
+                logging.error(f"API Error for name search '{name}': {data['Message']}")
+                return None
+
+            self._to_cache("MatchingNames", name, data)
+            return data.get('Names', []) if data else None
+        except Exception as e:
+            self.stats['errors'] += 1
+            logging.error(f"Error searching name '{name}': {e!r}")
+            return None
+
+    async def fetch_abn_details(self, abn: str) -> Optional[Dict]:
+        """获取ABN详细信息（get_abn_details的异步版本）"""
+        cached = self._from_cache("AbnDetails", abn)
+        if cached is not None:
+            return cached
+
+        try:
+            body = await self._fetch("AbnDetails.aspx", {
+                "abn": abn,
+                "guid": self.guid
+            })
+            if self.record_dir:
+                self._record("AbnDetails", abn, body)
+
+            data = self._parse_jsonp(body)
+            if data and "Message" in data and data["Message"]:
+                logging.error(f"API Error for ABN {abn}: {data['Message']}")
+                return None
+
+            self._to_cache("AbnDetails", abn, data)
+            return data
+        except Exception as e:
+            self.stats['errors'] += 1
+            logging.error(f"Error getting ABN details for {abn}: {e!r}")
+            return None
+
+    async def search_keyword(self, keyword: str) -> Dict:
+        """
+        搜索一个关键词并并发获取匹配公司的详细信息
+
+        详细信息并发获取，但按匹配结果的顺序处理，去重结果与顺序执行时相同。
+
+        返回:
+            本关键词的统计 {'matches', 'added', 'duplicates', 'inactive'}，搜索失败时返回None
+        """
+        counts = {'matches': 0, 'added': 0, 'duplicates': 0, 'inactive': 0}
+
+        matches = await self.fetch_matching_names(keyword)
+        if not matches:
+            logging.warning(f"No matches found for keyword: {keyword}")
+            return None if matches is None else counts
+
+        counts['matches'] = len(matches)
+        logging.info(f"Found {len(matches)} matches for '{keyword}'")
+
+        # 每个尚未处理的ABN只请求一次
+        tasks = {}
+        for match in matches:
+            abn = match.get('Abn')
+            if abn and not self._is_duplicate(abn) and abn not in tasks:
+                tasks[abn] = asyncio.ensure_future(self.fetch_abn_details(abn))
+
+        for match in matches:
+            abn = match.get('Abn')
+            if not abn:
+                continue
+
+            # 检查是否已处理过这个ABN
+            if self._is_duplicate(abn):
+                counts['duplicates'] += 1
+                continue
+
+            details = await tasks[abn]
+            if details:
+                # 只保存Active状态的公司
+                if details.get('AbnStatus') != 'Active':
+                    counts['inactive'] += 1
+                    continue
+
+                # 添加搜索关键词和时间戳
+                details = dict(details, SearchKeyword=keyword, QueryTime=datetime.now().isoformat())
+                self._save_result(abn, details)
+                counts['added'] += 1
+
+        logging.info(f"Added {counts['added']} new unique active results for keyword '{keyword}'")
+        return counts
+
+    async def search_by_industry_async(self, keywords: List[str], output_dir: str = None,
+                                       resume: bool = False, fresh: bool = False) -> Dict:
+        """按行业关键词搜索公司（search_by_industry的并发版本，结果日志和断点续传相同）"""
+        start = time.perf_counter()
+        totals = {'matches': 0, 'added': 0, 'duplicates': 0, 'inactive': 0}
+
+        if output_dir and self.crawl_log is None:
+            self.open_crawl_log(output_dir, resume=resume, fresh=fresh)
+
+        for i, keyword in enumerate(keywords, 1):
+            if self._is_keyword_completed(keyword):
+                continue
+
+            logging.info(f"Searching for keyword: {keyword} ({i}/{len(keywords)})")
+            counts = await self.search_keyword(keyword)
+            if counts is None:
+                continue
+            for key, value in counts.items():
+                totals[key] += value
+            self._complete_keyword(keyword)
+
+        seconds = time.perf_counter() - start
+        logging.info(f"""
+Search completed in {seconds:.1f}s:
+- Total matches found: {totals['matches']}
+- Unique active companies: {totals['added']}
+- Duplicates skipped: {totals['duplicates']}
+- Inactive companies skipped: {totals['inactive']}
+- HTTP requests: {self.stats['requests']} ({self.stats['requests'] / seconds if seconds else 0:.1f}/s), retries: {self.stats['retries']}, errors: {self.stats['errors']}
+""")
+        if self.cache:
+            logging.info(self.cache.summary())
+        return totals
+
+
+async def run(args):
+    cache = None
+    if not args.no_cache:
+        cache = ABNResponseCache(args.cache, ttl={
+            'MatchingNames': args.names_ttl * 3600,
+            'AbnDetails': args.details_ttl * 3600,
+        })
+
+    async with AsyncABNLookup(args.guid, base_url=args.base_url, qps=args.qps,
+                              max_concurrency=args.concurrency, record_dir=args.record_dir,
+                              cache=cache) as lookup:
+        try:
+            await lookup.search_by_industry_async(args.keywords or INDUSTRY_KEYWORDS,
+                                                  output_dir=args.output_dir, resume=args.resume,
+                                                  fresh=args.fresh)
+        finally:
+            if lookup.crawl_log:
+                lookup.crawl_log.close()
+
+    # 最终一次性生成Excel
+    if args.output_dir:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        lookup.save_to_excel(f"{args.output_dir}/industry_search_FINAL_{timestamp}.xlsx")
+    else:
+        print(json.dumps(lookup.results, ensure_ascii=False, indent=2))
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Concurrent ABN lookup by industry keywords')
+    parser.add_argument('keywords', nargs='*', help='搜索关键词（默认使用INDUSTRY_KEYWORDS）')
+    parser.add_argument('--guid', default=DEFAULT_GUID, help='ABR web services GUID')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='ABR JSON接口地址，测试时指向stub服务器')
+    parser.add_argument('--qps', type=float, default=DEFAULT_QPS, help=f'每秒最多请求数 (默认: {DEFAULT_QPS})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'同时进行的请求数 (默认: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--output-dir', help='保存结果日志和Excel的目录，不指定时输出JSON')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--resume', action='store_true', help='从输出目录中的检查点继续')
+    group.add_argument('--fresh', action='store_true', help='备份输出目录中之前的结果日志后重新开始')
+    parser.add_argument('--record-dir', help='把原始响应保存为stub服务器的fixture')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help=f'本地响应缓存文件 (默认: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true', help='不使用本地缓存')
+    parser.add_argument('--names-ttl', type=float, default=DEFAULT_TTL['MatchingNames'] / 3600,
+                        help='名称搜索结果的缓存有效期（小时）')
+    parser.add_argument('--details-ttl', type=float, default=DEFAULT_TTL['AbnDetails'] / 3600,
+                        help='ABN详细信息的缓存有效期（小时）')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except FileExistsError as e:
+        logging.error(str(e))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
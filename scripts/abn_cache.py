@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ABN Response Cache
+Persistent SQLite cache of parsed ABR responses, keyed by endpoint and normalized lookup key.
+"""
+
+import re
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = 'abn_cache.sqlite3'
+
+# 每个接口的缓存有效期（秒）：名称搜索结果变化较快，ABN详细信息较稳定
+DEFAULT_TTL = {
+    'MatchingNames': 7 * 24 * 3600,
+    'AbnDetails': 30 * 24 * 3600,
+}
+
+
+def normalize_key(endpoint: str, key: str) -> str:
+    """规范化缓存键：ABN只保留数字，搜索名称忽略大小写和多余空白"""
+    if endpoint == 'AbnDetails':
+        return re.sub(r'\D', '', str(key))
+    return ' '.join(str(key).split()).casefold()
+
+
+class ABNResponseCache:
+    """
+    已解析ABR响应的本地缓存
+
+    get()按接口的TTL判断是否过期，并统计hit/miss/expired；
+    只缓存成功的响应，API错误不写入缓存。
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: Dict[str, float] = None):
+        self.path = path
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.counters = {'hit': 0, 'miss': 0, 'expired': 0, 'stored': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, key)
+            )
+        ''')
+        self._conn.commit()
+
+    def get(self, endpoint: str, key: str) -> Optional[Dict]:
+        """返回未过期的缓存响应，没有或已过期时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, fetched_at FROM responses WHERE endpoint = ? AND key = ?',
+                (endpoint, normalize_key(endpoint, key))
+            ).fetchone()
+
+            if row is None:
+                self.counters['miss'] += 1
+                return None
+
+            value, fetched_at = row
+            ttl = self.ttl.get(endpoint)
+            if ttl is not None and time.time() - fetched_at > ttl:
+                self.counters['expired'] += 1
+                return None
+
+            self.counters['hit'] += 1
+            return json.loads(value)
+
+    def set(self, endpoint: str, key: str, value: Dict):
+        """保存一个响应"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (endpoint, key, value, fetched_at) VALUES (?, ?, ?, ?)',
+                (endpoint, normalize_key(endpoint, key), json.dumps(value, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+            self.counters['stored'] += 1
+
+    def purge_expired(self) -> int:
+        """删除所有已过期的缓存条目，返回删除数量"""
+        now = time.time()
+        deleted = 0
+        with self._lock:
+            for endpoint, ttl in self.ttl.items():
+                if ttl is None:
+                    continue
+                cursor = self._conn.execute(
+                    'DELETE FROM responses WHERE endpoint = ? AND fetched_at < ?', (endpoint, now - ttl)
+                )
+                deleted += cursor.rowcount
+            self._conn.commit()
+        return deleted
+
+    def summary(self) -> str:
+        """缓存统计"""
+        lookups = self.counters['hit'] + self.counters['miss'] + self.counters['expired']
+        hit_rate = self.counters['hit'] / lookups if lookups else 0.0
+        return (f"Cache: {self.counters['hit']} hits, {self.counters['miss']} misses, "
+                f"{self.counters['expired']} expired, {self.counters['stored']} stored ({hit_rate:.0%} hit rate)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ABN Crawl Log
+Append-only JSONL result log plus a checkpoint of completed keywords, so an interrupted crawl can resume.
+
+Files in the crawl directory:
+    results.jsonl    one saved result per line, appended as it is found
+    checkpoint.json  completed keywords and processed ABNs, rewritten atomically after each keyword
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Set
+
+RESULTS_FILE = 'results.jsonl'
+CHECKPOINT_FILE = 'checkpoint.json'
+
+
+class CrawlLog:
+    """
+    断点续传的爬取日志
+
+    - 每个结果立即追加到results.jsonl，写入成本与已有结果数量无关
+    - 每完成一个关键词，先把结果刷到磁盘，再原子地更新checkpoint.json
+    - resume=True时读取已有日志：已完成的关键词跳过，日志中的ABN视为已处理；
+      中断时做到一半的关键词会重新搜索，已保存的ABN按重复跳过
+    - 已有日志时必须指定resume或fresh，避免误把之前的爬取结果覆盖；
+      fresh=True时把旧文件改名为带时间戳的备份，不会删除
+    """
+
+    def __init__(self, directory: str, resume: bool = False, fresh: bool = False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.results_path = self.directory / RESULTS_FILE
+        self.checkpoint_path = self.directory / CHECKPOINT_FILE
+
+        self.results: List[Dict] = []
+        self.completed_keywords: List[str] = []
+        self.processed_abns: Set[str] = set()
+
+        existing = [path for path in (self.results_path, self.checkpoint_path) if path.exists()]
+        if resume:
+            self._load()
+        elif existing and not fresh:
+            raise FileExistsError(
+                f"Crawl log already exists in {self.directory}: "
+                f"pass --resume to continue it or --fresh to start over (old files are kept as backups)")
+        elif existing:
+            self._rotate(existing)
+
+        self._file = open(self.results_path, 'a', encoding='utf-8')
+
+    def _rotate(self, paths: List[Path]):
+        """把之前的日志改名为 {文件名}.{时间戳} 备份"""
+        suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for path in paths:
+            backup = path.with_name(f"{path.name}.{suffix}")
+            os.replace(path, backup)
+            logging.info(f"Moved previous {path.name} to {backup}")
+
+    def _load(self):
+        """读取已有的结果日志和检查点"""
+        if self.results_path.exists():
+            valid_bytes = 0
+            with open(self.results_path, 'rb') as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        # 崩溃时写了一半的最后一行
+                        logging.warning(f"Ignoring truncated line in {self.results_path}")
+                        break
+                    self.results.append(result)
+                    self.processed_abns.add(result.get('Abn'))
+                    valid_bytes += len(line)
+            # 去掉不完整的尾部，后续追加从完整的行开始
+            with open(self.results_path, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+        if self.checkpoint_path.exists():
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            # 已处理的ABN以结果日志为准，检查点中的列表只用于查看进度
+            self.completed_keywords = checkpoint.get('completed_keywords', [])
+
+        logging.info(f"Resuming crawl: {len(self.completed_keywords)} keywords completed, "
+                     f"{len(self.results)} results in {self.results_path}")
+
+    def is_completed(self, keyword: str) -> bool:
+        """关键词是否已在之前的运行中完成"""
+        return keyword in self.completed_keywords
+
+    def append(self, result: Dict):
+        """追加一个结果"""
+        self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self.results.append(result)
+        self.processed_abns.add(result.get('Abn'))
+
+    def complete_keyword(self, keyword: str):
+        """标记关键词完成：结果落盘后原子更新检查点"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self.completed_keywords.append(keyword)
+        temp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'completed_keywords': self.completed_keywords,
+                'processed_abns': sorted(self.processed_abns),
+                'results': len(self.results),
+                'updated_at': datetime.now().isoformat(),
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def close(self):
+        self._file.flush()
+        self._file.close()
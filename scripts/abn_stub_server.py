@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ABR Stub Server
+Replays recorded JSONP responses so the ABN clients can be tested without the real ABR service.
+
+Fixture layout (created by abn_async_client.py --record-dir):
+    <fixtures>/MatchingNames/<url-quoted name>.jsonp
+    <fixtures>/AbnDetails/<abn>.jsonp
+
+Usage:
+    python scripts/abn_stub_server.py --fixtures abn_fixtures --port 8765 --fail-rate 0.1
+"""
+
+import random
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, quote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 接口 -> (fixture目录, 查询参数)
+ENDPOINTS = {
+    '/json/MatchingNames.aspx': ('MatchingNames', 'name'),
+    '/json/AbnDetails.aspx': ('AbnDetails', 'abn'),
+}
+
+NOT_FOUND_MESSAGES = {
+    'MatchingNames': 'callback({"Message":"","Names":[]})',
+    'AbnDetails': 'callback({"Abn":"","Message":"Search text is not a valid ABN or ACN"})',
+}
+
+
+def make_handler(fixtures: Path, fail_rate: float = 0.0, latency: float = 0.0):
+    """创建回放fixture的请求处理类；fail_rate的请求返回503用于测试重试"""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        requests_served = 0
+        lock = threading.Lock()
+
+        def do_GET(self):
+            with StubHandler.lock:
+                StubHandler.requests_served += 1
+
+            url = urlparse(self.path)
+            if url.path not in ENDPOINTS:
+                self.send_error(404)
+                return
+
+            if fail_rate and random.random() < fail_rate:
+                self.send_error(503)
+                return
+            if latency:
+                threading.Event().wait(latency)
+
+            folder, param = ENDPOINTS[url.path]
+            key = parse_qs(url.query).get(param, [''])[0]
+            fixture = fixtures / folder / f"{quote(key, safe='')}.jsonp"
+            body = fixture.read_bytes() if fixture.exists() else NOT_FOUND_MESSAGES[folder].encode('utf-8')
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/javascript; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(fixtures, port: int = 0, fail_rate: float = 0.0, latency: float = 0.0):
+    """
+    在后台线程启动stub服务器
+
+    返回:
+        (server, base_url)，使用完后调用server.shutdown()
+    """
+    handler = make_handler(Path(fixtures), fail_rate, latency)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded ABR JSONP responses')
+    parser.add_argument('--fixtures', required=True, help='fixture目录')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口 (默认: 8765)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='返回503的请求比例')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的模拟延迟（秒）')
+    args = parser.parse_args()
+
+    handler = make_handler(Path(args.fixtures), args.fail_rate, args.latency)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), handler)
+    print(f"Serving {args.fixtures} at http://127.0.0.1:{args.port}/json")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
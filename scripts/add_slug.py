@@ -2,10 +2,29 @@ import pandas as pd
 import re
 import os
 from datetime import datetime
+from itertools import chain
+from csv_stream import detect_encoding, iter_csv_chunks, DEFAULT_CHUNK_SIZE
 
-def generate_slug(company_name):
+# 常见的公司后缀词汇（可选移除）
+COMMON_SUFFIXES = [
+    'pty ltd', 'pty. ltd.', 'ltd', 'limited', 'inc', 'incorporated', 
+    'corp', 'corporation', 'co', 'company', 'llc', 'llp', 'lp'
+]
+
+# 预编译的正则表达式，单个名称和整列处理共用
+INVALID_CHARS_PATTERN = re.compile(r'[^a-z0-9\s\-]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+HYPHENS_PATTERN = re.compile(r'-+')
+# 名称末尾的一个或多个后缀（前面必须有空格或逗号，名称本身不会被整体移除）
+SUFFIX_PATTERN = re.compile(
+    r'(?:[\s,]+(?:' + '|'.join(re.escape(suffix) for suffix in sorted(COMMON_SUFFIXES, key=len, reverse=True)) + r')\.?)+$'
+)
+
+def generate_slug(company_name, strip_suffixes=False):
     """
     根据公司名称生成URL友好的slug
+
+    strip_suffixes=True时先移除名称末尾的常见公司后缀（COMMON_SUFFIXES）
     """
     if not company_name or pd.isna(company_name):
         return ''
@@ -17,22 +36,20 @@ def generate_slug(company_name):
     slug = name.lower()
     
     # 移除常见的公司后缀词汇（可选）
-    common_suffixes = [
-        'pty ltd', 'pty. ltd.', 'ltd', 'limited', 'inc', 'incorporated', 
-        'corp', 'corporation', 'co', 'company', 'llc', 'llp', 'lp'
-    ]
+    if strip_suffixes:
+        slug = SUFFIX_PATTERN.sub('', slug)
     
     # 移除特殊字符，只保留字母、数字、空格和连字符
-    slug = re.sub(r'[^a-z0-9\s\-]', '', slug)
+    slug = INVALID_CHARS_PATTERN.sub('', slug)
     
     # 将多个空格替换为单个空格
-    slug = re.sub(r'\s+', ' ', slug)
+    slug = WHITESPACE_PATTERN.sub(' ', slug)
     
     # 将空格替换为连字符
     slug = slug.replace(' ', '-')
     
     # 将多个连字符替换为单个连字符
-    slug = re.sub(r'-+', '-', slug)
+    slug = HYPHENS_PATTERN.sub('-', slug)
     
     # 移除首尾的连字符
     slug = slug.strip('-')
@@ -43,6 +60,37 @@ def generate_slug(company_name):
     
     return slug
 
+def generate_slug_column(names, fallback=None, strip_suffixes=False):
+    """
+    对整列公司名称生成slug，结果与逐个调用generate_slug完全一致
+
+    参数:
+        names: 公司名称列（例如name_en）
+        fallback: 备用名称列（例如name），names为空或只有空白时使用
+        strip_suffixes: 是否移除末尾的常见公司后缀
+
+    返回:
+        与names索引相同的slug列
+    """
+    if fallback is not None:
+        blank = names.isna() | names.astype(str).str.strip().eq('')
+        names = names.where(~blank, fallback)
+    
+    # 与generate_slug的 not company_name or pd.isna(company_name) 相同
+    empty = names.isna() | ~names.astype(bool)
+    
+    slugs = names.where(~empty, '').astype(str).str.strip().str.lower()
+    if strip_suffixes:
+        slugs = slugs.str.replace(SUFFIX_PATTERN, '', regex=True)
+    slugs = (slugs.str.replace(INVALID_CHARS_PATTERN, '', regex=True)
+                  .str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+                  .str.replace(' ', '-', regex=False)
+                  .str.replace(HYPHENS_PATTERN, '-', regex=True)
+                  .str.strip('-'))
+    
+    slugs = slugs.mask(slugs.eq(''), 'company')
+    return slugs.mask(empty, '')
+
 def generate_unique_slug(base_slug, existing_slugs):
     """
     生成唯一的slug，如果存在冲突则添加数字后缀
@@ -56,9 +104,81 @@ def generate_unique_slug(base_slug, existing_slugs):
     
     return f"{base_slug}-{counter}"
 
-def add_slug_to_csv(input_file=None, output_file=None):
+class SlugAllocator:
+    """
+    唯一slug分配器
+
+    结果与generate_unique_slug相同（基础slug未被占用时直接使用，否则取最小的未占用的-2、-3…后缀），
+    但为每个基础slug记住下一个待尝试的后缀。已分配的slug不会被释放，比上次结果小的后缀一定仍被占用，
+    所以不必每次从-2开始探测，分配的均摊复杂度为O(1)。
+    """
+
+    def __init__(self, existing_slugs=()):
+        self.taken = set(existing_slugs)
+        self.next_counter = {}  # 基础slug -> 下一个待尝试的后缀
+        self.seeded = len(self.taken)
+        self.allocated = 0
+        self.suffixed = 0
+
+    def seed(self, slugs):
+        """把已经使用的slug（例如Firestore中已发布的）加入占用集合"""
+        before = len(self.taken)
+        self.taken.update(slugs)
+        self.seeded += len(self.taken) - before
+
+    def allocate(self, base_slug):
+        """为基础slug分配一个唯一的slug并标记为占用"""
+        if base_slug not in self.taken:
+            slug = base_slug
+        else:
+            counter = self.next_counter.get(base_slug, 2)
+            while f"{base_slug}-{counter}" in self.taken:
+                counter += 1
+            self.next_counter[base_slug] = counter + 1
+            slug = f"{base_slug}-{counter}"
+            self.suffixed += 1
+        
+        self.taken.add(slug)
+        self.allocated += 1
+        return slug
+
+    def __contains__(self, slug):
+        return slug in self.taken
+
+    def __len__(self):
+        return len(self.taken)
+
+def load_firestore_slugs(db, collection_name='companies', field='slug'):
+    """
+    读取Firestore集合中已有的slug
+
+    只读取slug字段；用于增量运行时预先占用已发布的URL。
+    """
+    slugs = set()
+    for doc in db.collection(collection_name).select([field]).stream():
+        slug = (doc.to_dict() or {}).get(field)
+        if slug:
+            slugs.add(slug)
+    return slugs
+
+def init_firestore(service_account_path='firebase-admin-key.json'):
+    """初始化Firebase并返回Firestore客户端"""
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(service_account_path))
+    return firestore.client()
+
+def add_slug_to_csv(input_file=None, output_file=None, chunk_size=DEFAULT_CHUNK_SIZE, existing_slugs=None,
+                    strip_suffixes=False):
     """
     为CSV文件中的公司数据添加slug字段
+
+    输入文件按chunk_size行分块流式读取，每块生成slug后立即追加写入输出文件，
+    内存占用与文件大小无关。所有列按字符串读写，保证原值原样输出。
+
+    existing_slugs: 已经使用的slug（例如load_firestore_slugs的结果），新生成的slug不会与之冲突
+    strip_suffixes: 是否移除名称末尾的常见公司后缀
     """
     try:
         # 设置默认输入文件路径
@@ -80,80 +200,64 @@ def add_slug_to_csv(input_file=None, output_file=None):
         
         print(f"正在读取文件: {input_file}")
         
-        # 尝试不同的编码格式读取CSV文件
-        encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                print(f"尝试使用 {encoding} 编码读取文件...")
-                df = pd.read_csv(input_file, encoding=encoding)
-                print(f"成功使用 {encoding} 编码读取文件")
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if df is None:
+        # 从字节样本检测一次编码
+        try:
+            encoding = detect_encoding(input_file)
+        except UnicodeDecodeError:
             print("错误: 无法读取CSV文件，尝试了多种编码格式都失败")
             return
+        print(f"检测到文件编码: {encoding}")
         
-        print(f"找到 {len(df)} 条公司记录")
+        chunks = iter_csv_chunks(input_file, chunk_size=chunk_size, encoding=encoding, dtype=str)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            print("错误: CSV文件中没有数据")
+            return
         
         # 检查是否有name_en字段
-        if 'name_en' not in df.columns:
+        if 'name_en' not in first_chunk.columns:
             print("错误: CSV文件中没有找到 'name_en' 字段")
-            print(f"可用字段: {', '.join(df.columns)}")
+            print(f"可用字段: {', '.join(first_chunk.columns)}")
             return
         
         # 生成slug
         print("正在生成slug...")
-        existing_slugs = set()
-        slugs = []
+        allocator = SlugAllocator(existing_slugs or ())
+        if allocator.seeded:
+            print(f"已占用的slug: {allocator.seeded}")
+        total_count = 0
+        samples = []
         
-        for index, row in df.iterrows():
-            company_name = row.get('name_en', '')
-            
-            # 如果name_en为空，尝试使用name字段
-            if pd.isna(company_name) or str(company_name).strip() == '':
-                company_name = row.get('name', '')
-            
-            # 生成基础slug
-            base_slug = generate_slug(company_name)
-            
-            # 生成唯一slug
-            unique_slug = generate_unique_slug(base_slug, existing_slugs)
-            existing_slugs.add(unique_slug)
-            slugs.append(unique_slug)
-            
-            # 显示进度
-            if (index + 1) % 100 == 0:
-                print(f"已处理 {index + 1}/{len(df)} 条记录")
-        
-        # 添加slug列到DataFrame
-        df['slug'] = slugs
-        
-        # 保存到新的CSV文件
-        df.to_csv(output_file, index=False, encoding='utf-8')
+        with open(output_file, 'w', encoding='utf-8', newline='') as output:
+            for chunk_number, chunk in enumerate(chain([first_chunk], chunks)):
+                # 整列生成基础slug，name_en为空时使用name字段
+                fallback = chunk['name'] if 'name' in chunk.columns else pd.Series('', index=chunk.index)
+                base_slugs = generate_slug_column(chunk['name_en'], fallback, strip_suffixes=strip_suffixes)
+                
+                # 生成唯一slug
+                slugs = [allocator.allocate(base_slug) for base_slug in base_slugs]
+                
+                # 添加slug列并追加写入输出文件
+                chunk['slug'] = slugs
+                chunk.to_csv(output, index=False, header=chunk_number == 0)
+                total_count += len(chunk)
+                print(f"已处理 {total_count} 条记录")
+                
+                if len(samples) < 10:
+                    samples.extend(chunk[['name_en', 'slug']].head(10 - len(samples)).itertuples(index=False))
         
         print(f"成功生成slug并保存到: {output_file}")
         
         # 显示一些示例
         print("\n--- 生成的slug示例 ---")
-        sample_data = df[['name_en', 'slug']].head(10)
-        for _, row in sample_data.iterrows():
-            print(f"{row['name_en']} -> {row['slug']}")
+        for name_en, slug in samples:
+            print(f"{name_en} -> {slug}")
         
         # 统计信息
         print(f"\n--- 统计信息 ---")
-        print(f"总记录数: {len(df)}")
-        print(f"生成的唯一slug数: {len(set(slugs))}")
-        print(f"重复slug数: {len(slugs) - len(set(slugs))}")
-        
-        # 检查是否有重复的slug
-        duplicate_slugs = df[df.duplicated(['slug'], keep=False)]
-        if not duplicate_slugs.empty:
-            print(f"发现 {len(duplicate_slugs)} 条记录有重复的slug:")
-            print(duplicate_slugs[['name_en', 'slug']].head())
+        print(f"总记录数: {total_count}")
+        print(f"生成的唯一slug数: {allocator.allocated}")
+        print(f"添加了数字后缀的slug数: {allocator.suffixed}")
         
     except Exception as e:
         print(f"处理过程中出错: {str(e)}")
@@ -172,7 +276,14 @@ def main():
     input_file = None  # 使用默认路径
     output_file = None  # 使用默认路径
     
-    add_slug_to_csv(input_file, output_file)
+    # 增量运行时先读取Firestore中已发布的slug，避免与已有URL冲突
+    existing_slugs = None
+    response = input("是否从Firestore读取已有的slug以避免冲突？(y/n): ")
+    if response.lower() == 'y':
+        existing_slugs = load_firestore_slugs(init_firestore())
+        print(f"从Firestore读取到 {len(existing_slugs)} 个slug")
+    
+    add_slug_to_csv(input_file, output_file, existing_slugs=existing_slugs)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
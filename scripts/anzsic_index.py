@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ANZSIC行业分类的层级索引
+从process_anzsic_data生成的扁平记录建立一棵树：代码 -> 节点、父节点 -> 子节点列表，
+以及小写词 -> 节点、词前缀 -> 节点的倒排索引。
+整个索引序列化为一个紧凑的JSON文档，展开某个分类或按名称自动补全都只需一次字典查找，不需要扫描记录列表。
+"""
+
+import re
+import json
+
+ANZSIC_INDEX_PATH = 'anzsic_index.json'
+
+# 不参与索引的常见词
+STOP_WORDS = {'and', 'of', 'the', 'nec'}
+
+# 自动补全的最短前缀
+MIN_PREFIX_LENGTH = 2
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text):
+    """小写、按非字母数字拆分，去掉停用词和单个字符；n.e.c. 视为一个词"""
+    text = text.lower().replace('n.e.c.', 'nec')
+    return [token for token in TOKEN_PATTERN.findall(text) if len(token) > 1 and token not in STOP_WORDS]
+
+def build_anzsic_index(records):
+    """
+    建立层级索引
+
+    参数:
+        records: process_anzsic_data的输出，每条记录包含level1/level2/level3及对应代码
+
+    返回:
+        {
+            'roots': 一级分类代码列表,
+            'nodes': {代码: {'name', 'level', 'parent'}},
+            'children': {代码: 子分类代码列表},
+            'codes': 所有节点代码,
+            'tokens': {词: 节点在codes中的下标列表},
+            'prefixes': {词前缀: 节点在codes中的下标列表},
+        }
+        倒排索引存下标而不是代码，文件小一半以上；列表保持记录中的出现顺序
+    """
+    nodes = {}
+    children = {}
+    roots = []
+
+    def add_node(code, name, level, parent):
+        if code in nodes:
+            return
+        nodes[code] = {'name': name, 'level': level, 'parent': parent}
+        children[code] = []
+        if parent is None:
+            roots.append(code)
+        else:
+            children[parent].append(code)
+
+    for record in records:
+        add_node(record['level1_code'], record['level1'], 1, None)
+        add_node(record['level2_code'], record['level2'], 2, record['level1_code'])
+        if record.get('level3_code'):
+            add_node(record['level3_code'], record['level3'], 3, record['level2_code'])
+
+    tokens = {}
+    prefixes = {}
+    for position, node in enumerate(nodes.values()):
+        for token in dict.fromkeys(tokenize(node['name'])):
+            tokens.setdefault(token, []).append(position)
+            for length in range(MIN_PREFIX_LENGTH, len(token) + 1):
+                positions = prefixes.setdefault(token[:length], [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+    return {
+        'roots': roots,
+        'nodes': nodes,
+        'children': {code: codes for code, codes in children.items() if codes},
+        'codes': list(nodes),
+        'tokens': tokens,
+        'prefixes': prefixes,
+    }
+
+def save_anzsic_index(index, path=ANZSIC_INDEX_PATH):
+    """紧凑地写入索引文件，返回字节数"""
+    data = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+class AnzsicIndex:
+    """
+    已加载索引上的查询
+
+    node()、children()、path()只做字典查找；complete()对查询中的每个词做一次前缀查找并求交集。
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    @classmethod
+    def load(cls, path=ANZSIC_INDEX_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def node(self, code):
+        """代码对应的节点，不存在时返回None"""
+        return self.index['nodes'].get(code)
+
+    def children(self, code=None):
+        """子分类代码列表；code为None时返回所有一级分类"""
+        if code is None:
+            return self.index['roots']
+        return self.index['children'].get(code, [])
+
+    def path(self, code):
+        """从一级分类到code的代码列表"""
+        path = []
+        while code is not None:
+            path.append(code)
+            code = self.index['nodes'][code]['parent']
+        return path[::-1]
+
+    def find(self, word):
+        """包含完整词word的节点代码列表"""
+        codes = self.index['codes']
+        return [codes[position] for position in self.index['tokens'].get(word.lower(), [])]
+
+    def complete(self, query, limit=10):
+        """
+        按名称自动补全
+
+        查询中的每个词都可以只输入前缀，所有词都要出现在名称中；结果按记录中的出现顺序排列
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+
+        matches = None
+        for word in words:
+            positions = self.index['prefixes'].get(word, [])
+            if matches is None:
+                matches = positions
+            else:
+                allowed = set(positions)
+                matches = [position for position in matches if position in allowed]
+            if not matches:
+                return []
+        codes = self.index['codes']
+        return [codes[position] for position in matches[:limit]]
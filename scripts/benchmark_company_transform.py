@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+公司数据转换基准测试
+对比逐行(iterrows + process_company_data)与列式(process_companies_frame)两种模式的吞吐量
+"""
+
+import os
+import random
+import tempfile
+import time
+import argparse
+import pandas as pd
+from company_transform import process_company_data, process_companies_frame
+
+def generate_synthetic_csv(path, rows, seed=42):
+    """
+    生成与公司导出CSV结构相同的合成数据
+    """
+    rng = random.Random(seed)
+    industries = ['Technology', 'Retail', 'Construction', 'Finance', 'Education', 'Health', '']
+    languages = ['English', 'Mandarin', 'Cantonese', 'English, Mandarin', 'English,Cantonese, Mandarin', '']
+    services = ['Consulting', 'Import, Export', 'Web Design, SEO, Hosting', 'http://example.com,extra', 'nan', '']
+
+    records = []
+    for i in range(rows):
+        records.append({
+            'document_id': f'doc_{i:07d}' if i % 97 else '',
+            'abn': f'{rng.randint(10, 99)} {rng.randint(100, 999)} {rng.randint(100, 999)} {rng.randint(100, 999)}',
+            'companyId': f'COMP_{i:07d}',
+            'name_en': f'  Company {i} Pty Ltd ',
+            'name_cn': '公司' if i % 3 == 0 else '',
+            'name': f'Company {i}',
+            'trading name': 'null' if i % 5 == 0 else f'Trading {i}',
+            'description': 'Import, export and logistics services',
+            'shortDescription': 'Short, with commas',
+            'fullDescription': 'Long description, which must never be split into an array.',
+            'logo': 'https://example.com/logo.png',
+            'website': 'https://example.com',
+            'email': f'info{i}@example.com',
+            'phone': '0400 000 000',
+            'location': 'Sydney, NSW',
+            'foundedYear': rng.choice(['2001', '1999.0', 'unknown', '', '2015']),
+            'teamSize': rng.choice(['1-10', '11-50', '51-200', '']),
+            'rating': rng.choice(['4.5', '3', 'n/a', '']),
+            'verified': rng.choice(['TRUE', 'false', 'yes', '0', '']),
+            'slug': f'company-{i}',
+            'source': 'csv',
+            'status': 'active',
+            'industry_1': rng.choice(industries),
+            'industry_2': rng.choice(industries),
+            'industry_3': rng.choice(industries),
+            'industries': rng.choice(industries + ['Technology, Retail']),
+            'languages': rng.choice(languages),
+            'services': rng.choice(services),
+        })
+
+    pd.DataFrame(records).to_csv(path, index=False, encoding='utf-8')
+
+def run_row_mode(df):
+    """
+    现有的逐行处理方式
+    """
+    results = []
+    for _, row in df.iterrows():
+        try:
+            results.append(process_company_data(row))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def compare_results(row_results, frame_results):
+    """
+    检查两种模式的输出是否完全一致（包括字段顺序）
+    """
+    if len(row_results) != len(frame_results):
+        return False
+    for expected, actual in zip(row_results, frame_results):
+        if isinstance(expected, Exception) or isinstance(actual, Exception):
+            if type(expected) is not type(actual):
+                return False
+            continue
+        if expected != actual or list(expected) != list(actual):
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='公司数据逐行/列式转换基准测试')
+    parser.add_argument('-n', '--rows', type=int, default=100000, help='合成CSV的行数 (默认: 100000)')
+    parser.add_argument('--csv', help='使用已有的CSV文件而不是生成合成数据')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_file = args.csv
+        if csv_file is None:
+            csv_file = os.path.join(temp_dir, 'synthetic_companies.csv')
+            print(f"正在生成 {args.rows} 行合成数据...")
+            generate_synthetic_csv(csv_file, args.rows)
+
+        df = pd.read_csv(csv_file, encoding='utf-8')
+        rows = len(df)
+        print(f"读取 {rows} 行，{len(df.columns)} 列")
+
+        start = time.perf_counter()
+        row_results = run_row_mode(df)
+        row_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        frame_results = process_companies_frame(df)
+        frame_seconds = time.perf_counter() - start
+
+    print(f"\n=== 基准测试结果 ({rows} 行) ===")
+    print(f"逐行模式: {row_seconds:.2f}s, {rows / row_seconds:,.0f} 行/秒")
+    print(f"列式模式: {frame_seconds:.2f}s, {rows / frame_seconds:,.0f} 行/秒")
+    print(f"加速比: {row_seconds / frame_seconds:.1f}x")
+
+    if compare_results(row_results, frame_results):
+        print("✅ 两种模式输出完全一致")
+    else:
+        print("❌ 两种模式输出不一致")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+JSONP Parse Benchmark
+Compares the original regex parser with parse_jsonp on recorded ABR payloads.
+
+Usage:
+    python scripts/benchmark_jsonp_parse.py --fixtures abn_fixtures
+    python scripts/benchmark_jsonp_parse.py            # synthetic MatchingNames payloads
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+import ABN_lookup
+from ABN_lookup import parse_jsonp
+
+
+def regex_parse(body: bytes):
+    """原来的解析方式：解码为字符串后正则匹配，再解析捕获的字符串"""
+    json_str = re.search(r'callback\((.*)\)', body.decode('utf-8')).group(1)
+    return json.loads(json_str)
+
+
+def synthetic_payloads(count: int = 50, seed: int = 42):
+    """生成maxResults=100的MatchingNames响应"""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(count):
+        names = [{
+            'Abn': f'{rng.randint(10**10, 10**11 - 1)}',
+            'AbnStatus': '0000000001',
+            'IsCurrent': True,
+            'Name': f'{rng.choice(["Pacific", "Global", "Sydney", "Metro"])} Logistics Pty Ltd {i}',
+            'NameType': rng.choice(['Entity Name', 'Business Name', 'Trading Name']),
+            'Postcode': f'{rng.randint(2000, 7999)}',
+            'Score': rng.randint(80, 100),
+            'State': rng.choice(['NSW', 'VIC', 'QLD', 'WA', 'SA']),
+        } for i in range(100)]
+        payloads.append(('callback(' + json.dumps({'Message': '', 'Names': names}) + ')').encode('utf-8'))
+    return payloads
+
+
+def time_parser(parser, payloads, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            parser(payload)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSONP parse micro-benchmark')
+    parser.add_argument('--fixtures', help='abn_stub_server.py的fixture目录，不指定时使用合成数据')
+    parser.add_argument('--repeat', type=int, default=200, help='重复次数 (默认: 200)')
+    args = parser.parse_args()
+
+    if args.fixtures:
+        payloads = [path.read_bytes() for path in sorted(Path(args.fixtures).rglob('*.jsonp'))]
+    else:
+        payloads = synthetic_payloads()
+    if not payloads:
+        print("No payloads found")
+        return
+
+    size = sum(len(payload) for payload in payloads)
+    print(f"{len(payloads)} payloads, {size / len(payloads) / 1024:.1f} KB average, {args.repeat} repeats")
+
+    for payload in payloads:
+        if parse_jsonp(payload) != regex_parse(payload):
+            print("❌ parse_jsonp result differs from the regex parser")
+            return
+
+    parsers = [('regex + json', regex_parse)]
+    if ABN_lookup.orjson:
+        parsers.append(('slice + orjson', parse_jsonp))
+        # 同时测量不使用orjson的切片解析
+        parsers.append(('slice + json', lambda body: json.loads(body[len(ABN_lookup.JSONP_PREFIX):body.rindex(b')')])))
+    else:
+        parsers.append(('slice + json', parse_jsonp))
+
+    baseline = None
+    for name, parse in parsers:
+        seconds = time_parser(parse, payloads, args.repeat)
+        baseline = baseline or seconds
+        megabytes = size * args.repeat / seconds / 1024 / 1024
+        print(f"{name:<16} {seconds:.2f}s  {megabytes:,.0f} MB/s  {baseline / seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
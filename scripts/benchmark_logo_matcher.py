@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+logo模糊匹配基准测试
+对比逐个比较(find_best_match)与候选索引(LogoMatcher)两种方式。
+逐个比较是 公司数 × logo数 次SequenceMatcher，只在前--legacy-companies个公司上运行、按比例推算全量耗时，
+并校验这些公司在0.7阈值下的匹配结果完全一致。
+"""
+
+import time
+import random
+import string
+import argparse
+from logo_matcher import LogoMatcher, MATCH_THRESHOLD, find_best_match
+
+WORDS = ['pacific', 'global', 'sydney', 'melbourne', 'metro', 'trading', 'logistics', 'consulting',
+         'group', 'holdings', 'property', 'design', 'lawyers', 'realty', 'construction', 'education',
+         'health', 'tech', 'digital', 'capital', 'finance', 'harbour', 'coastal', 'united', 'golden']
+
+def random_name(rng):
+    """生成一个已清理（小写字母数字和空格）的公司名称"""
+    words = rng.sample(WORDS, rng.randint(1, 3))
+    words.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8))))
+    rng.shuffle(words)
+    return ' '.join(words)
+
+def perturb(name, rng):
+    """模拟logo文件名与公司名称的差异：去掉空格、删除或替换个别字符、加后缀"""
+    choice = rng.random()
+    if choice < 0.3:
+        return name.replace(' ', '')
+    if choice < 0.6:
+        position = rng.randrange(len(name))
+        return name[:position] + name[position + 1:]
+    if choice < 0.8:
+        position = rng.randrange(len(name))
+        return name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1:]
+    return name + ' pty ltd'
+
+def generate(companies, logos, seed=42):
+    """生成公司名称和logo名称：一半logo由公司名称变形得到，其余为无关名称"""
+    rng = random.Random(seed)
+    company_names = [random_name(rng) for _ in range(companies)]
+    logo_names = [perturb(name, rng) for name in rng.sample(company_names, min(companies, logos) // 2)]
+    while len(logo_names) < logos:
+        logo_names.append(random_name(rng))
+    rng.shuffle(logo_names)
+    return company_names, list(dict.fromkeys(logo_names))
+
+def main():
+    parser = argparse.ArgumentParser(description='logo模糊匹配基准测试')
+    parser.add_argument('--companies', type=int, default=10000, help='公司数量 (默认: 10000)')
+    parser.add_argument('--logos', type=int, default=10000, help='logo数量 (默认: 10000)')
+    parser.add_argument('--legacy-companies', type=int, default=50, help='逐个比较方式运行的公司数量 (默认: 50)')
+    args = parser.parse_args()
+
+    company_names, logo_names = generate(args.companies, args.logos)
+    print(f"{len(company_names)} 个公司 × {len(logo_names)} 个logo")
+
+    start = time.perf_counter()
+    matcher = LogoMatcher(logo_names)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [matcher.find_best_match(name, MATCH_THRESHOLD) for name in company_names]
+    indexed_seconds = time.perf_counter() - start
+
+    sample = company_names[:args.legacy_companies]
+    start = time.perf_counter()
+    legacy = [find_best_match(name, logo_names) for name in sample]
+    legacy_seconds = time.perf_counter() - start
+    legacy_estimate = legacy_seconds / len(sample) * len(company_names)
+
+    matched = sum(1 for _, score in indexed if score > MATCH_THRESHOLD)
+    print(f"\n=== 基准测试结果 ===")
+    print(f"建立索引: {index_seconds:.2f}s")
+    print(f"候选索引: {indexed_seconds:.2f}s（{matched} 个公司超过阈值）")
+    print(f"逐个比较: {len(sample)} 个公司 {legacy_seconds:.2f}s，推算全量 {legacy_estimate:.0f}s")
+    print(f"加速比: {legacy_estimate / (index_seconds + indexed_seconds):.0f}x")
+
+    mismatches = 0
+    for (legacy_name, legacy_score), (indexed_name, indexed_score) in zip(legacy, indexed):
+        legacy_result = legacy_name if legacy_score > MATCH_THRESHOLD else None
+        indexed_result = indexed_name if indexed_score > MATCH_THRESHOLD else None
+        if legacy_result != indexed_result or (legacy_result and legacy_score != indexed_score):
+            mismatches += 1
+    if mismatches:
+        print(f"❌ {mismatches} 个公司的匹配结果不一致")
+    else:
+        print(f"✅ {len(sample)} 个公司在 {MATCH_THRESHOLD} 阈值下的匹配结果完全一致")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Logo处理基准测试
+生成一组大尺寸PNG和JPEG logo，比较不同工作进程数下process_directory的吞吐量，并校验输出一致
+"""
+
+import os
+import random
+import hashlib
+import tempfile
+import argparse
+from multiprocessing import cpu_count
+from PIL import Image, ImageDraw
+from process_logo import process_directory
+
+def generate_logos(directory, count, width=2400, height=1600, seed=42):
+    """
+    生成count个大尺寸logo，PNG（带透明通道）和JPEG各占一半
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        if i % 2 == 0:
+            img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        else:
+            img = Image.new('RGB', (width, height), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        for _ in range(30):
+            x0, y0 = rng.randint(0, width - 1), rng.randint(0, height - 1)
+            x1, y1 = rng.randint(x0, width), rng.randint(y0, height)
+            color = tuple(rng.randint(0, 255) for _ in range(3))
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+        if i % 2 == 0:
+            img.save(os.path.join(directory, f'logo_{i:04d}.png'), 'PNG')
+        else:
+            img.save(os.path.join(directory, f'logo_{i:04d}.jpg'), 'JPEG', quality=90)
+
+def directory_digest(directory):
+    """输出目录中所有文件内容的摘要，用于比较不同进程数的输出"""
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(directory)):
+        digest.update(filename.encode('utf-8'))
+        with open(os.path.join(directory, filename), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description='Logo处理多进程基准测试')
+    parser.add_argument('-n', '--count', type=int, default=48, help='生成的logo数量 (默认: 48)')
+    parser.add_argument('--workers', type=int, nargs='+', help='要比较的进程数 (默认: 1, 2, 4 ... CPU核数)')
+    args = parser.parse_args()
+
+    workers_list = args.workers
+    if not workers_list:
+        workers_list = sorted({1, *[w for w in (2, 4, 8, 16) if w <= cpu_count()], cpu_count()})
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_dir = os.path.join(temp_dir, 'input')
+        print(f"正在生成 {args.count} 个大尺寸logo...")
+        generate_logos(input_dir, args.count)
+
+        results = []
+        for workers in workers_list:
+            output_dir = os.path.join(temp_dir, f'output_{workers}')
+            stats = process_directory(input_dir, output_dir, workers=workers)
+            results.append((workers, stats, directory_digest(output_dir)))
+
+    print(f"\n=== 基准测试结果 ({args.count} 个logo, {cpu_count()} 个CPU核) ===")
+    baseline = results[0][1]['seconds']
+    for workers, stats, _ in results:
+        print(f"{workers:>3} 个进程: {stats['seconds']:.2f}s, {stats['processed'] / stats['seconds']:.1f} 个/秒, "
+              f"加速比 {baseline / stats['seconds']:.1f}x")
+
+    if len({digest for _, _, digest in results}) == 1:
+        print("✅ 所有进程数的输出完全一致")
+    else:
+        print("❌ 不同进程数的输出不一致")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+唯一slug分配基准测试
+对比逐个探测后缀(generate_unique_slug)与按基础slug记录计数器(SlugAllocator)两种方式。
+逐个探测在大量重名时是平方复杂度，只在前--legacy-rows个名称上运行并校验两者结果一致。
+"""
+
+import time
+import random
+import argparse
+from add_slug import generate_slug, generate_unique_slug, SlugAllocator
+
+def generate_names(count, bases=200, seed=42):
+    """
+    生成大量重名的公司名称
+
+    少数常见名称占大部分（Zipf分布），并混入"Consulting 2"这类名称，
+    其基础slug本身就与带后缀的slug相同。
+    """
+    rng = random.Random(seed)
+    words = ['Consulting', 'Trading', 'Holdings', 'Group', 'Services', 'Property', 'Construction',
+             'Investment', 'Education', 'Logistics', 'Technology', 'Australia', 'Global', 'Pacific']
+    base_names = [f"{rng.choice(words)} {rng.choice(words)}" for _ in range(bases)]
+    weights = [1 / (rank + 1) for rank in range(bases)]
+
+    names = rng.choices(base_names, weights=weights, k=count)
+    for i in range(0, count, 50):
+        names[i] = f"{names[i]} {rng.randint(2, 500)}"
+    return names
+
+def run_legacy(base_slugs):
+    existing_slugs = set()
+    results = []
+    for base_slug in base_slugs:
+        unique_slug = generate_unique_slug(base_slug, existing_slugs)
+        existing_slugs.add(unique_slug)
+        results.append(unique_slug)
+    return results
+
+def run_allocator(base_slugs):
+    allocator = SlugAllocator()
+    return [allocator.allocate(base_slug) for base_slug in base_slugs]
+
+def main():
+    parser = argparse.ArgumentParser(description='唯一slug分配基准测试')
+    parser.add_argument('-n', '--names', type=int, default=1000000, help='名称数量 (默认: 1000000)')
+    parser.add_argument('--bases', type=int, default=200, help='不同公司名称的数量 (默认: 200)')
+    parser.add_argument('--legacy-rows', type=int, default=20000, help='逐个探测方式运行的名称数量 (默认: 20000)')
+    args = parser.parse_args()
+
+    print(f"正在生成 {args.names} 个名称（{args.bases} 个不同名称）...")
+    base_slugs = [generate_slug(name) for name in generate_names(args.names, args.bases)]
+
+    start = time.perf_counter()
+    slugs = run_allocator(base_slugs)
+    allocator_seconds = time.perf_counter() - start
+
+    legacy_rows = min(args.legacy_rows, args.names)
+    start = time.perf_counter()
+    legacy_slugs = run_legacy(base_slugs[:legacy_rows])
+    legacy_seconds = time.perf_counter() - start
+
+    print(f"\n=== 基准测试结果 ===")
+    print(f"计数器分配: {args.names} 个名称 {allocator_seconds:.2f}s, {args.names / allocator_seconds:,.0f} 个/秒")
+    print(f"逐个探测:   {legacy_rows} 个名称 {legacy_seconds:.2f}s, {legacy_rows / legacy_seconds:,.0f} 个/秒")
+
+    if len(set(slugs)) != len(slugs):
+        print("❌ 计数器分配产生了重复的slug")
+    elif slugs[:legacy_rows] != legacy_slugs:
+        print("❌ 两种方式的结果不一致")
+    else:
+        print("✅ slug全部唯一，且与逐个探测的结果一致")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+slug生成基准测试
+对比逐行(generate_slug)与整列(generate_slug_column)两种方式，并校验输出逐字节一致
+"""
+
+import os
+import time
+import tempfile
+import argparse
+import pandas as pd
+from add_slug import generate_slug, generate_slug_column
+from benchmark_company_transform import generate_synthetic_csv
+
+def run_row_mode(df, strip_suffixes=False):
+    """
+    原来的逐行处理方式
+    """
+    slugs = []
+    for _, row in df.iterrows():
+        company_name = row.get('name_en', '')
+        if pd.isna(company_name) or str(company_name).strip() == '':
+            company_name = row.get('name', '')
+        slugs.append(generate_slug(company_name, strip_suffixes=strip_suffixes))
+    return slugs
+
+def main():
+    parser = argparse.ArgumentParser(description='slug逐行/整列生成基准测试')
+    parser.add_argument('-n', '--rows', type=int, default=100000, help='合成数据的行数 (默认: 100000)')
+    parser.add_argument('--csv', help='使用已有的CSV文件而不是生成合成数据')
+    parser.add_argument('--strip-suffixes', action='store_true', help='移除常见公司后缀')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_file = args.csv
+        if csv_file is None:
+            csv_file = os.path.join(temp_dir, 'synthetic_companies.csv')
+            print(f"正在生成 {args.rows} 行合成数据...")
+            generate_synthetic_csv(csv_file, args.rows)
+
+        df = pd.read_csv(csv_file, dtype=str)
+    rows = len(df)
+
+    start = time.perf_counter()
+    row_slugs = run_row_mode(df, args.strip_suffixes)
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    column_slugs = generate_slug_column(df['name_en'], df['name'], strip_suffixes=args.strip_suffixes).tolist()
+    column_seconds = time.perf_counter() - start
+
+    print(f"\n=== 基准测试结果 ({rows} 行) ===")
+    print(f"逐行模式: {row_seconds:.2f}s, {rows / row_seconds:,.0f} 行/秒")
+    print(f"整列模式: {column_seconds:.2f}s, {rows / column_seconds:,.0f} 行/秒")
+    print(f"加速比: {row_seconds / column_seconds:.1f}x")
+
+    if [slug.encode('utf-8') for slug in row_slugs] == [slug.encode('utf-8') for slug in column_slugs]:
+        print("✅ 两种方式输出逐字节一致")
+    else:
+        print("❌ 两种方式输出不一致")
+
+if __name__ == '__main__':
+    main()
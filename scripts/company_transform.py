@@ -0,0 +1,274 @@
+import pandas as pd
+from firebase_admin import firestore
+
+# 公司CSV字段 -> Firebase字段（这些字段不应该被分割为数组）
+STRING_FIELDS = {
+    'abn': 'abn',
+    'companyId': 'companyId',  # 添加缺失的companyId字段
+    'name_en': 'name_en',
+    'name_cn': 'name_cn',
+    'name': 'name',
+    'trading name': 'trading_name',  # 添加trading name字段
+    'description': 'description',
+    'shortDescription': 'shortDescription',
+    'fullDescription': 'fullDescription',
+    'logo': 'logo',
+    'website': 'website',
+    'email': 'email',
+    'phone': 'phone',
+    'location': 'location',
+    'foundedYear': 'foundedYear',
+    'teamSize': 'teamSize',
+    'rating': 'rating',
+    'verified': 'verified',
+    'slug': 'slug',
+    'source': 'source',
+    'status': 'status',
+    'industry_1': 'industry_1',  # 添加行业字段
+    'industry_2': 'industry_2',
+    'industry_3': 'industry_3'
+}
+
+# 需要按逗号分割的数组字段
+ARRAY_FIELDS = ['industries', 'languages', 'services']
+
+NULL_TOKENS = ['nan', 'null', 'none', '']
+
+# 列式处理中表示"该字段不写入文档"
+_MISSING = object()
+
+def clean_field(value, is_array_field=False):
+    """
+    清洗字段数据 - 修复版本
+    """
+    if pd.isna(value) or value == '' or value == 'nan':
+        return None
+
+    if isinstance(value, str):
+        # 清理字符串
+        cleaned = value.strip()
+        if cleaned.lower() in NULL_TOKENS:
+            return None
+
+        # 只有明确指定为数组字段时才分割
+        if is_array_field and ',' in cleaned and not cleaned.startswith('http'):
+            return [item.strip() for item in cleaned.split(',') if item.strip()]
+
+        return cleaned
+
+    return value
+
+def coerce_founded_year(value):
+    """
+    foundedYear转换为整数，无法转换时为None
+    """
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return None
+
+def coerce_rating(value):
+    """
+    rating转换为浮点数，无法转换时为0.0
+    """
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+def coerce_verified(value):
+    """
+    verified转换为布尔值
+    """
+    if isinstance(value, str):
+        return value.lower() in ['true', '1', 'yes']
+    return bool(value)
+
+def process_company_data(row):
+    """
+    处理单个公司数据行，转换为Firebase格式 - 修复版本
+    """
+    company_data = {}
+
+    # 处理字符串字段（不分割）
+    for csv_field, firebase_field in STRING_FIELDS.items():
+        if csv_field in row:
+            value = clean_field(row[csv_field], is_array_field=False)
+            if value is not None:
+                company_data[firebase_field] = value
+
+    # 处理数组字段（需要分割）
+    for field in ARRAY_FIELDS:
+        if field in row:
+            value = clean_field(row[field], is_array_field=True)
+            if value is not None:
+                if isinstance(value, list):
+                    company_data[field] = value
+                elif isinstance(value, str):
+                    # 将逗号分隔的字符串转换为数组
+                    company_data[field] = [item.strip() for item in value.split(',') if item.strip()]
+
+    # 特殊处理：将industry_1, industry_2, industry_3合并成industry数组
+    industries = []
+    for i in range(1, 4):
+        industry_field = f'industry_{i}'
+        if industry_field in company_data and company_data[industry_field]:
+            industries.append(company_data[industry_field])
+
+    if industries:
+        company_data['industry'] = industries
+        # 为了兼容性，也保留单独的字段
+        # company_data['industry_1'], company_data['industry_2'], company_data['industry_3'] 已经设置
+
+    # 处理特殊字段
+    if 'foundedYear' in company_data:
+        company_data['foundedYear'] = coerce_founded_year(company_data['foundedYear'])
+
+    if 'rating' in company_data:
+        company_data['rating'] = coerce_rating(company_data['rating'])
+
+    if 'verified' in company_data:
+        company_data['verified'] = coerce_verified(company_data['verified'])
+
+    # 添加时间戳
+    company_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+    if 'createdAt' not in company_data or not company_data['createdAt']:
+        company_data['createdAt'] = firestore.SERVER_TIMESTAMP
+
+    return company_data
+
+def _clean_column(series):
+    """
+    对整列执行clean_field(is_array_field=False)的清洗逻辑
+
+    返回:
+        (values, is_text): values为对象Series，缺失值为None；is_text标记清洗后为字符串的位置
+    """
+    series = series.reset_index(drop=True)
+    na_mask = series.isna()
+
+    try:
+        # 非字符串元素在.str操作后为NaN，借此区分字符串与其他对象
+        stripped = series.str.strip()
+    except AttributeError:
+        # 数值/布尔列：只需要剔除缺失值
+        values = series.astype(object).where(~na_mask, None)
+        return values, pd.Series(False, index=series.index)
+
+    is_text = stripped.notna() & ~na_mask
+    null_token = (is_text & stripped.str.lower().isin(NULL_TOKENS)).astype(bool)
+    is_text = is_text & ~null_token
+
+    values = series.astype(object).where(~na_mask & ~null_token, None)
+    values = values.where(~is_text, stripped.astype(object))
+    return values, is_text
+
+def _split_column(values, is_text):
+    """
+    对数组字段整列分割，得到与逐行处理相同的列表
+    """
+    result = pd.Series(_MISSING, index=values.index, dtype=object)
+    if is_text.any():
+        parts = values[is_text].astype(str).str.split(',')
+        result[is_text] = pd.Series(
+            [[item.strip() for item in items if item.strip()] for items in parts],
+            index=parts.index,
+            dtype=object
+        )
+    return result
+
+def _coerce_column(values, coerce):
+    """
+    对整列应用类型转换，每个不同的取值只转换一次
+
+    返回:
+        (result, failed): 转换后的对象Series，以及转换抛出异常的位置
+    """
+    present = values.notna()
+    result = pd.Series(_MISSING, index=values.index, dtype=object)
+    failed = pd.Series(False, index=values.index)
+    if present.any():
+        subset = values[present]
+        table = {}
+        for value in pd.unique(subset):
+            try:
+                table[value] = coerce(value)
+            except Exception as e:
+                # 保留异常，按逐行处理的语义让该行失败
+                table[value] = e
+        lookup = pd.Series(list(table.values()), index=list(table.keys()), dtype=object)
+        converted = subset.map(lookup)
+        result[present] = converted
+        failed[present] = converted.map(lambda v: isinstance(v, Exception)).astype(bool)
+    return result, failed
+
+def process_companies_frame(df):
+    """
+    列式处理整个DataFrame，转换为Firebase格式
+
+    结果与对每一行调用process_company_data完全一致，但清洗、类型转换和数组分割
+    都按列执行，只在最后一步组装每个文档的字典。
+
+    返回:
+        与df行顺序对应的列表，每个元素是公司数据字典；
+        逐行处理会抛出异常的行，对应位置是该异常对象
+    """
+    row_count = len(df)
+    names = []
+    columns = []
+    industry_columns = []
+    failed = pd.Series(False, index=pd.RangeIndex(row_count))
+    coercions = {
+        'foundedYear': coerce_founded_year,
+        'rating': coerce_rating,
+        'verified': coerce_verified
+    }
+
+    # 处理字符串字段（不分割）
+    for csv_field, firebase_field in STRING_FIELDS.items():
+        if csv_field not in df.columns:
+            continue
+        values, _ = _clean_column(df[csv_field])
+
+        if csv_field.startswith('industry_'):
+            industry_columns.append(values.tolist())
+
+        if csv_field in coercions:
+            values, column_failed = _coerce_column(values, coercions[csv_field])
+            failed |= column_failed
+        else:
+            values = values.where(values.notna(), _MISSING)
+        names.append(firebase_field)
+        columns.append(values.tolist())
+
+    # 处理数组字段（需要分割）
+    for field in ARRAY_FIELDS:
+        if field not in df.columns:
+            continue
+        values, is_text = _clean_column(df[field])
+        names.append(field)
+        columns.append(_split_column(values, is_text).tolist())
+
+    # 合并industry_1, industry_2, industry_3为industry数组
+    if industry_columns:
+        industry_values = [[value for value in row_values if value] for row_values in zip(*industry_columns)]
+    else:
+        industry_values = [[]] * row_count
+
+    # 最后一步才组装每个文档
+    row_values = zip(*columns) if columns else [()] * row_count
+    records = []
+    for values, industries, row_failed in zip(row_values, industry_values, failed.tolist()):
+        if row_failed:
+            records.append(next(value for value in values if isinstance(value, Exception)))
+            continue
+
+        company_data = {name: value for name, value in zip(names, values) if value is not _MISSING}
+        if industries:
+            company_data['industry'] = industries
+
+        company_data['updatedAt'] = firestore.SERVER_TIMESTAMP
+        company_data['createdAt'] = firestore.SERVER_TIMESTAMP
+        records.append(company_data)
+
+    return records
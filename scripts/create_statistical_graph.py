@@ -165,6 +165,10 @@ folium.GeoJson(
 # 添加颜色图例
 colormap.add_to(m)
 
+# 保存带数值的州边界数据，用于发布静态快照（scripts/publish_snapshots.py）
+with open("state_map_data.json", "w", encoding="utf-8") as f:
+    json.dump(australia, f, ensure_ascii=False, default=lambda value: value.item())
+
 # 保存
 m.save("public/australia-map/map.html")
 
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流式分块读取CSV
+只根据字节样本检测一次编码，然后按固定行数分块产出DataFrame，内存占用与文件大小无关。
+"""
+
+import os
+import codecs
+import pandas as pd
+
+# 与各导入脚本原先尝试的编码顺序一致
+CANDIDATE_ENCODINGS = ['utf-8', 'gbk', 'gb2312', 'latin-1', 'cp1252']
+
+DEFAULT_CHUNK_SIZE = 5000
+
+def _decodes(data, encoding, at_start):
+    """
+    判断一段字节能否用指定编码解码
+
+    样本的结尾可能截断多字节字符，所以使用增量解码器且不要求final；
+    文件中间的样本开头也可能落在多字节字符内部，允许跳过最多3个字节。
+    """
+    offsets = [0] if at_start else range(4)
+    for offset in offsets:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(data[offset:], final=False)
+            return True
+        except UnicodeDecodeError:
+            continue
+    return False
+
+def detect_encoding(file_path, encodings=None, sample_size=256 * 1024, samples=8):
+    """
+    从文件的字节样本检测编码，只读取一次样本
+
+    参数:
+        file_path: CSV文件路径
+        encodings: 候选编码列表，按顺序尝试
+        sample_size: 每个样本的字节数
+        samples: 在文件中均匀分布的样本数量（包含文件开头）
+
+    返回:
+        第一个能解码所有样本的编码
+    """
+    encodings = encodings or CANDIDATE_ENCODINGS
+    file_size = os.path.getsize(file_path)
+
+    chunks = []
+    with open(file_path, 'rb') as f:
+        if file_size <= sample_size * samples:
+            chunks.append((f.read(), True))
+        else:
+            step = file_size // samples
+            for i in range(samples):
+                f.seek(i * step)
+                chunks.append((f.read(sample_size), i == 0))
+
+    # 去掉UTF-8 BOM对检测的影响
+    if chunks and chunks[0][0].startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+
+    for encoding in encodings:
+        if all(_decodes(data, encoding, at_start) for data, at_start in chunks):
+            return encoding
+
+    raise UnicodeDecodeError(encodings[-1], b'', 0, 1, f"无法使用候选编码解码文件: {', '.join(encodings)}")
+
+def iter_csv_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE, encoding=None, **read_csv_kwargs):
+    """
+    按固定行数分块读取CSV，每次产出一个DataFrame
+
+    参数:
+        file_path: CSV文件路径
+        chunk_size: 每块的行数
+        encoding: 文件编码，为None时自动检测
+        read_csv_kwargs: 传给pd.read_csv的其他参数
+
+    块的索引在整个文件内连续，与一次性读取时的行号一致。
+    """
+    if encoding is None:
+        encoding = detect_encoding(file_path)
+
+    with pd.read_csv(file_path, encoding=encoding, chunksize=chunk_size, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            yield chunk
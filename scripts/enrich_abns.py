@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bulk ABN Enrichment
+Re-validates the ABNs stored on company records and writes back changed ABR details.
+
+Stages: read export -> normalize + checksum -> fetch details concurrently -> diff -> batched update
+
+Usage:
+    python scripts/enrich_abns.py companies_export.csv --dry-run
+    python scripts/enrich_abns.py companies_export.csv --base-url http://localhost:8765/json --emulator-host localhost:8080
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from csv_stream import iter_csv_chunks
+from firestore_batch_writer import BatchWriter
+from abn_cache import ABNResponseCache, DEFAULT_CACHE_PATH
+from abn_async_client import AsyncABNLookup, DEFAULT_GUID, DEFAULT_BASE_URL, DEFAULT_QPS, DEFAULT_CONCURRENCY
+
+# ABR字段 -> Firestore公司文档字段
+ENRICHMENT_FIELDS = {
+    'AbnStatus': 'abnStatus',
+    'EntityName': 'entityName',
+    'AddressState': 'addressState',
+    'Gst': 'gst',
+}
+
+# ABN校验位算法的权重
+ABN_WEIGHTS = [10, 1, 3, 5, 7, 9, 11, 13, 15, 17, 19]
+
+
+def normalize_abn(value) -> Optional[str]:
+    """把 "56 163 299 769" 之类的ABN规范化为11位数字，格式不对时返回None"""
+    if value is None or pd.isna(value):
+        return None
+    digits = re.sub(r'[\s\-]', '', str(value))
+    if digits.endswith('.0'):
+        digits = digits[:-2]
+    return digits if len(digits) == 11 and digits.isdigit() else None
+
+
+def is_valid_abn(abn: str) -> bool:
+    """
+    ABN校验位检查
+
+    第一位减1，各位乘以权重后求和，能被89整除即有效。
+    """
+    digits = [int(d) for d in abn]
+    digits[0] -= 1
+    return sum(weight * digit for weight, digit in zip(ABN_WEIGHTS, digits)) % 89 == 0
+
+
+def changed_fields(existing: Dict, details: Dict) -> Dict:
+    """比较导出中的现有值与ABR详细信息，只返回变化的字段"""
+    updates = {}
+    for abr_field, field in ENRICHMENT_FIELDS.items():
+        new_value = details.get(abr_field)
+        old_value = existing.get(field)
+        if not isinstance(old_value, str):
+            old_value = None  # CSV中的空值
+        if (old_value or '') != (new_value or ''):
+            updates[field] = new_value
+    return updates
+
+
+class StageTimer:
+    """按阶段统计处理数量和耗时"""
+
+    def __init__(self):
+        self.stages = []
+
+    def run(self, name: str, count: int, seconds: float):
+        self.stages.append((name, count, seconds))
+
+    def report(self):
+        print("\n=== 各阶段吞吐量 ===")
+        for name, count, seconds in self.stages:
+            rate = count / seconds if seconds > 0 else 0.0
+            print(f"{name:<10} {count:>8} 条  {seconds:>7.2f}s  {rate:>10,.0f} 条/秒")
+
+
+def read_export(csv_file: str, id_column: str) -> List[Dict]:
+    """读取公司导出CSV中的document_id、abn和已有的ABR字段"""
+    columns = [id_column, 'abn'] + list(ENRICHMENT_FIELDS.values())
+    records = []
+    for chunk in iter_csv_chunks(csv_file, dtype=str):
+        chunk = chunk.reindex(columns=[column for column in columns if column in chunk.columns])
+        records.extend(chunk.to_dict('records'))
+    return records
+
+
+def validate(records: List[Dict], id_column: str):
+    """
+    规范化ABN并做校验位检查，不发起任何网络请求
+
+    返回:
+        (valid, rejected)；valid为(document_id, abn, record)列表
+    """
+    valid, rejected = [], []
+    for record in records:
+        doc_id = record.get(id_column)
+        raw = record.get('abn')
+        if raw is None or pd.isna(raw) or not str(raw).strip():
+            continue  # 没有ABN的公司不处理
+        if doc_id is None or pd.isna(doc_id):
+            rejected.append({'document_id': '', 'abn': raw, 'reason': f'missing {id_column}'})
+            continue
+
+        abn = normalize_abn(raw)
+        if abn is None:
+            rejected.append({'document_id': doc_id, 'abn': raw, 'reason': 'format'})
+        elif not is_valid_abn(abn):
+            rejected.append({'document_id': doc_id, 'abn': raw, 'reason': 'checksum'})
+        else:
+            valid.append((doc_id, abn, record))
+    return valid, rejected
+
+
+async def fetch_details(lookup: AsyncABNLookup, abns: List[str]) -> Dict[str, Optional[Dict]]:
+    """并发获取所有不同ABN的详细信息"""
+    unique = list(dict.fromkeys(abns))
+    results = await asyncio.gather(*(lookup.fetch_abn_details(abn) for abn in unique))
+    return dict(zip(unique, results))
+
+
+def save_rejected_report(rejected: List[Dict]):
+    """保存被拒绝的ABN"""
+    if not rejected:
+        return None
+    report_file = f"rejected_abns_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    pd.DataFrame(rejected).to_csv(report_file, index=False, encoding='utf-8')
+    return report_file
+
+
+def init_firestore(key: str, emulator_host: str = None):
+    """初始化Firestore客户端，指定emulator_host时连接模拟器"""
+    if emulator_host:
+        os.environ['FIRESTORE_EMULATOR_HOST'] = emulator_host
+        from google.cloud import firestore
+        return firestore.Client(project='qx-net-next-js')
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(key))
+    return firestore.client()
+
+
+async def enrich(args) -> Dict:
+    timer = StageTimer()
+
+    start = time.perf_counter()
+    records = read_export(args.csv_file, args.id_column)
+    timer.run('read', len(records), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    valid, rejected = validate(records, args.id_column)
+    timer.run('validate', len(records), time.perf_counter() - start)
+    print(f"有效ABN: {len(valid)}，拒绝: {len(rejected)}（未发起网络请求）")
+
+    cache = None if args.no_cache else ABNResponseCache(args.cache)
+    start = time.perf_counter()
+    async with AsyncABNLookup(args.guid, base_url=args.base_url, qps=args.qps,
+                              max_concurrency=args.concurrency, cache=cache) as lookup:
+        details = await fetch_details(lookup, [abn for _, abn, _ in valid])
+    timer.run('fetch', len(details), time.perf_counter() - start)
+    print(f"HTTP请求: {lookup.stats['requests']}，重试: {lookup.stats['retries']}，错误: {lookup.stats['errors']}")
+    if cache:
+        print(cache.summary())
+
+    start = time.perf_counter()
+    updates = []
+    for doc_id, abn, record in valid:
+        abn_details = details.get(abn)
+        if not abn_details:
+            rejected.append({'document_id': doc_id, 'abn': record.get('abn'), 'reason': 'lookup failed'})
+            continue
+        fields = changed_fields(record, abn_details)
+        if fields:
+            updates.append((doc_id, fields))
+    timer.run('diff', len(valid), time.perf_counter() - start)
+    print(f"需要更新的公司: {len(updates)}，未变化: {len(valid) - len(updates)}")
+
+    written = 0
+    if updates and not args.dry_run:
+        db = init_firestore(args.key, args.emulator_host)
+        companies_ref = db.collection('companies')
+
+        start = time.perf_counter()
+        with BatchWriter(db, max_in_flight=args.max_in_flight) as writer:
+            for doc_id, fields in updates:
+                writer.update(companies_ref.document(doc_id), fields)
+        timer.run('write', len(updates), time.perf_counter() - start)
+        written = writer.committed_writes
+        if writer.failed_batches:
+            print(f"警告: {len(writer.failed_references)} 个更新失败")
+
+    timer.report()
+    report_file = save_rejected_report(rejected)
+    if report_file:
+        print(f"被拒绝的ABN已保存到: {report_file}")
+
+    return {'records': len(records), 'valid': len(valid), 'rejected': len(rejected),
+            'updates': len(updates), 'written': written}
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='批量校验公司ABN并写回ABR信息')
+    parser.add_argument('csv_file', help='公司导出CSV（包含document_id和abn列）')
+    parser.add_argument('--id-column', default='document_id', help='文档ID列 (默认: document_id)')
+    parser.add_argument('--dry-run', action='store_true', help='只统计变化，不写入Firestore')
+    parser.add_argument('--guid', default=DEFAULT_GUID, help='ABR web services GUID')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='ABR JSON接口地址，测试时指向stub服务器')
+    parser.add_argument('--qps', type=float, default=DEFAULT_QPS, help=f'每秒最多请求数 (默认: {DEFAULT_QPS})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='同时进行的请求数')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='本地响应缓存文件')
+    parser.add_argument('--no-cache', action='store_true', help='不使用本地缓存')
+    parser.add_argument('--max-in-flight', type=int, default=8, help='同时提交的batch数量')
+    parser.add_argument('--key', default='firebase-admin-key.json', help='服务账号json文件路径')
+    parser.add_argument('--emulator-host', help='连接Firestore模拟器，例如 localhost:8080')
+    args = parser.parse_args()
+
+    asyncio.run(enrich(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Firestore并发批量写入器
+所有导入脚本共用：同时保持多个500文档的batch在线程池中提交，而不是逐个串行commit。
+
+本地验证（Firestore模拟器）:
+    firebase emulators:start --only firestore
+    python scripts/firestore_batch_writer.py --emulator-host localhost:8080 --docs 5000
+"""
+
+import os
+import time
+import random
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List
+
+from google.api_core import exceptions as api_exceptions
+
+# Firestore单个batch最多500个写操作
+MAX_BATCH_SIZE = 500
+
+# 可以重试的临时性错误
+RETRYABLE_ERRORS = (
+    api_exceptions.Aborted,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.TooManyRequests,
+    ConnectionError,
+    TimeoutError,
+)
+
+# 延迟直方图的桶上限（秒）
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+class LatencyHistogram:
+    """按固定桶统计batch提交延迟"""
+
+    def __init__(self, buckets: List[float] = None):
+        self.buckets = buckets or LATENCY_BUCKETS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.samples = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """记录一次batch提交耗时"""
+        for i, upper in enumerate(self.buckets):
+            if seconds <= upper:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.samples += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def format(self) -> str:
+        """格式化为文本直方图"""
+        if not self.samples:
+            return "  (no batches)"
+        lines = []
+        peak = max(self.counts)
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            label = f"{lower:>5.2f}s - {self.buckets[i]:>5.2f}s" if i < len(self.buckets) else f"{lower:>5.2f}s -   inf "
+            bar = '#' * (round(count / peak * 40) if peak else 0)
+            lines.append(f"  {label} | {count:>6} {bar}")
+            if i < len(self.buckets):
+                lower = self.buckets[i]
+        lines.append(f"  avg {self.total / self.samples:.3f}s, max {self.max:.3f}s, {self.samples} batches")
+        return '\n'.join(lines)
+
+
+class BatchWriter:
+    """
+    保持最多max_in_flight个batch同时提交的Firestore写入器
+
+    - 内存有界：最多缓存max_in_flight个在途batch加上一个正在填充的batch，超出时阻塞调用方
+    - ordered=True时按提交顺序确认完成（on_commit回调按batch顺序触发），否则谁先完成先确认
+    - 提交失败的batch按指数退避（带抖动）重试，超过max_retries后记录到failed_batches
+    """
+
+    def __init__(self, db, batch_size: int = MAX_BATCH_SIZE, max_in_flight: int = 8,
+                 ordered: bool = False, max_retries: int = 5, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, on_commit: Callable[[int, int], None] = None):
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.db = db
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.ordered = ordered
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.on_commit = on_commit
+
+        self.histogram = LatencyHistogram()
+        self.committed_batches = 0
+        self.committed_writes = 0
+        self.retries = 0
+        self.failed_batches = []  # (batch_number, write_count, error)
+        self.failed_references = []  # 失败batch中所有写操作的文档引用
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='firestore-batch')
+        self._pending = deque()  # (batch_number, operations, future)
+        self._operations = []
+        self._batch_number = 0
+        self._started = time.perf_counter()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def set(self, doc_ref, data: Dict, merge: bool = False):
+        """添加一个set写操作"""
+        self._add(('set', doc_ref, data, merge))
+
+    def update(self, doc_ref, data: Dict):
+        """添加一个update写操作"""
+        self._add(('update', doc_ref, data, None))
+
+    def delete(self, doc_ref):
+        """添加一个delete写操作"""
+        self._add(('delete', doc_ref, None, None))
+
+    def _add(self, operation):
+        if self._closed:
+            raise RuntimeError("BatchWriter is closed")
+        self._operations.append(operation)
+        if len(self._operations) >= self.batch_size:
+            self._submit()
+
+    def _submit(self):
+        """把当前缓存的写操作作为一个batch提交到线程池"""
+        if not self._operations:
+            return
+        operations, self._operations = self._operations, []
+
+        # 在途batch已满时先等待，保证内存有界
+        while len(self._pending) >= self.max_in_flight:
+            self._reap(block=True)
+
+        self._batch_number += 1
+        future = self._executor.submit(self._commit_with_retry, operations)
+        self._pending.append((self._batch_number, operations, future))
+        self._reap(block=False)
+
+    def _commit_with_retry(self, operations) -> tuple:
+        """在工作线程中提交batch，失败时指数退避重试"""
+        attempt = 0
+        while True:
+            # 每次重试都重新构建batch，不依赖已失败batch的内部状态
+            batch = self.db.batch()
+            for kind, doc_ref, data, merge in operations:
+                if kind == 'set':
+                    batch.set(doc_ref, data, merge=merge)
+                elif kind == 'update':
+                    batch.update(doc_ref, data)
+                else:
+                    batch.delete(doc_ref)
+
+            start = time.perf_counter()
+            try:
+                batch.commit()
+                return len(operations), time.perf_counter() - start, attempt
+            except RETRYABLE_ERRORS:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                attempt += 1
+
+    def _reap(self, block: bool):
+        """确认已完成的batch；block=True时至少等待一个batch完成"""
+        if not self._pending:
+            return
+
+        if self.ordered:
+            # 按提交顺序确认：只看最早提交的batch
+            while self._pending:
+                batch_number, operations, future = self._pending[0]
+                if not block and not future.done():
+                    break
+                self._pending.popleft()
+                self._finish(batch_number, operations, future)
+                block = False
+            return
+
+        if block:
+            wait([future for _, _, future in self._pending], return_when=FIRST_COMPLETED)
+        still_pending = deque()
+        for batch_number, operations, future in self._pending:
+            if future.done():
+                self._finish(batch_number, operations, future)
+            else:
+                still_pending.append((batch_number, operations, future))
+        self._pending = still_pending
+
+    def _finish(self, batch_number: int, operations, future):
+        try:
+            write_count, latency, attempts = future.result()
+        except Exception as e:
+            print(f"❌ Batch {batch_number} ({len(operations)} writes) failed: {e}")
+            self.failed_batches.append((batch_number, len(operations), e))
+            self.failed_references.extend(doc_ref for _, doc_ref, _, _ in operations)
+            return
+
+        self.committed_batches += 1
+        self.committed_writes += write_count
+        self.retries += attempts
+        self.histogram.record(latency)
+        if self.on_commit:
+            self.on_commit(batch_number, write_count)
+
+    def flush(self):
+        """提交剩余写操作并等待所有在途batch完成"""
+        self._submit()
+        while self._pending:
+            self._reap(block=True)
+
+    def close(self) -> Dict:
+        """刷新并关闭线程池，返回统计信息"""
+        if self._closed:
+            return self.stats()
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self._closed = True
+        return self.stats()
+
+    def stats(self) -> Dict:
+        """返回写入统计"""
+        elapsed = time.perf_counter() - self._started
+        return {
+            'committed_batches': self.committed_batches,
+            'committed_writes': self.committed_writes,
+            'failed_batches': len(self.failed_batches),
+            'failed_writes': sum(count for _, count, _ in self.failed_batches),
+            'retries': self.retries,
+            'elapsed_seconds': elapsed,
+            'writes_per_second': self.committed_writes / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def report(self):
+        """打印写入统计和每个batch的延迟直方图"""
+        stats = self.stats()
+        print(f"Batches committed: {stats['committed_batches']}, failed: {stats['failed_batches']}, retries: {stats['retries']}")
+        print(f"Writes committed: {stats['committed_writes']} in {stats['elapsed_seconds']:.2f}s "
+              f"({stats['writes_per_second']:.0f} writes/s, {self.max_in_flight} batches in flight)")
+        print("Batch commit latency:")
+        print(self.histogram.format())
+
+
+def main():
+    """在Firestore模拟器上写入并校验一组合成文档"""
+    parser = argparse.ArgumentParser(description='BatchWriter smoke test against the Firestore emulator')
+    parser.add_argument('--emulator-host', default=os.environ.get('FIRESTORE_EMULATOR_HOST', 'localhost:8080'),
+                        help='Firestore emulator host (默认: localhost:8080)')
+    parser.add_argument('--project', default='qx-net-next-js', help='项目ID')
+    parser.add_argument('--collection', default='batch_writer_smoke_test', help='写入的集合名称')
+    parser.add_argument('--docs', type=int, default=5000, help='写入的文档数量')
+    parser.add_argument('--in-flight', type=int, default=8, help='同时提交的batch数量')
+    parser.add_argument('--ordered', action='store_true', help='按提交顺序确认batch')
+    args = parser.parse_args()
+
+    # 只允许连接模拟器，避免误写生产数据库
+    os.environ['FIRESTORE_EMULATOR_HOST'] = args.emulator_host
+    from google.cloud import firestore
+    db = firestore.Client(project=args.project)
+    collection = db.collection(args.collection)
+
+    print(f"Writing {args.docs} documents to {args.emulator_host}/{args.collection}...")
+    with BatchWriter(db, max_in_flight=args.in_flight, ordered=args.ordered) as writer:
+        for i in range(args.docs):
+            writer.set(collection.document(f'doc_{i:07d}'), {'index': i, 'payload': 'x' * 64})
+    writer.report()
+
+    count = sum(1 for _ in collection.select([]).stream())
+    print(f"Documents found: {count}")
+
+    with BatchWriter(db, max_in_flight=args.in_flight) as cleaner:
+        for doc in collection.select([]).stream():
+            cleaner.delete(doc.reference)
+
+    if count == args.docs and not writer.failed_batches:
+        print("✅ Emulator smoke test passed")
+    else:
+        print("❌ Emulator smoke test failed")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Firestore集合清空工具
+用游标分页读取文档ID，通过批量写入删除；可按分区把键空间拆给多个线程并行删除。
+
+用法:
+    python scripts/firestore_purge.py companies offices services history --workers 8
+    python scripts/firestore_purge.py companies --dry-run
+"""
+
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from firestore_batch_writer import BatchWriter
+
+DEFAULT_PAGE_SIZE = 500
+
+def _partition_queries(db, collection_name: str, workers: int) -> List:
+    """
+    把集合的键空间拆成最多workers个不重叠的查询
+
+    使用Firestore分区查询获得按文档ID划分的游标；集合很小或不支持分区时退回单个查询。
+    分区查询基于collection group，会遍历到同名子集合中的文档，由_purge_shard跳过。
+    """
+    if workers > 1:
+        try:
+            partitions = list(db.collection_group(collection_name).get_partitions(workers))
+            if len(partitions) > 1:
+                return [partition.query() for partition in partitions]
+        except Exception as e:
+            print(f"⚠️  {collection_name}: 无法获取分区，使用单线程删除 ({e})")
+    return [db.collection(collection_name).order_by('__name__')]
+
+def _purge_shard(db, collection_name: str, query, page_size: int, dry_run: bool, max_in_flight: int) -> int:
+    """
+    按游标分页遍历一个分区，删除其中属于顶层集合collection_name的文档，返回文档数量
+
+    同名子集合（例如 companies/{id}/services）中的文档只用于推进游标，不会删除
+    """
+    count = 0
+    last = None
+    writer = None if dry_run else BatchWriter(db, batch_size=page_size, max_in_flight=max_in_flight)
+    try:
+        while True:
+            # 只读取文档ID，不读取字段
+            page_query = query.select([]).limit(page_size)
+            if last is not None:
+                page_query = page_query.start_after(last)
+            page = list(page_query.stream())
+            if not page:
+                break
+
+            for doc in page:
+                # 子集合的parent是所属文档，顶层集合的parent为None
+                if doc.reference.parent.parent is not None:
+                    continue
+                if writer is not None:
+                    writer.delete(doc.reference)
+                count += 1
+            last = page[-1]
+
+            if len(page) < page_size:
+                break
+    finally:
+        if writer is not None:
+            writer.close()
+            if writer.failed_batches:
+                raise RuntimeError(f"{len(writer.failed_references)} deletes failed")
+    return count
+
+def purge_collection(db, collection_name: str, workers: int = 4, page_size: int = DEFAULT_PAGE_SIZE,
+                     dry_run: bool = False, max_in_flight: int = 2) -> Dict:
+    """
+    清空一个集合
+
+    参数:
+        db: Firestore客户端
+        collection_name: 集合名称
+        workers: 并行删除的分区数量
+        page_size: 每页读取/每个batch删除的文档数量
+        dry_run: 只统计文档数量，不删除
+        max_in_flight: 每个分区同时提交的batch数量
+
+    返回:
+        {'collection', 'documents', 'seconds', 'docs_per_second', 'dry_run'}
+    """
+    start = time.perf_counter()
+    queries = _partition_queries(db, collection_name, workers)
+
+    if len(queries) == 1:
+        counts = [_purge_shard(db, collection_name, queries[0], page_size, dry_run, max_in_flight)]
+    else:
+        with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix=f'purge-{collection_name}') as executor:
+            futures = [executor.submit(_purge_shard, db, collection_name, query, page_size, dry_run, max_in_flight) for query in queries]
+            counts = [future.result() for future in futures]
+
+    seconds = time.perf_counter() - start
+    documents = sum(counts)
+    result = {
+        'collection': collection_name,
+        'documents': documents,
+        'shards': len(queries),
+        'seconds': seconds,
+        'docs_per_second': documents / seconds if seconds > 0 else 0.0,
+        'dry_run': dry_run,
+    }
+    action = "将删除" if dry_run else "已删除"
+    print(f"{collection_name}: {action} {documents} 条记录 "
+          f"({len(queries)} 个分区, {seconds:.2f}s, {result['docs_per_second']:.0f} 条/秒)")
+    return result
+
+def purge_collections(db, collection_names: List[str], **kwargs) -> List[Dict]:
+    """依次清空多个集合，每个集合内部并行"""
+    return [purge_collection(db, name, **kwargs) for name in collection_names]
+
+def main():
+    parser = argparse.ArgumentParser(description='批量清空Firestore集合')
+    parser.add_argument('collections', nargs='+', help='要清空的集合名称')
+    parser.add_argument('-w', '--workers', type=int, default=4, help='每个集合的并行分区数 (默认: 4)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='每页文档数 (默认: 500)')
+    parser.add_argument('--dry-run', action='store_true', help='只统计，不删除')
+    parser.add_argument('--key', default='firebase-admin-key.json', help='服务账号json文件路径')
+    parser.add_argument('--emulator-host', help='连接Firestore模拟器，例如 localhost:8080')
+    args = parser.parse_args()
+
+    if args.emulator_host:
+        os.environ['FIRESTORE_EMULATOR_HOST'] = args.emulator_host
+        from google.cloud import firestore
+        db = firestore.Client(project='qx-net-next-js')
+    else:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate(args.key))
+        db = firestore.client()
+
+    if not args.dry_run:
+        response = input(f"确定要删除集合 {', '.join(args.collections)} 中的所有数据吗？(y/n): ")
+        if response.lower() != 'y':
+            print("取消操作")
+            return
+
+    results = purge_collections(db, args.collections, workers=args.workers,
+                                page_size=args.page_size, dry_run=args.dry_run)
+    total = sum(result['documents'] for result in results)
+    seconds = sum(result['seconds'] for result in results)
+    print(f"\n总计: {total} 条记录, {seconds:.2f}s")
+
+if __name__ == "__main__":
+    main()
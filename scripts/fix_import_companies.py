@@ -4,6 +4,11 @@ import pandas as pd
 import os
 import json
 from datetime import datetime
+from firestore_batch_writer import BatchWriter
+from csv_stream import detect_encoding, iter_csv_chunks, DEFAULT_CHUNK_SIZE
+from company_transform import process_company_data, process_companies_frame
+from import_manifest import ImportManifest
+from firestore_purge import purge_collection
 
 # 直接指定服务账号json文件路径
 SERVICE_ACCOUNT_PATH = 'firebase-admin-key.json'
@@ -14,157 +19,56 @@ if not firebase_admin._apps:
     firebase_admin.initialize_app(cred)
 db = firestore.client()
 
-def clean_field(value, is_array_field=False):
-    """
-    清洗字段数据 - 修复版本
-    """
-    if pd.isna(value) or value == '' or value == 'nan':
-        return None
-    
-    if isinstance(value, str):
-        # 清理字符串
-        cleaned = value.strip()
-        if cleaned.lower() in ['nan', 'null', 'none', '']:
-            return None
-        
-        # 只有明确指定为数组字段时才分割
-        if is_array_field and ',' in cleaned and not cleaned.startswith('http'):
-            return [item.strip() for item in cleaned.split(',') if item.strip()]
-        
-        return cleaned
-    
-    return value
-
-def process_company_data(row):
-    """
-    处理单个公司数据行，转换为Firebase格式 - 修复版本
-    """
-    company_data = {}
-    
-    # 基础字段映射（这些字段不应该被分割为数组）
-    string_fields = {
-        'abn': 'abn',
-        'companyId': 'companyId',  # 添加缺失的companyId字段
-        'name_en': 'name_en',
-        'name_cn': 'name_cn', 
-        'name': 'name',
-        'trading name': 'trading_name',  # 添加trading name字段
-        'description': 'description',
-        'shortDescription': 'shortDescription',
-        'fullDescription': 'fullDescription',
-        'logo': 'logo',
-        'website': 'website',
-        'email': 'email',
-        'phone': 'phone',
-        'location': 'location',
-        'foundedYear': 'foundedYear',
-        'teamSize': 'teamSize',
-        'rating': 'rating',
-        'verified': 'verified',
-        'slug': 'slug',
-        'source': 'source',
-        'status': 'status',
-        'industry_1': 'industry_1',  # 添加行业字段
-        'industry_2': 'industry_2',
-        'industry_3': 'industry_3'
-    }
-    
-    # 处理字符串字段（不分割）
-    for csv_field, firebase_field in string_fields.items():
-        if csv_field in row:
-            value = clean_field(row[csv_field], is_array_field=False)
-            if value is not None:
-                company_data[firebase_field] = value
-    
-    # 处理数组字段（需要分割）
-    array_fields = ['industries', 'languages', 'services']
-    for field in array_fields:
-        if field in row:
-            value = clean_field(row[field], is_array_field=True)
-            if value is not None:
-                if isinstance(value, list):
-                    company_data[field] = value
-                elif isinstance(value, str):
-                    # 将逗号分隔的字符串转换为数组
-                    company_data[field] = [item.strip() for item in value.split(',') if item.strip()]
-    
-    # 特殊处理：将industry_1, industry_2, industry_3合并成industry数组
-    industries = []
-    for i in range(1, 4):
-        industry_field = f'industry_{i}'
-        if industry_field in company_data and company_data[industry_field]:
-            industries.append(company_data[industry_field])
-    
-    if industries:
-        company_data['industry'] = industries
-        # 为了兼容性，也保留单独的字段
-        # company_data['industry_1'], company_data['industry_2'], company_data['industry_3'] 已经设置
-    
-    # 处理特殊字段
-    if 'foundedYear' in company_data:
-        try:
-            company_data['foundedYear'] = int(float(company_data['foundedYear']))
-        except (ValueError, TypeError):
-            company_data['foundedYear'] = None
-    
-    if 'rating' in company_data:
-        try:
-            company_data['rating'] = float(company_data['rating'])
-        except (ValueError, TypeError):
-            company_data['rating'] = 0.0
-    
-    if 'verified' in company_data:
-        if isinstance(company_data['verified'], str):
-            company_data['verified'] = company_data['verified'].lower() in ['true', '1', 'yes']
-        else:
-            company_data['verified'] = bool(company_data['verified'])
-    
-    # 添加时间戳
-    company_data['updatedAt'] = firestore.SERVER_TIMESTAMP
-    if 'createdAt' not in company_data or not company_data['createdAt']:
-        company_data['createdAt'] = firestore.SERVER_TIMESTAMP
-    
-    return company_data
+# 增量导入清单：document_id -> 上次写入的文档内容哈希
+MANIFEST_PATH = 'companies_import_manifest.json'
 
 def clear_existing_data():
     """
     清空现有的companies集合数据
     """
     print("正在清空现有数据...")
-    companies_ref = db.collection('companies')
-    
-    # 分批删除文档
-    batch_size = 500
-    docs = companies_ref.limit(batch_size).stream()
-    deleted = 0
     
-    while True:
-        batch = db.batch()
-        docs_to_delete = []
-        
-        for doc in docs:
-            docs_to_delete.append(doc)
-            if len(docs_to_delete) >= batch_size:
-                break
-        
-        if not docs_to_delete:
-            break
-        
-        for doc in docs_to_delete:
-            batch.delete(doc.reference)
-        
-        batch.commit()
-        deleted += len(docs_to_delete)
-        print(f"已删除 {deleted} 条记录...")
-        
-        # 获取下一批
-        docs = companies_ref.limit(batch_size).stream()
+    # 游标分页读取文档ID，批量删除，按分区并行
+    result = purge_collection(db, 'companies')
     
-    print(f"清空完成，共删除 {deleted} 条记录")
+    print(f"清空完成，共删除 {result['documents']} 条记录")
+
+def iter_company_rows(chunks, columnar=True):
+    """
+    逐块转换公司数据，产出(行号, document_id, 公司数据)
+
+    列式模式下，无法转换的行对应的公司数据是异常对象
+    """
+    for chunk in chunks:
+        if columnar:
+            # 列式转换：整列清洗、类型转换、分割数组，最后才组装文档
+            doc_ids = chunk['document_id'].tolist() if 'document_id' in chunk.columns else [None] * len(chunk)
+            yield from zip(chunk.index, doc_ids, process_companies_frame(chunk))
+        else:
+            for index, row in chunk.iterrows():
+                try:
+                    company_data = process_company_data(row)
+                except Exception as e:
+                    company_data = e
+                yield index, row.get('document_id'), company_data
 
-def import_companies_to_firebase(csv_file=None, batch_size=500, clear_data=False):
+def import_companies_to_firebase(csv_file=None, batch_size=500, clear_data=False, columnar=True, max_in_flight=8,
+                                 chunk_size=DEFAULT_CHUNK_SIZE, delta=False, delete_missing=False,
+                                 manifest_path=MANIFEST_PATH):
     """
     将CSV文件中的公司数据导入到Firebase - 修复版本
+
+    CSV按chunk_size行分块流式读取，每块转换后立即进入批量写入，内存占用与文件大小无关。
+    所有列按字符串读取，保证各块的字段类型一致。
+
+    参数:
+        columnar: 为True时按列批量转换每个数据块（process_companies_frame），
+                  否则逐行调用process_company_data；两种模式输出完全一致
+        max_in_flight: 同时提交的batch数量
+        chunk_size: 每次读取的行数
+        delta: 增量模式，只写入相对本地清单新增或内容变化的文档
+        delete_missing: 增量模式下，删除清单中有但CSV中已不存在的文档
+        manifest_path: 增量清单文件路径
     """
     try:
         # 设置默认CSV文件路径
@@ -179,120 +83,130 @@ def import_companies_to_firebase(csv_file=None, batch_size=500, clear_data=False
         
         print(f"正在读取CSV文件: {csv_file}")
         
-        # 尝试不同编码读取CSV
-        encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(csv_file, encoding=encoding)
-                print(f"成功使用 {encoding} 编码读取文件")
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if df is None:
+        # 从字节样本检测一次编码
+        try:
+            encoding = detect_encoding(csv_file)
+        except UnicodeDecodeError:
             print("错误: 无法读取CSV文件")
             return
+        print(f"检测到文件编码: {encoding}")
         
-        print(f"找到 {len(df)} 条公司记录")
+        # 增量清单：完整导入时也记录哈希，供之后的增量运行比较
+        manifest = ImportManifest(manifest_path)
         
         # 如果需要清空现有数据
         if clear_data:
             clear_existing_data()
+            manifest.clear()
         
         # 获取Firebase中的companies集合
         companies_ref = db.collection('companies')
         
-        # 批量处理数据
-        batch = db.batch()
-        batch_count = 0
+        # 批量处理数据：多个batch并发提交
+        writer = BatchWriter(
+            db,
+            batch_size=batch_size,
+            max_in_flight=max_in_flight,
+            on_commit=lambda batch_number, count: print(f"已上传 {writer.committed_writes} 条记录...")
+        )
+        total_count = 0
         processed_count = 0
-        success_count = 0
         error_count = 0
+        missing_id_count = 0
         
         print("开始上传数据到Firebase...")
         
-        for index, row in df.iterrows():
+        chunks = iter_csv_chunks(csv_file, chunk_size=chunk_size, encoding=encoding, dtype=str)
+        for index, doc_id, company_data in iter_company_rows(chunks, columnar=columnar):
+            total_count += 1
             try:
                 # 获取文档ID
-                doc_id = row.get('document_id')
                 if pd.isna(doc_id) or not doc_id:
                     # 如果没有document_id，跳过这条记录
                     print(f"跳过第 {index + 1} 条记录: 缺少document_id")
+                    missing_id_count += 1
                     continue
                 
-                # 处理公司数据
-                company_data = process_company_data(row)
+                # 处理公司数据；转换失败的行仍在CSV中，不能当作已删除
+                if isinstance(company_data, Exception):
+                    manifest.mark_seen(doc_id)
+                    raise company_data
+                
+                # 增量模式：内容未变化的文档不写入
+                action = manifest.classify(doc_id, company_data)
+                if delta and action == 'skip':
+                    continue
                 
                 # 添加到批次
                 doc_ref = companies_ref.document(str(doc_id))
-                batch.set(doc_ref, company_data)  # 使用set而不是merge，完全替换
-                
-                batch_count += 1
+                writer.set(doc_ref, company_data)  # 使用set而不是merge，完全替换
                 processed_count += 1
                 
-                # 当批次达到指定大小时提交
-                if batch_count >= batch_size:
-                    batch.commit()
-                    success_count += batch_count
-                    print(f"已上传 {success_count} 条记录...")
-                    
-                    # 重置批次
-                    batch = db.batch()
-                    batch_count = 0
-                
                 # 显示进度
                 if processed_count % 100 == 0:
-                    print(f"已处理 {processed_count}/{len(df)} 条记录")
+                    print(f"已处理 {processed_count} 条记录")
                     
             except Exception as e:
                 error_count += 1
                 print(f"处理第 {index + 1} 条记录时出错: {e}")
                 continue
         
-        # 提交剩余的批次
-        if batch_count > 0:
-            batch.commit()
-            success_count += batch_count
-            print(f"已上传最后 {batch_count} 条记录")
+        # 增量模式：删除CSV中已不存在的文档
+        # 有缺少document_id的行时无法确定它们对应哪些文档，这次不删除
+        if delta and delete_missing and missing_id_count:
+            print(f"⚠️  {missing_id_count} 条记录缺少document_id，本次跳过删除")
+        elif delta and delete_missing:
+            for doc_id in manifest.missing():
+                writer.delete(companies_ref.document(doc_id))
+                manifest.mark_deleted(doc_id)
+        
+        # 提交剩余的批次并等待所有在途batch完成
+        stats = writer.close()
+        success_count = stats['committed_writes']
+        error_count += stats['failed_writes']
         
         print(f"\n=== 导入完成 ===")
-        print(f"总记录数: {len(df)}")
+        print(f"总记录数: {total_count}")
         print(f"处理成功: {success_count}")
         print(f"处理失败: {error_count}")
-        print(f"跳过记录: {len(df) - processed_count}")
+        print(f"跳过记录: {total_count - processed_count}")
+        writer.report()
         
-        # 验证导入结果
-        print("\n正在验证导入结果...")
-        companies_snapshot = companies_ref.get()
-        total_companies = len(companies_snapshot)
-        print(f"Firebase中现有公司总数: {total_companies}")
+        # 只记录成功写入的文档，失败的下次运行会重新写入
+        manifest.commit(failed_ids=[doc_ref.id for doc_ref in writer.failed_references])
+        
+        if delta:
+            print(f"\n=== 增量统计 ===")
+            manifest.summary()
+            print(f"写入次数: {success_count} / {total_count} 条记录")
+            # 增量模式不再逐个读取整个集合做校验
+            return
         
-        # 检查slug字段
+        # 验证导入结果（流式遍历，不把整个集合载入内存）
+        print("\n正在验证导入结果...")
+        total_companies = 0
         companies_with_slug = 0
         companies_with_description = 0
+        problematic_docs = 0
         
-        for doc in companies_snapshot:
+        for doc in companies_ref.stream():
+            total_companies += 1
             doc_data = doc.to_dict()
             if 'slug' in doc_data:
                 companies_with_slug += 1
             if 'fullDescription' in doc_data and doc_data['fullDescription']:
                 companies_with_description += 1
-        
-        print(f"包含slug字段的公司数量: {companies_with_slug}")
-        print(f"包含fullDescription的公司数量: {companies_with_description}")
-        
-        # 检查是否有被错误分割的description
-        print("\n检查description字段格式...")
-        problematic_docs = 0
-        for doc in companies_snapshot:
-            doc_data = doc.to_dict()
+            # 检查是否有被错误分割的description
             if 'fullDescription' in doc_data and isinstance(doc_data['fullDescription'], list):
                 problematic_docs += 1
                 if problematic_docs <= 3:  # 只显示前3个示例
                     print(f"发现问题文档 {doc.id}: fullDescription是数组格式")
         
+        print(f"Firebase中现有公司总数: {total_companies}")
+        print(f"包含slug字段的公司数量: {companies_with_slug}")
+        print(f"包含fullDescription的公司数量: {companies_with_description}")
+        
+        print("\n检查description字段格式...")
         if problematic_docs == 0:
             print("✅ 所有description字段格式正确")
         else:
@@ -311,9 +225,19 @@ def main():
     print("此脚本将修复description字段被错误分割的问题")
     print()
     
-    # 询问是否清空现有数据
-    clear_response = input("是否清空现有数据重新导入？(y/n): ")
-    clear_data = clear_response.lower() == 'y'
+    # 询问是否使用增量模式
+    delta_response = input("是否使用增量模式（只写入新增或变化的公司）？(y/n): ")
+    delta = delta_response.lower() == 'y'
+    delete_missing = False
+    clear_data = False
+    
+    if delta:
+        delete_response = input("是否删除CSV中已不存在的公司？(y/n): ")
+        delete_missing = delete_response.lower() == 'y'
+    else:
+        # 询问是否清空现有数据
+        clear_response = input("是否清空现有数据重新导入？(y/n): ")
+        clear_data = clear_response.lower() == 'y'
     
     if clear_data:
         print("⚠️  警告：这将删除所有现有的公司数据！")
@@ -329,7 +253,7 @@ def main():
         return
     
     # 开始导入
-    import_companies_to_firebase(clear_data=clear_data)
+    import_companies_to_firebase(clear_data=clear_data, delta=delta, delete_missing=delete_missing)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -4,6 +4,8 @@ import pandas as pd
 import os
 import json
 from datetime import datetime
+from firestore_batch_writer import BatchWriter
+from csv_stream import detect_encoding, iter_csv_chunks, DEFAULT_CHUNK_SIZE
 
 # 直接指定服务账号json文件路径
 SERVICE_ACCOUNT_PATH = 'firebase-admin-key.json'
@@ -109,9 +111,16 @@ def process_company_data(row):
     
     return company_data
 
-def import_companies_to_firebase(csv_file=None, batch_size=500):
+def import_companies_to_firebase(csv_file=None, batch_size=500, max_in_flight=8, chunk_size=DEFAULT_CHUNK_SIZE):
     """
     将CSV文件中的公司数据导入到Firebase
+
+    CSV按chunk_size行分块流式读取，每块处理后立即进入批量写入，内存占用与文件大小无关。
+    所有列按字符串读取，保证各块的字段类型一致。
+
+    参数:
+        max_in_flight: 同时提交的batch数量
+        chunk_size: 每次读取的行数
     """
     try:
         # 设置默认CSV文件路径
@@ -126,37 +135,34 @@ def import_companies_to_firebase(csv_file=None, batch_size=500):
         
         print(f"正在读取CSV文件: {csv_file}")
         
-        # 尝试不同编码读取CSV
-        encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(csv_file, encoding=encoding)
-                print(f"成功使用 {encoding} 编码读取文件")
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if df is None:
+        # 从字节样本检测一次编码
+        try:
+            encoding = detect_encoding(csv_file)
+        except UnicodeDecodeError:
             print("错误: 无法读取CSV文件")
             return
-        
-        print(f"找到 {len(df)} 条公司记录")
+        print(f"检测到文件编码: {encoding}")
         
         # 获取Firebase中的companies集合
         companies_ref = db.collection('companies')
         
-        # 批量处理数据
-        batch = db.batch()
-        batch_count = 0
+        # 批量处理数据：多个batch并发提交
+        writer = BatchWriter(
+            db,
+            batch_size=batch_size,
+            max_in_flight=max_in_flight,
+            on_commit=lambda batch_number, count: print(f"已上传 {writer.committed_writes} 条记录...")
+        )
+        total_count = 0
         processed_count = 0
-        success_count = 0
         error_count = 0
         
         print("开始上传数据到Firebase...")
         
-        for index, row in df.iterrows():
+        chunks = iter_csv_chunks(csv_file, chunk_size=chunk_size, encoding=encoding, dtype=str)
+        rows = ((index, row) for chunk in chunks for index, row in chunk.iterrows())
+        for index, row in rows:
+            total_count += 1
             try:
                 # 获取文档ID
                 doc_id = row.get('document_id')
@@ -170,54 +176,42 @@ def import_companies_to_firebase(csv_file=None, batch_size=500):
                 
                 # 添加到批次
                 doc_ref = companies_ref.document(str(doc_id))
-                batch.set(doc_ref, company_data, merge=True)
-                
-                batch_count += 1
+                writer.set(doc_ref, company_data, merge=True)
                 processed_count += 1
                 
-                # 当批次达到指定大小时提交
-                if batch_count >= batch_size:
-                    batch.commit()
-                    success_count += batch_count
-                    print(f"已上传 {success_count} 条记录...")
-                    
-                    # 重置批次
-                    batch = db.batch()
-                    batch_count = 0
-                
                 # 显示进度
                 if processed_count % 100 == 0:
-                    print(f"已处理 {processed_count}/{len(df)} 条记录")
+                    print(f"已处理 {processed_count} 条记录")
                     
             except Exception as e:
                 error_count += 1
                 print(f"处理第 {index + 1} 条记录时出错: {e}")
                 continue
         
-        # 提交剩余的批次
-        if batch_count > 0:
-            batch.commit()
-            success_count += batch_count
-            print(f"已上传最后 {batch_count} 条记录")
+        # 提交剩余的批次并等待所有在途batch完成
+        stats = writer.close()
+        success_count = stats['committed_writes']
+        error_count += stats['failed_writes']
         
         print(f"\n=== 导入完成 ===")
-        print(f"总记录数: {len(df)}")
+        print(f"总记录数: {total_count}")
         print(f"处理成功: {success_count}")
         print(f"处理失败: {error_count}")
-        print(f"跳过记录: {len(df) - processed_count}")
+        print(f"跳过记录: {total_count - processed_count}")
+        writer.report()
         
         # 验证导入结果
         print("\n正在验证导入结果...")
-        companies_snapshot = companies_ref.get()
-        total_companies = len(companies_snapshot)
-        print(f"Firebase中现有公司总数: {total_companies}")
-        
-        # 检查slug字段
+        total_companies = 0
         companies_with_slug = 0
-        for doc in companies_snapshot:
+        
+        # 流式遍历检查slug字段，不把整个集合载入内存
+        for doc in companies_ref.stream():
+            total_companies += 1
             if 'slug' in doc.to_dict():
                 companies_with_slug += 1
         
+        print(f"Firebase中现有公司总数: {total_companies}")
         print(f"包含slug字段的公司数量: {companies_with_slug}")
         
     except Exception as e:
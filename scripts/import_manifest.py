@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+增量导入清单
+在本地记录 document_id -> 规范化文档内容的哈希，用来判断哪些文档需要写入Firestore。
+"""
+
+import os
+import json
+import hashlib
+from firebase_admin import firestore
+
+def document_hash(data):
+    """
+    计算文档内容的哈希
+
+    SERVER_TIMESTAMP等服务器端取值不属于文档内容，不参与哈希；
+    键排序后序列化，字段顺序不同的相同文档得到相同的哈希。
+    """
+    content = {key: value for key, value in data.items() if value is not firestore.SERVER_TIMESTAMP}
+    serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+class ImportManifest:
+    """
+    document_id -> 内容哈希的本地清单
+
+    classify()对每个输入文档给出insert/update/skip，
+    missing()返回清单中存在但本次输入没有出现的文档ID。
+    清单只在确认写入成功后通过commit()更新。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hashes = {}
+        self.seen = set()
+        self.pending = {}  # 本次需要写入的 document_id -> 新哈希（None表示删除）
+        self.counts = {'insert': 0, 'update': 0, 'delete': 0, 'skip': 0}
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.hashes = json.load(f)
+
+    def classify(self, doc_id, data):
+        """
+        判断文档相对清单是新增、修改还是未变
+
+        返回:
+            'insert'、'update'或'skip'
+        """
+        doc_id = str(doc_id)
+        self.seen.add(doc_id)
+        new_hash = document_hash(data)
+        old_hash = self.hashes.get(doc_id)
+
+        if old_hash == new_hash:
+            action = 'skip'
+        else:
+            action = 'insert' if old_hash is None else 'update'
+            self.pending[doc_id] = new_hash
+        self.counts[action] += 1
+        return action
+
+    def mark_seen(self, doc_id):
+        """记录本次输入中出现、但无法比较内容的文档（例如转换失败的行），missing()不会把它当作已删除"""
+        self.seen.add(str(doc_id))
+
+    def missing(self):
+        """清单中有、本次输入中没有的文档ID"""
+        return [doc_id for doc_id in self.hashes if doc_id not in self.seen]
+
+    def mark_deleted(self, doc_id):
+        """记录一个待删除的文档"""
+        self.pending[str(doc_id)] = None
+        self.counts['delete'] += 1
+
+    def commit(self, failed_ids=()):
+        """
+        把成功写入的变更合并进清单并保存
+
+        参数:
+            failed_ids: 写入失败的文档ID，保持原有哈希，下次运行会重新写入
+        """
+        failed_ids = set(failed_ids)
+        for doc_id, new_hash in self.pending.items():
+            if doc_id in failed_ids:
+                continue
+            if new_hash is None:
+                self.hashes.pop(doc_id, None)
+            else:
+                self.hashes[doc_id] = new_hash
+        self.pending = {}
+        self.save()
+
+    def clear(self):
+        """清空清单（例如集合被整体清空后）"""
+        self.hashes = {}
+        self.save()
+
+    def save(self):
+        """原子写入清单文件"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.hashes, f, ensure_ascii=False, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def summary(self):
+        """打印本次运行的增量统计"""
+        print(f"新增: {self.counts['insert']}")
+        print(f"更新: {self.counts['update']}")
+        print(f"删除: {self.counts['delete']}")
+        print(f"未变跳过: {self.counts['skip']}")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+行业数据可视化的预聚合数据立方体
+在816502工作簿处理之后，按 年份 × 行业、年份 × 州、年份 × 员工规模 以及四个维度的完整组合预先汇总，
+每个立方体保存为一个紧凑的列式文档（维度值字典 + 整数编码 + 指标数组），
+页面只需读取少数几个小文档，不再扫描逐行的原始记录。
+"""
+
+import os
+import json
+import pandas as pd
+from firestore_batch_writer import BatchWriter
+
+MEASURES = ['entry_count', 'exit_count', 'net_change', 'final_count']
+
+# 立方体ID -> 维度
+CUBES = {
+    'year_industry': ['year', 'industry'],
+    'year_state': ['year', 'state'],
+    'year_employee_category': ['year', 'employee_category'],
+    'full': ['year', 'industry', 'state', 'employee_category'],
+}
+
+# 完整组合的行数与原始记录相当，按年份拆分成多个文档，避免超过Firestore单个文档1 MiB的限制
+SHARDED_CUBES = {'full': 'year'}
+
+CUBE_COLLECTION = 'industry_visualization_cubes'
+CUBE_OUTPUT_DIR = 'public/data/industry-cubes'
+
+# Firestore单个文档的大小上限
+FIRESTORE_DOCUMENT_LIMIT = 1024 * 1024
+
+def _compact_number(value):
+    """整数值的浮点数输出为整数，减小文档体积"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+def build_cube(df, dimensions):
+    """
+    按dimensions汇总指标，返回列式文档
+
+    返回:
+        {
+            'dimensions': 维度列表,
+            'values': {维度: 排序后的取值列表},
+            'keys': {维度: 每行取值在values中的下标},
+            'measures': {指标: 每行的汇总值},
+            'rows': 行数,
+        }
+    """
+    grouped = df.groupby(dimensions, sort=True)[MEASURES].sum().reset_index()
+
+    values = {}
+    keys = {}
+    for dimension in dimensions:
+        codes, uniques = pd.factorize(grouped[dimension], sort=True)
+        values[dimension] = [value.item() if hasattr(value, 'item') else value for value in uniques]
+        keys[dimension] = codes.tolist()
+
+    return {
+        'dimensions': dimensions,
+        'values': values,
+        'keys': keys,
+        'measures': {measure: [_compact_number(value) for value in grouped[measure]] for measure in MEASURES},
+        'rows': len(grouped),
+    }
+
+def build_cubes(records):
+    """
+    从处理后的记录生成所有立方体
+
+    返回:
+        {文档ID: 立方体文档}；拆分的立方体ID为 {立方体}_{分片值}，例如 full_2019
+    """
+    df = pd.DataFrame(records, columns=['year', 'industry', 'state', 'employee_category'] + MEASURES)
+
+    cubes = {}
+    for cube_id, dimensions in CUBES.items():
+        shard_by = SHARDED_CUBES.get(cube_id)
+        if shard_by is None:
+            cubes[cube_id] = build_cube(df, dimensions)
+            continue
+        for shard, shard_df in df.groupby(shard_by, sort=True):
+            cube = build_cube(shard_df, dimensions)
+            cube['shard'] = {shard_by: shard.item() if hasattr(shard, 'item') else shard}
+            cubes[f"{cube_id}_{shard}"] = cube
+    return cubes
+
+def cube_index(cubes):
+    """所有立方体的索引文档：每个立方体的维度、行数、分片和JSON字节数"""
+    return {
+        cube_id: {
+            'dimensions': cube['dimensions'],
+            'rows': cube['rows'],
+            'shard': cube.get('shard'),
+            'bytes': len(serialize_cube(cube)),
+        }
+        for cube_id, cube in cubes.items()
+    }
+
+def serialize_cube(cube):
+    """紧凑的JSON序列化"""
+    return json.dumps(cube, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def report_cube_sizes(cubes, raw_records=None):
+    """打印每个立方体的行数和大小"""
+    print("\n=== Visualization Cubes ===")
+    total = 0
+    for cube_id, cube in cubes.items():
+        size = len(serialize_cube(cube))
+        total += size
+        warning = "  ⚠️  exceeds Firestore document limit" if size >= FIRESTORE_DOCUMENT_LIMIT else ""
+        print(f"{cube_id:<28} {' × '.join(cube['dimensions']):<48} {cube['rows']:>6} rows {size / 1024:>8.1f} KB{warning}")
+    print(f"Total: {len(cubes)} documents, {total / 1024:.1f} KB")
+    if raw_records:
+        raw_size = len(json.dumps(raw_records, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8'))
+        print(f"Raw rows: {len(raw_records)} documents, {raw_size / 1024:.1f} KB")
+
+def write_cube_files(cubes, output_dir=CUBE_OUTPUT_DIR):
+    """
+    把立方体写为静态JSON文件 {output_dir}/{文档ID}.json，并写入index.json
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for cube_id, cube in cubes.items():
+        with open(os.path.join(output_dir, f"{cube_id}.json"), 'wb') as f:
+            f.write(serialize_cube(cube))
+    with open(os.path.join(output_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(cube_index(cubes), f, ensure_ascii=False, separators=(',', ':'))
+    print(f"Cube files written to: {output_dir}")
+    return output_dir
+
+def upload_cubes(db, cubes, collection_name=CUBE_COLLECTION):
+    """
+    把立方体写入Firestore，每个立方体一个文档，另有一个index文档列出所有立方体
+    """
+    collection = db.collection(collection_name)
+    with BatchWriter(db) as writer:
+        for cube_id, cube in cubes.items():
+            writer.set(collection.document(cube_id), cube)
+        writer.set(collection.document('index'), {'cubes': cube_index(cubes)})
+    print(f"✅ Uploaded {len(cubes)} cube documents to {collection_name}")
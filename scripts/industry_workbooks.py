@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ABS 8165 行业数据工作簿（*-816502.xls/xlsx）的统一加载器
+自动发现目录中的所有年份工作簿，未缓存的工作簿在进程池中并行解析，解析结果缓存为Parquet。
+缓存以文件修改时间和内容哈希为键：未变化的工作簿不再解析，新增一个年份只需要解析这一个文件。
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from datetime import datetime
+from multiprocessing import Pool, cpu_count
+import pandas as pd
+
+WORKBOOK_DIR = "QX Net company data/数据可视化"
+WORKBOOK_PATTERN = re.compile(r'^(\d{4})-816502\.xlsx?$', re.IGNORECASE)
+
+# 缓存目录位于工作簿目录下，与运行脚本时的工作目录无关
+CACHE_DIRNAME = '.parquet_cache'
+CACHE_MANIFEST = 'manifest.json'
+
+# 缓存格式变化时旧的缓存不能复用
+CACHE_VERSION = 1
+
+# object列中单元格的类型标记；Parquet每列只能有一种类型，混合类型的列拆成 类型标记 + 文本 两列保存
+KIND_NULL, KIND_STR, KIND_INT, KIND_FLOAT, KIND_BOOL, KIND_DATETIME = range(6)
+
+def discover_workbooks(directory=WORKBOOK_DIR):
+    """
+    找出目录中的所有 {年份}-816502.xls/xlsx 文件
+
+    返回:
+        {年份: 文件路径}，按年份排序
+    """
+    workbooks = {}
+    for filename in sorted(os.listdir(directory)):
+        match = WORKBOOK_PATTERN.match(filename)
+        if match:
+            workbooks[int(match.group(1))] = os.path.join(directory, filename)
+    return dict(sorted(workbooks.items()))
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_workbook(file_path):
+    """按文件扩展名选择引擎读取工作簿"""
+    if file_path.lower().endswith('.xls'):
+        return pd.read_excel(file_path, engine='xlrd')
+    return pd.read_excel(file_path, engine='openpyxl')
+
+def _cell_kind(value):
+    if value is None or (isinstance(value, float) and value != value) or value is pd.NaT:
+        return KIND_NULL
+    if isinstance(value, bool):
+        return KIND_BOOL
+    if isinstance(value, int):
+        return KIND_INT
+    if isinstance(value, float):
+        return KIND_FLOAT
+    if isinstance(value, datetime):
+        return KIND_DATETIME
+    return KIND_STR
+
+def _cell_text(value, kind):
+    if kind == KIND_NULL:
+        return None
+    if kind == KIND_FLOAT:
+        return repr(float(value))
+    if kind == KIND_DATETIME:
+        return value.isoformat()
+    return str(value)
+
+def _cell_value(kind, text):
+    if kind == KIND_NULL:
+        return float('nan')
+    if kind == KIND_INT:
+        return int(text)
+    if kind == KIND_FLOAT:
+        return float(text)
+    if kind == KIND_BOOL:
+        return text == 'True'
+    if kind == KIND_DATETIME:
+        return datetime.fromisoformat(text)
+    return text
+
+def encode_frame(df):
+    """
+    把工作簿转换为可以写入Parquet的表
+
+    类型单一的列原样保存；object列逐个单元格记录类型和文本（浮点数用repr保证精确还原），
+    读回后整数、浮点数、字符串等类型与直接解析Excel得到的相同。
+
+    返回:
+        (Parquet表, 列布局)，列布局用于decode_frame还原原始列名和类型
+    """
+    encoded = {}
+    layout = []
+    for position, (name, series) in enumerate(df.items()):
+        key = f"c{position}"
+        if series.dtype == object:
+            kinds = [_cell_kind(value) for value in series]
+            encoded[f"{key}_kind"] = pd.Series(kinds, dtype='int8')
+            encoded[f"{key}_text"] = pd.Series([_cell_text(value, kind) for value, kind in zip(series, kinds)], dtype=object)
+            layout.append({'name': name, 'key': key, 'encoded': True})
+        else:
+            encoded[key] = series.reset_index(drop=True)
+            layout.append({'name': name, 'key': key, 'encoded': False})
+    return pd.DataFrame(encoded, index=range(len(df))), layout
+
+def decode_frame(table, layout, index):
+    """encode_frame的逆操作"""
+    columns = {}
+    for column in layout:
+        key = column['key']
+        if column['encoded']:
+            values = [_cell_value(kind, text) for kind, text in zip(table[f"{key}_kind"], table[f"{key}_text"])]
+            columns[column['name']] = pd.Series(values, index=index, dtype=object)
+        else:
+            columns[column['name']] = pd.Series(table[key].to_numpy(), index=index, dtype=table[key].dtype)
+    return pd.DataFrame(columns, index=index)
+
+def _parse_to_cache(task):
+    """
+    在工作进程中解析一个工作簿并写入Parquet缓存
+
+    返回:
+        (年份, 缓存记录, 解析秒数, 错误信息)
+    """
+    year, file_path, cache_dir, digest = task
+    start = time.perf_counter()
+    try:
+        df = read_workbook(file_path)
+        table, layout = encode_frame(df)
+        parquet_name = f"{year}-{digest[:16]}.parquet"
+        temp_path = os.path.join(cache_dir, f"{parquet_name}.tmp")
+        table.to_parquet(temp_path, index=False)
+        os.replace(temp_path, os.path.join(cache_dir, parquet_name))
+        entry = {
+            'file': os.path.basename(file_path),
+            'mtime': os.path.getmtime(file_path),
+            'size': os.path.getsize(file_path),
+            'sha256': digest,
+            'parquet': parquet_name,
+            'layout': layout,
+            'index': [int(df.index[0]), len(df)] if len(df) else [0, 0],
+        }
+        return year, entry, time.perf_counter() - start, None
+    except Exception as e:
+        return year, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+class WorkbookCache:
+    """
+    工作簿目录下的Parquet缓存和清单
+
+    清单记录每个年份工作簿的修改时间、大小、SHA-256和对应的Parquet文件。
+    修改时间和大小都未变化时直接使用缓存；修改时间变化但内容哈希相同时（例如重新复制了文件）也使用缓存，只更新修改时间。
+    """
+
+    def __init__(self, directory=WORKBOOK_DIR):
+        self.directory = directory
+        self.cache_dir = os.path.join(directory, CACHE_DIRNAME)
+        self.manifest_path = os.path.join(self.cache_dir, CACHE_MANIFEST)
+        self.entries = {}
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self.entries = data.get('workbooks', {})
+
+    def lookup(self, year, file_path):
+        """
+        返回(缓存记录或None, 文件哈希或None)；文件哈希只在修改时间或大小变化时计算
+        """
+        entry = self.entries.get(str(year))
+        if entry and not os.path.exists(os.path.join(self.cache_dir, entry['parquet'])):
+            entry = None
+        if entry and entry['file'] == os.path.basename(file_path) \
+                and entry['mtime'] == os.path.getmtime(file_path) and entry['size'] == os.path.getsize(file_path):
+            return entry, None
+
+        digest = file_hash(file_path)
+        if entry and entry['sha256'] == digest:
+            entry.update(file=os.path.basename(file_path), mtime=os.path.getmtime(file_path), size=os.path.getsize(file_path))
+            return entry, digest
+        return None, digest
+
+    def load(self, entry):
+        """从Parquet读回工作簿"""
+        table = pd.read_parquet(os.path.join(self.cache_dir, entry['parquet']))
+        start, length = entry['index']
+        return decode_frame(table, entry['layout'], pd.RangeIndex(start, start + length))
+
+    def store(self, year, entry):
+        """记录新解析的工作簿，删除被替换的旧Parquet文件"""
+        previous = self.entries.get(str(year))
+        if previous and previous['parquet'] != entry['parquet']:
+            old_path = os.path.join(self.cache_dir, previous['parquet'])
+            if os.path.exists(old_path):
+                os.remove(old_path)
+        self.entries[str(year)] = entry
+
+    def save(self):
+        """原子写入清单文件"""
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'workbooks': self.entries}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+def load_workbooks(directory=WORKBOOK_DIR, workers=None, use_cache=True):
+    """
+    加载目录中所有年份的816502工作簿
+
+    参数:
+        workers: 解析未缓存工作簿的进程数，默认为CPU核数（不超过需要解析的文件数）
+        use_cache: False时忽略已有缓存，重新解析所有工作簿（仍会更新缓存）
+
+    返回:
+        {年份: DataFrame}，按年份排序；与pd.read_excel直接读取的结果相同
+    """
+    workbooks = discover_workbooks(directory)
+    if not workbooks:
+        print(f"No *-816502.xls/xlsx workbooks found in {directory}")
+        return {}
+
+    cache = WorkbookCache(directory)
+    os.makedirs(cache.cache_dir, exist_ok=True)
+
+    cached = {}
+    tasks = []
+    reused = 0
+    for year, file_path in workbooks.items():
+        entry, digest = cache.lookup(year, file_path)
+        if entry and use_cache:
+            cached[year] = entry
+            reused += 1
+        else:
+            tasks.append((year, file_path, cache.cache_dir, digest or file_hash(file_path)))
+
+    if tasks:
+        workers = max(1, min(workers or cpu_count(), len(tasks)))
+        print(f"Parsing {len(tasks)} workbook(s) with {workers} process(es): {', '.join(str(task[0]) for task in tasks)}")
+        if workers == 1:
+            results = [_parse_to_cache(task) for task in tasks]
+        else:
+            with Pool(processes=workers) as pool:
+                results = list(pool.imap_unordered(_parse_to_cache, tasks))
+
+        for year, entry, seconds, error in results:
+            if error:
+                print(f"Error reading {year} file: {error}")
+                continue
+            print(f"Parsed {year} in {seconds:.2f}s")
+            cache.store(year, entry)
+            cached[year] = entry
+
+    cache.save()
+    if reused:
+        print(f"Loaded {reused} unchanged workbook(s) from cache")
+
+    return {year: cache.load(cached[year]) for year in sorted(cached)}
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+公司名称与logo文件名的模糊匹配
+为logo名称建立字符计数索引，用向量化的相似度上界筛选候选，只对可能超过阈值的少数候选计算SequenceMatcher。
+"""
+
+from difflib import SequenceMatcher
+import numpy as np
+
+# 模糊匹配的相似度阈值
+MATCH_THRESHOLD = 0.7
+
+def calculate_similarity(str1, str2):
+    """计算两个字符串的相似度"""
+    return SequenceMatcher(None, str1, str2).ratio()
+
+def find_best_match(logo_name, company_names):
+    """找到最匹配的公司名称"""
+    best_match = None
+    best_score = 0
+
+    for company_name in company_names:
+        score = calculate_similarity(logo_name, company_name)
+        if score > best_score:
+            best_score = score
+            best_match = company_name
+
+    return best_match, best_score
+
+class LogoMatcher:
+    """
+    带候选索引的find_best_match
+
+    SequenceMatcher.ratio() = 2M/T，匹配字符数M不超过两个字符串的字符多重集交集，
+    所以 2 * sum(min(字符计数)) / T（即quick_ratio）是ratio的上界。
+    对所有候选名称用numpy一次算出上界，按上界从高到低计算精确相似度，
+    上界低于当前最佳值或阈值后停止。超过阈值的匹配结果（包括并列时取列表中靠前的名称）
+    与逐个比较的find_best_match完全一致。
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        vocabulary = sorted({char for name in self.names for char in name})
+        self.char_index = {char: i for i, char in enumerate(vocabulary)}
+
+        self.counts = np.zeros((len(self.names), len(vocabulary)), dtype=np.int32)
+        for row, name in enumerate(self.names):
+            for char in name:
+                self.counts[row, self.char_index[char]] += 1
+        self.lengths = np.array([len(name) for name in self.names], dtype=np.int32)
+
+        # 每个名称一个SequenceMatcher：seq2（名称）的索引只建一次，查询时只替换seq1
+        self._matchers = {}
+
+    def _upper_bounds(self, query):
+        """query与所有名称的ratio上界"""
+        query_counts = np.zeros(len(self.char_index), dtype=np.int32)
+        for char in query:
+            index = self.char_index.get(char)
+            if index is not None:
+                query_counts[index] += 1
+
+        matches = np.minimum(self.counts, query_counts).sum(axis=1)
+        total = self.lengths + len(query)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bounds = np.where(total > 0, 2.0 * matches / total, 1.0)
+        return bounds
+
+    def _similarity(self, query, index):
+        """与calculate_similarity(query, names[index])相同"""
+        matcher = self._matchers.get(index)
+        if matcher is None:
+            matcher = self._matchers[index] = SequenceMatcher(None, '', self.names[index])
+        matcher.set_seq1(query)
+        return matcher.ratio()
+
+    def find_best_match(self, query, threshold=MATCH_THRESHOLD, report_candidates=5):
+        """
+        找到最匹配的名称
+
+        返回:
+            (名称, 相似度)；没有超过threshold的名称时，返回上界最高的report_candidates个候选中最相似的一个
+        """
+        if not self.names:
+            return None, 0
+
+        bounds = self._upper_bounds(query)
+        
+        # 只有上界超过阈值的名称可能匹配；另取上界最高的几个用于报告未匹配时的最相似名称
+        candidates = np.flatnonzero(bounds > threshold)
+        if len(candidates) < report_candidates:
+            top = min(report_candidates, len(self.names))
+            candidates = np.union1d(candidates, np.argpartition(-bounds, top - 1)[:top])
+        
+        # 按上界从高到低、同上界按原顺序排列
+        order = candidates[np.lexsort((candidates, -bounds[candidates]))]
+
+        best_index = None
+        best_score = 0
+        for evaluated, index in enumerate(order):
+            bound = bounds[index]
+            floor = max(best_score, threshold) if evaluated >= report_candidates else best_score
+            if bound < floor or (bound <= threshold and evaluated >= report_candidates):
+                break
+
+            score = self._similarity(query, index)
+            if score > best_score or (score == best_score and best_index is not None and index < best_index):
+                best_score = score
+                best_index = index
+
+        if best_index is None:
+            return None, 0
+        return self.names[best_index], best_score
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+按内容寻址的logo存储清单
+以源文件字节的哈希作为键，记录处理后上传到Firebase Storage的路径和URL。
+内容相同的logo只处理、上传一次，被多个公司共用；源文件未变化时不再处理和上传。
+"""
+
+import os
+import json
+import hashlib
+
+LOGO_MANIFEST_PATH = 'logo_upload_manifest.json'
+
+# 处理参数变化时（例如输出尺寸），旧的处理结果不能复用
+PROCESSING_VERSION = 'square-300-png'
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class LogoStore:
+    """
+    源文件哈希 -> 已上传blob的本地清单
+
+    blobs: {内容键: {'storage_path', 'url'}}
+    companies: {公司名称: 内容键}，用于统计共用同一logo的公司
+    """
+
+    def __init__(self, path=LOGO_MANIFEST_PATH, version=PROCESSING_VERSION):
+        self.path = path
+        self.version = version
+        self.blobs = {}
+        self.companies = {}
+        self.counts = {'uploaded': 0, 'reused': 0}
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.blobs = data.get('blobs', {})
+            self.companies = data.get('companies', {})
+
+    def content_key(self, source_path):
+        """源文件内容和处理版本共同决定的键"""
+        return f"{file_hash(source_path)}-{self.version}"
+
+    def storage_path(self, key, folder='company-logos'):
+        """内容寻址的Storage路径"""
+        return f"{folder}/by-hash/{key}.png"
+
+    def lookup(self, key):
+        """已上传过相同内容时返回记录，否则返回None"""
+        return self.blobs.get(key)
+
+    def record(self, key, storage_path, url):
+        """记录新上传的blob"""
+        self.blobs[key] = {'storage_path': storage_path, 'url': url}
+        self.counts['uploaded'] += 1
+
+    def assign(self, company_name, key, reused=False):
+        """记录公司使用的logo"""
+        self.companies[company_name] = key
+        if reused:
+            self.counts['reused'] += 1
+
+    def save(self):
+        """原子写入清单文件"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'blobs': self.blobs, 'companies': self.companies}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def summary(self):
+        """打印本次运行的统计"""
+        shared = len(self.companies) - len(set(self.companies.values()))
+        print(f"新上传: {self.counts['uploaded']}")
+        print(f"未变化跳过: {self.counts['reused']}")
+        print(f"不同logo文件: {len(self.blobs)}，公司: {len(self.companies)}（{shared} 个公司共用其他公司的logo）")
@@ -5,6 +5,11 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 import os
 from datetime import datetime
+from firestore_batch_writer import BatchWriter
+from anzsic_index import ANZSIC_INDEX_PATH, build_anzsic_index, save_anzsic_index
+
+# 层级索引文档所在的集合
+INDEX_COLLECTION = "industry_category_index"
 
 def process_anzsic_data():
     """Process ANZSIC data and upload to Firebase"""
@@ -64,6 +69,12 @@ def process_anzsic_data():
     
     print(f"Processed data saved to: {output_file}")
     
+    # 层级索引：展开分类、按名称自动补全时不需要扫描扁平列表
+    index = build_anzsic_index(processed_data)
+    index_file = os.path.join(os.path.dirname(output_file), ANZSIC_INDEX_PATH)
+    index_bytes = save_anzsic_index(index, index_file)
+    print(f"Hierarchy index saved to: {index_file} ({len(index['nodes'])} nodes, {len(index['prefixes'])} prefixes, {index_bytes / 1024:.1f} KB)")
+    
     # 生成统计信息
     unique_level1 = len(set(item['level1'] for item in processed_data))
     unique_level2 = len(set(f"{item['level1']}::{item['level2']}" for item in processed_data))
@@ -107,23 +118,25 @@ def upload_to_firebase(processed_data):
     batch_size = 500  # Firestore批量写入限制
     total_batches = (len(processed_data) + batch_size - 1) // batch_size
     
-    for batch_num in range(total_batches):
-        start_idx = batch_num * batch_size
-        end_idx = min(start_idx + batch_size, len(processed_data))
-        batch_data = processed_data[start_idx:end_idx]
-        
-        batch = db.batch()
-        
-        for record in batch_data:
+    # 多个batch并发提交
+    writer = BatchWriter(
+        db,
+        batch_size=batch_size,
+        on_commit=lambda batch_number, count: print(f"Uploaded batch {batch_number}/{total_batches} ({count} records)")
+    )
+    with writer:
+        for record in processed_data:
             doc_ref = db.collection(collection_name).document(record['id'])
-            batch.set(doc_ref, record)
+            writer.set(doc_ref, record)
         
-        try:
-            batch.commit()
-            print(f"Uploaded batch {batch_num + 1}/{total_batches} ({len(batch_data)} records)")
-        except Exception as e:
-            print(f"Error uploading batch {batch_num + 1}: {str(e)}")
-            return False
+        # 整个层级索引作为一个文档
+        writer.set(db.collection(INDEX_COLLECTION).document('anzsic'), build_anzsic_index(processed_data))
+    writer.report()
+    
+    if writer.failed_batches:
+        for batch_number, _, error in writer.failed_batches:
+            print(f"Error uploading batch {batch_number}: {str(error)}")
+        return False
     
     print(f"Successfully uploaded all data to Firebase!")
     return True
@@ -3,9 +3,141 @@
 
 import os
 import sys
+import csv
+import json
+import time
+from io import BytesIO
+from datetime import datetime
+from multiprocessing import Pool
 from PIL import Image
 import argparse
 
+# 支持的图像格式
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
+
+# 网站上显示logo的尺寸
+RENDITION_SIZES = [64, 128, 300, 600]
+
+# 输出格式 -> (Pillow格式, 保存参数)；WebP保留透明通道且比PNG小得多
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 90, 'method': 4}),
+    'png': ('PNG', {}),
+}
+
+# 多尺寸输出的清单文件
+RENDITION_MANIFEST = 'renditions_manifest.json'
+
+def square_logo(img, size=(300, 300), bg_color=(255, 255, 255, 0)):
+    """
+    把已解码的RGBA图像按比例缩放并居中放到正方形画布上
+    """
+    # 创建一个新的1:1比例的正方形图像，背景为透明
+    new_img = Image.new('RGBA', size, bg_color)
+    
+    # 调整原始图像大小，保持比例
+    original_width, original_height = img.size
+    ratio = min(size[0] / original_width, size[1] / original_height)
+    new_width = int(original_width * ratio)
+    new_height = int(original_height * ratio)
+    resized_img = img.resize((new_width, new_height), Image.LANCZOS)
+    
+    # 计算居中位置
+    paste_x = (size[0] - new_width) // 2
+    paste_y = (size[1] - new_height) // 2
+    
+    # 将调整大小后的图像粘贴到新图像上
+    new_img.paste(resized_img, (paste_x, paste_y), resized_img)
+    return new_img
+
+def _render_square(input_path, size=(300, 300), bg_color=(255, 255, 255, 0)):
+    """打开logo、转换为RGBA并放到正方形画布上；render_logo和render_logo_bytes共用"""
+    # 打开原始图像
+    original_img = Image.open(input_path)
+    
+    # 确保图像有Alpha通道（透明度）
+    if original_img.mode != 'RGBA':
+        original_img = original_img.convert('RGBA')
+    
+    return square_logo(original_img, size, bg_color)
+
+def render_logo(input_path, output_path=None, size=(300, 300), bg_color=(255, 255, 255, 0)):
+    """
+    把logo图片处理为1:1的正方形PNG，出错时抛出异常
+
+    参数与process_logo相同，返回保存后的图片路径
+    """
+    new_img = _render_square(input_path, size, bg_color)
+    
+    # 保存处理后的图像
+    if output_path is None:
+        output_path = input_path
+    
+    # 确保输出路径的目录存在
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    
+    # 保存为PNG以保留透明度
+    new_img.save(output_path, "PNG")
+    
+    return output_path
+
+def render_logo_bytes(input_path, size=(300, 300), bg_color=(255, 255, 255, 0)):
+    """
+    与render_logo相同的处理，但编码到内存中的PNG，不写文件，出错时抛出异常
+
+    返回:
+        PNG字节内容
+    """
+    buffer = BytesIO()
+    _render_square(input_path, size, bg_color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+def decode_logo(input_path, max_size):
+    """
+    解码一次源图像为RGBA
+
+    JPEG使用draft()在解码时直接按1/2、1/4、1/8缩小，结果仍不小于max_size，
+    大尺寸照片类logo的解码时间和内存都大幅减少。
+    """
+    img = Image.open(input_path)
+    if img.format == 'JPEG':
+        img.draft('RGB', (max_size, max_size))
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    else:
+        img.load()
+    return img
+
+def render_renditions(input_path, output_dir, name=None, sizes=None, formats=None, bg_color=(255, 255, 255, 0)):
+    """
+    源图像只解码一次，生成多个尺寸、多种格式的logo
+
+    参数:
+        output_dir: 输出目录，文件名为 {name}_{size}.{format}
+        name: 输出文件名前缀，默认为源文件名（不含扩展名）
+        sizes: 正方形边长列表，默认RENDITION_SIZES
+        formats: 格式列表，默认RENDITION_FORMATS中的全部格式
+
+    返回:
+        [{'size', 'format', 'file', 'bytes'}]
+    """
+    sizes = sizes or RENDITION_SIZES
+    formats = formats or list(RENDITION_FORMATS)
+    name = name or os.path.splitext(os.path.basename(input_path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+    
+    img = decode_logo(input_path, max(sizes))
+    
+    renditions = []
+    for size in sizes:
+        canvas = square_logo(img, (size, size), bg_color)
+        for fmt in formats:
+            pil_format, options = RENDITION_FORMATS[fmt]
+            filename = f"{name}_{size}.{fmt}"
+            path = os.path.join(output_dir, filename)
+            canvas.save(path, pil_format, **options)
+            renditions.append({'size': size, 'format': fmt, 'file': filename, 'bytes': os.path.getsize(path)})
+    return renditions
+
 def process_logo(input_path, output_path=None, size=(300, 300), bg_color=(255, 255, 255, 0)):
     """
     处理logo图片，使其适合1:1的正方形显示区域
@@ -20,63 +152,20 @@ def process_logo(input_path, output_path=None, size=(300, 300), bg_color=(255, 2
         保存后的图片路径
     """
     try:
-        # 打开原始图像
-        original_img = Image.open(input_path)
-        
-        # 确保图像有Alpha通道（透明度）
-        if original_img.mode != 'RGBA':
-            original_img = original_img.convert('RGBA')
-        
-        # 创建一个新的1:1比例的正方形图像，背景为透明
-        new_img = Image.new('RGBA', size, bg_color)
-        
-        # 调整原始图像大小，保持比例
-        original_width, original_height = original_img.size
-        ratio = min(size[0] / original_width, size[1] / original_height)
-        new_width = int(original_width * ratio)
-        new_height = int(original_height * ratio)
-        resized_img = original_img.resize((new_width, new_height), Image.LANCZOS)
-        
-        # 计算居中位置
-        paste_x = (size[0] - new_width) // 2
-        paste_y = (size[1] - new_height) // 2
-        
-        # 将调整大小后的图像粘贴到新图像上
-        new_img.paste(resized_img, (paste_x, paste_y), resized_img)
-        
-        # 保存处理后的图像
-        if output_path is None:
-            output_path = input_path
-        
-        # 确保输出路径的目录存在
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # 保存为PNG以保留透明度
-        new_img.save(output_path, "PNG")
-        
-        return output_path
+        return render_logo(input_path, output_path, size, bg_color)
     
     except Exception as e:
         print(f"处理图像时出错: {e}")
         return None
 
-def process_directory(input_dir, output_dir=None, size=(300, 300)):
-    """处理目录中的所有图像文件"""
-    if not os.path.isdir(input_dir):
-        print(f"错误: {input_dir} 不是一个目录")
-        return
-    
-    if output_dir is None:
-        output_dir = input_dir
-    
-    # 确保输出目录存在
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # 支持的图像格式
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
-    
-    # 遍历目录中的所有文件
-    processed_count = 0
+def list_logo_tasks(input_dir, output_dir):
+    """
+    列出目录中需要处理的图像文件
+
+    返回:
+        [(文件名, 输入路径, 输出路径)]，非PNG图像的输出路径改为.png
+    """
+    tasks = []
     for filename in os.listdir(input_dir):
         input_path = os.path.join(input_dir, filename)
         
@@ -85,7 +174,7 @@ def process_directory(input_dir, output_dir=None, size=(300, 300)):
             continue
         
         ext = os.path.splitext(filename)[1].lower()
-        if ext not in image_extensions:
+        if ext not in IMAGE_EXTENSIONS:
             continue
         
         # 构建输出路径
@@ -94,13 +183,125 @@ def process_directory(input_dir, output_dir=None, size=(300, 300)):
             # 将所有图像转换为PNG以保留透明度
             output_path = os.path.splitext(output_path)[0] + '.png'
         
-        # 处理图像
-        result = process_logo(input_path, output_path, size)
-        if result:
+        tasks.append((filename, input_path, output_path))
+    return tasks
+
+def _process_task(task):
+    """
+    在工作进程中处理一个图像，返回(文件名, 输出路径, 耗时秒数, 错误信息, 多尺寸输出列表)
+
+    renditions为None时生成单个PNG，否则按renditions中的尺寸生成多尺寸输出
+    """
+    filename, input_path, output_path, size, renditions = task
+    start = time.perf_counter()
+    outputs = None
+    try:
+        if renditions:
+            name = os.path.splitext(os.path.basename(output_path))[0]
+            outputs = render_renditions(input_path, os.path.dirname(output_path), name, renditions)
+        else:
+            render_logo(input_path, output_path, size)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return filename, output_path, time.perf_counter() - start, error, outputs
+
+def save_failure_summary(failures, summary_path=None):
+    """把处理失败的文件写入CSV摘要"""
+    if summary_path is None:
+        summary_path = f"logo_failures_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    with open(summary_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['filename', 'error'])
+        writer.writerows(failures)
+    return summary_path
+
+def write_rendition_manifest(output_dir, manifest):
+    """
+    写入多尺寸输出清单，并打印每个尺寸、格式的总字节数
+    """
+    manifest_path = os.path.join(output_dir, RENDITION_MANIFEST)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(manifest.items())), f, ensure_ascii=False, indent=2)
+    
+    totals = {}
+    for entry in manifest.values():
+        for rendition in entry['renditions']:
+            key = (rendition['size'], rendition['format'])
+            totals[key] = totals.get(key, 0) + rendition['bytes']
+    for (size, fmt), total in sorted(totals.items()):
+        print(f"  {size:>4}px {fmt:<5} {total / 1024:>10.1f} KB")
+    return manifest_path
+
+def process_directory(input_dir, output_dir=None, size=(300, 300), workers=1, chunksize=4, renditions=None):
+    """
+    处理目录中的所有图像文件
+
+    参数:
+        workers: 工作进程数，1表示在当前进程中逐个处理
+        chunksize: 每次分派给一个工作进程的文件数
+        renditions: 尺寸列表；指定时每个源图像生成多尺寸WebP/PNG，并在输出目录写入清单
+
+    返回:
+        {'processed', 'failed', 'seconds'}
+    """
+    if not os.path.isdir(input_dir):
+        print(f"错误: {input_dir} 不是一个目录")
+        return
+    
+    if output_dir is None:
+        output_dir = input_dir
+    
+    # 确保输出目录存在
+    os.makedirs(output_dir, exist_ok=True)
+    
+    tasks = [(filename, input_path, output_path, size, renditions)
+             for filename, input_path, output_path in list_logo_tasks(input_dir, output_dir)]
+    
+    start = time.perf_counter()
+    processed_count = 0
+    failures = []
+    manifest = {}
+    
+    if workers > 1:
+        pool = Pool(workers)
+        results = pool.imap_unordered(_process_task, tasks, chunksize=chunksize)
+    else:
+        pool = None
+        results = map(_process_task, tasks)
+    
+    try:
+        for filename, output_path, seconds, error, outputs in results:
+            if error:
+                print(f"处理图像时出错: {filename}: {error}")
+                failures.append((filename, error))
+                continue
             processed_count += 1
-            print(f"已处理: {filename} -> {os.path.basename(output_path)}")
+            if outputs:
+                manifest[filename] = {
+                    'source_bytes': os.path.getsize(os.path.join(input_dir, filename)),
+                    'renditions': outputs,
+                }
+                print(f"已处理: {filename} -> {len(outputs)} 个文件 ({seconds * 1000:.0f} ms)")
+            else:
+                print(f"已处理: {filename} -> {os.path.basename(output_path)} ({seconds * 1000:.0f} ms)")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    
+    seconds = time.perf_counter() - start
+    print(f"总共处理了 {processed_count} 个图像文件 ({seconds:.2f}s, {workers} 个进程)")
     
-    print(f"总共处理了 {processed_count} 个图像文件")
+    if renditions:
+        manifest_path = write_rendition_manifest(output_dir, manifest)
+        print(f"多尺寸输出清单已保存到: {manifest_path}")
+    
+    if failures:
+        summary_path = save_failure_summary(failures)
+        print(f"处理失败 {len(failures)} 个文件，详情见: {summary_path}")
+    
+    return {'processed': processed_count, 'failed': len(failures), 'seconds': seconds}
 
 def main():
     parser = argparse.ArgumentParser(description='处理Logo图像使其适合1:1比例显示')
@@ -109,14 +310,29 @@ def main():
     parser.add_argument('input', help='输入图像路径或目录')
     parser.add_argument('-o', '--output', help='输出图像路径或目录')
     parser.add_argument('-s', '--size', type=int, default=300, help='输出图像的尺寸 (默认: 300x300)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='处理目录时的工作进程数 (默认: 1)')
+    parser.add_argument('--chunksize', type=int, default=4, help='每次分派给工作进程的文件数 (默认: 4)')
+    parser.add_argument('--renditions', type=int, nargs='*',
+                        help=f"生成多尺寸WebP/PNG（不带数值时使用 {' '.join(map(str, RENDITION_SIZES))}）")
     
     args = parser.parse_args()
     
     size = (args.size, args.size)
     
+    # --renditions 不带数值时使用默认尺寸
+    renditions = None
+    if args.renditions is not None:
+        renditions = args.renditions or RENDITION_SIZES
+    
     if os.path.isdir(args.input):
         # 处理整个目录
-        process_directory(args.input, args.output, size)
+        process_directory(args.input, args.output, size, workers=args.workers, chunksize=args.chunksize,
+                          renditions=renditions)
+    elif renditions:
+        # 单个文件生成多尺寸输出
+        output_dir = args.output or os.path.dirname(os.path.abspath(args.input))
+        for rendition in render_renditions(args.input, output_dir, sizes=renditions):
+            print(f"{rendition['file']}: {rendition['bytes']} bytes")
     else:
         # 处理单个文件
         result = process_logo(args.input, args.output, size)
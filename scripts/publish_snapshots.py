@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+只读数据集的静态快照发布
+把很少变化的数据处理结果（ANZSIC分类、行业分类、行业可视化立方体、州地图数据）发布为public/下的静态文件：
+文件名包含内容哈希，可以被CDN永久缓存；同时生成gzip和brotli预压缩文件，以及列出当前版本的manifest.json。
+页面先读取manifest，再按其中的文件名加载数据，不再为静态参考数据读取Firestore。
+
+用法:
+    python scripts/publish_snapshots.py
+    python scripts/publish_snapshots.py --output-dir public/snapshots --keep 1
+"""
+
+import os
+import json
+import gzip
+import hashlib
+import argparse
+
+# brotli为可选依赖，没有安装时只生成gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SNAPSHOT_DIR = 'public/snapshots'
+SNAPSHOT_URL_PREFIX = '/snapshots'
+SNAPSHOT_MANIFEST = 'manifest.json'
+# 发布历史，用于清理旧版本的快照文件
+SNAPSHOT_HISTORY = '.history.json'
+
+# 快照名称 -> 数据处理脚本的输出（文件或目录）；目录中的每个JSON文件发布为 {快照名称}/{文件名}
+SNAPSHOT_SOURCES = {
+    'anzsic': 'processed_anzsic_data.json',
+    'anzsic-index': 'anzsic_index.json',
+    'industry-data': 'firebase_industry_data.json',
+    'industry-visualization': 'public/data/industry-cubes',
+    'state-map': 'state_map_data.json',
+}
+
+def content_hash(data):
+    """内容的SHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+def minify_json(path):
+    """读取JSON并紧凑地重新序列化；键顺序保持不变，相同内容得到相同的字节"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def collect_sources(sources=None):
+    """
+    读取所有数据源
+
+    返回:
+        [(快照名称, 源文件路径, 紧凑JSON字节)]；不存在的数据源打印提示后跳过
+    """
+    sources = sources or SNAPSHOT_SOURCES
+    snapshots = []
+    for name, path in sources.items():
+        if os.path.isdir(path):
+            for filename in sorted(os.listdir(path)):
+                if filename.endswith('.json'):
+                    file_path = os.path.join(path, filename)
+                    snapshots.append((f"{name}/{os.path.splitext(filename)[0]}", file_path, minify_json(file_path)))
+        elif os.path.exists(path):
+            snapshots.append((name, path, minify_json(path)))
+        else:
+            print(f"⚠️  跳过 {name}: {path} 不存在")
+    return snapshots
+
+def snapshot_encodings():
+    """可以生成的预压缩格式；没有安装brotli时只有gzip"""
+    return ['gz', 'br'] if brotli is not None else ['gz']
+
+def compress(data, encoding):
+    """
+    生成预压缩内容
+
+    gzip头部的mtime固定为0，相同内容的压缩结果完全相同
+    """
+    if encoding == 'gz':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+def _write_atomic(path, data):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def _manifest_files(manifest):
+    """manifest引用的所有文件（相对于输出目录）"""
+    files = set()
+    for entry in manifest['datasets'].values():
+        files.add(entry['file'])
+        files.update(entry.get('encodings', {}).values())
+    return files
+
+def publish_snapshots(output_dir=SNAPSHOT_DIR, sources=None, keep=1):
+    """
+    发布所有快照并写入manifest
+
+    内容未变化的快照文件名不变，不会重写；manifest最后写入，页面不会读到引用了未写完文件的manifest。
+
+    参数:
+        keep: 保留之前几个版本的manifest引用的文件，已经加载旧manifest的页面仍可读取旧文件
+
+    返回:
+        新的manifest
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    datasets = {}
+    written = 0
+    for name, source_path, data in collect_sources(sources):
+        digest = content_hash(data)
+        filename = f"{name}.{digest[:12]}.json"
+        path = os.path.join(output_dir, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        entry = {
+            'file': filename,
+            'url': f"{SNAPSHOT_URL_PREFIX}/{filename}",
+            'sha256': digest,
+            'source': source_path,
+            'bytes': len(data),
+            'encodings': {},
+            'encoded_bytes': {},
+        }
+
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+            written += 1
+        for encoding in snapshot_encodings():
+            encoded_name = f"{filename}.{encoding}"
+            encoded_path = os.path.join(output_dir, encoded_name)
+            if not os.path.exists(encoded_path):
+                _write_atomic(encoded_path, compress(data, encoding))
+            entry['encodings'][encoding] = encoded_name
+            entry['encoded_bytes'][encoding] = os.path.getsize(encoded_path)
+        datasets[name] = entry
+
+    # 版本号由所有快照的内容哈希决定，内容没有变化时manifest也保持不变
+    hashes = json.dumps({name: entry['sha256'] for name, entry in datasets.items()}, sort_keys=True)
+    manifest = {
+        'version': content_hash(hashes.encode('utf-8'))[:12],
+        'datasets': datasets,
+    }
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+    _write_atomic(os.path.join(output_dir, SNAPSHOT_MANIFEST), manifest_bytes)
+
+    # 每个版本引用的文件，最新的在前；只保留当前版本和之前keep个版本的文件
+    history_path = os.path.join(output_dir, SNAPSHOT_HISTORY)
+    history = []
+    if os.path.exists(history_path):
+        with open(history_path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    history = [item for item in history if item['version'] != manifest['version']]
+    history = ([{'version': manifest['version'], 'files': sorted(_manifest_files(manifest))}] + history)[:keep + 1]
+    _write_atomic(history_path, json.dumps(history, indent=2).encode('utf-8'))
+
+    removed = _remove_unreferenced(output_dir, {file for item in history for file in item['files']})
+
+    report_snapshots(manifest, written, removed)
+    return manifest
+
+def _remove_unreferenced(output_dir, referenced):
+    """删除不再被任何保留版本引用的快照文件"""
+    removed = 0
+    for root, _, filenames in os.walk(output_dir):
+        for filename in filenames:
+            relative = os.path.relpath(os.path.join(root, filename), output_dir).replace(os.sep, '/')
+            if relative in (SNAPSHOT_MANIFEST, SNAPSHOT_HISTORY) or relative in referenced:
+                continue
+            os.remove(os.path.join(root, filename))
+            removed += 1
+    return removed
+
+def report_snapshots(manifest, written=0, removed=0):
+    """打印每个快照的原始大小和压缩后大小"""
+    print(f"\n=== Snapshots (version {manifest['version']}) ===")
+    for name, entry in manifest['datasets'].items():
+        sizes = ', '.join(f"{encoding} {size / 1024:.1f} KB" for encoding, size in entry['encoded_bytes'].items())
+        print(f"{name:<44} {entry['bytes'] / 1024:>8.1f} KB  ({sizes})  {entry['file']}")
+    print(f"新写入: {written}, 删除旧文件: {removed}")
+    if brotli is None:
+        print("未安装brotli，只生成gzip预压缩文件 (pip install brotli)")
+
+def main():
+    parser = argparse.ArgumentParser(description='发布只读数据集的静态快照')
+    parser.add_argument('--output-dir', default=SNAPSHOT_DIR, help=f'输出目录 (默认: {SNAPSHOT_DIR})')
+    parser.add_argument('--keep', type=int, default=1, help='保留之前几个版本的快照文件 (默认: 1)')
+    args = parser.parse_args()
+
+    publish_snapshots(args.output_dir, keep=args.keep)
+
+if __name__ == '__main__':
+    main()
@@ -3,44 +3,29 @@ import pandas as pd
 import json
 import os
 from datetime import datetime
+from industry_workbooks import load_workbooks
 
 def read_excel_files():
-    """读取三个Excel文件并分析数据结构"""
+    """读取目录中所有年份的Excel文件并分析数据结构"""
     
     base_path = "/Users/alex/Desktop/IT Program/QX Net next js/qx-net-nextjs-new/QX Net company data/数据可视化"
     
-    files = {
-        '2019': f'{base_path}/2019-816502.xls',
-        '2020': f'{base_path}/2020-816502.xlsx', 
-        '2021': f'{base_path}/2021-816502.xlsx'
-    }
-    
     all_data = []
     
-    for year, file_path in files.items():
-        try:
-            print(f"Reading {year} data from: {file_path}")
-            
-            # 尝试读取Excel文件
-            if file_path.endswith('.xls'):
-                df = pd.read_excel(file_path, engine='xlrd')
-            else:
-                df = pd.read_excel(file_path, engine='openpyxl')
-            
-            print(f"Shape: {df.shape}")
-            print(f"Columns: {list(df.columns)}")
-            print(f"First 5 rows:")
-            print(df.head())
-            print(f"Data types:")
-            print(df.dtypes)
-            print("-" * 50)
-            
-            # 保存原始数据用于分析
-            df['year'] = year
-            all_data.append(df)
-            
-        except Exception as e:
-            print(f"Error reading {year} file: {str(e)}")
+    # 未变化的工作簿从Parquet缓存读取，新增或修改的工作簿并行解析
+    for year, df in load_workbooks(base_path).items():
+        print(f"Reading {year} data")
+        print(f"Shape: {df.shape}")
+        print(f"Columns: {list(df.columns)}")
+        print(f"First 5 rows:")
+        print(df.head())
+        print(f"Data types:")
+        print(df.dtypes)
+        print("-" * 50)
+        
+        # 保存原始数据用于分析
+        df['year'] = str(year)
+        all_data.append(df)
     
     return all_data
 
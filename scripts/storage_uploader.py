@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Firebase Storage并发上传器
+从内存缓冲区上传，不经过临时文件；有界线程池并发上传，失败按指数退避重试，并设置长期缓存的Cache-Control。
+
+本地验证（Storage模拟器）:
+    firebase emulators:start --only storage
+    python scripts/storage_uploader.py --emulator-host localhost:9199 --files 200
+"""
+
+import os
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Dict
+from urllib.parse import quote
+
+from google.api_core import exceptions as api_exceptions
+
+# 按内容寻址的路径内容不会变化，可以长期缓存
+DEFAULT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# 可以重试的临时性错误
+RETRYABLE_ERRORS = (
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.GatewayTimeout,
+    api_exceptions.TooManyRequests,
+    ConnectionError,
+    TimeoutError,
+)
+
+def download_url(bucket_name: str, storage_path: str) -> str:
+    """Firebase Storage的公开下载URL"""
+    return f"https://firebasestorage.googleapis.com/v0/b/{bucket_name}/o/{quote(storage_path, safe='')}?alt=media"
+
+
+class StorageUploader:
+    """
+    并发上传内存中的数据到Firebase Storage
+
+    - 最多max_workers个上传同时进行，最多max_pending个待上传的缓冲区，超出时阻塞调用方（内存有界）
+    - 临时性错误按指数退避（带抖动）重试，超过max_retries后记录到failures
+    """
+
+    def __init__(self, bucket, max_workers: int = 8, max_pending: int = None, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 cache_control: str = DEFAULT_CACHE_CONTROL):
+        self.bucket = bucket
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache_control = cache_control
+
+        self.uploaded = 0
+        self.uploaded_bytes = 0
+        self.retries = 0
+        self.failures = []  # (storage_path, error)，与计数器一样在_lock下修改
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='storage-upload')
+        self._lock = Lock()
+        self._slots = BoundedSemaphore(max_pending or max_workers * 2)
+        self._started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def submit(self, storage_path: str, data: bytes, content_type: str = 'image/png'):
+        """
+        提交一个上传，返回Future；Future的结果为下载URL，失败时为None
+        """
+        self._slots.acquire()
+        future = self._executor.submit(self._upload, storage_path, data, content_type)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _upload(self, storage_path: str, data: bytes, content_type: str):
+        attempt = 0
+        while True:
+            try:
+                blob = self.bucket.blob(storage_path)
+                blob.cache_control = self.cache_control
+                blob.upload_from_string(data, content_type=content_type)
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        self.failures.append((storage_path, e))
+                    print(f"❌ 上传失败 {storage_path}: {e}")
+                    return None
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+            except Exception as e:
+                with self._lock:
+                    self.failures.append((storage_path, e))
+                print(f"❌ 上传失败 {storage_path}: {e}")
+                return None
+
+        with self._lock:
+            self.uploaded += 1
+            self.uploaded_bytes += len(data)
+        return download_url(self.bucket.name, storage_path)
+
+    def close(self) -> Dict:
+        """等待所有上传完成，返回统计信息"""
+        self._executor.shutdown(wait=True)
+        return self.stats()
+
+    def stats(self) -> Dict:
+        elapsed = time.perf_counter() - self._started
+        return {
+            'uploaded': self.uploaded,
+            'uploaded_bytes': self.uploaded_bytes,
+            'failed': len(self.failures),
+            'retries': self.retries,
+            'elapsed_seconds': elapsed,
+            'uploads_per_second': self.uploaded / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def report(self):
+        """打印上传统计"""
+        stats = self.stats()
+        print(f"上传: {stats['uploaded']} 个文件, {stats['uploaded_bytes'] / 1024:.1f} KB, "
+              f"失败: {stats['failed']}, 重试: {stats['retries']}")
+        print(f"耗时: {stats['elapsed_seconds']:.2f}s ({stats['uploads_per_second']:.1f} 个/秒, {self.max_workers} 个并发)")
+
+
+def main():
+    """在Storage模拟器上上传并校验一组合成logo"""
+    parser = argparse.ArgumentParser(description='StorageUploader smoke test against the Storage emulator')
+    parser.add_argument('--emulator-host', default='localhost:9199', help='Storage模拟器地址 (默认: localhost:9199)')
+    parser.add_argument('--bucket', default='qx-net-next-js.firebasestorage.app', help='bucket名称')
+    parser.add_argument('--files', type=int, default=200, help='上传的文件数量')
+    parser.add_argument('--workers', type=int, default=8, help='并发上传数')
+    args = parser.parse_args()
+
+    # 只允许连接模拟器，避免误写生产存储
+    os.environ['STORAGE_EMULATOR_HOST'] = f"http://{args.emulator_host}"
+    from google.auth.credentials import AnonymousCredentials
+    from google.cloud import storage
+    bucket = storage.Client(project='qx-net-next-js', credentials=AnonymousCredentials()).bucket(args.bucket)
+
+    from io import BytesIO
+    from PIL import Image
+    paths = []
+    with StorageUploader(bucket, max_workers=args.workers) as uploader:
+        for i in range(args.files):
+            buffer = BytesIO()
+            Image.new('RGBA', (300, 300), (i % 256, 80, 160, 255)).save(buffer, 'PNG')
+            path = f"uploader-smoke-test/logo_{i:05d}.png"
+            uploader.submit(path, buffer.getvalue())
+            paths.append(path)
+    uploader.report()
+
+    ok = 0
+    for path in paths:
+        blob = bucket.get_blob(path)
+        if blob is not None and blob.cache_control == DEFAULT_CACHE_CONTROL and blob.content_type == 'image/png':
+            ok += 1
+        if blob is not None:
+            blob.delete()
+
+    print(f"校验通过: {ok}/{len(paths)}")
+    if ok == len(paths) and not uploader.failures:
+        print("✅ Emulator smoke test passed")
+    else:
+        print("❌ Emulator smoke test failed")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
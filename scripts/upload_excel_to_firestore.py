@@ -2,6 +2,7 @@ import pandas as pd
 import firebase_admin
 from firebase_admin import credentials, firestore
 import logging
+from firestore_purge import purge_collection
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -47,21 +48,9 @@ def safe_list(value):
 
 def clear_collection(db, collection_name):
     try:
-        # 清空指定集合
-        batch_size = 500
-        docs = db.collection(collection_name).limit(batch_size).stream()
-        deleted = 0
-        
-        # 批量删除文档
-        for doc in docs:
-            doc.reference.delete()
-            deleted += 1
-            
-        if deleted >= batch_size:
-            # 如果删除的文档数量达到批次大小，可能还有更多文档
-            return clear_collection(db, collection_name)
-            
-        logging.info(f"已清空集合 {collection_name}: 删除了 {deleted} 条记录")
+        # 游标分页读取文档ID，批量删除，按分区并行
+        result = purge_collection(db, collection_name)
+        logging.info(f"已清空集合 {collection_name}: 删除了 {result['documents']} 条记录")
     except Exception as e:
         logging.error(f"清空集合 {collection_name} 失败: {str(e)}")
         raise
@@ -2,10 +2,11 @@ import os
 import pandas as pd
 from firebase_admin import credentials, initialize_app, storage
 import re
-from difflib import SequenceMatcher
-from collections import defaultdict
-import tempfile
-from process_logo import process_logo
+import argparse
+from process_logo import render_logo_bytes
+from storage_uploader import StorageUploader
+from logo_store import LogoStore
+from logo_matcher import LogoMatcher, MATCH_THRESHOLD
             
         # 初始化Firebase
 cred = credentials.Certificate("QX Net company data/qx-net-next-js-firebase-adminsdk-fbsvc-2cc9fc9468.json")
@@ -43,60 +44,40 @@ def clean_company_name(name):
     
     return name
 
-def calculate_similarity(str1, str2):
-    """计算两个字符串的相似度"""
-    return SequenceMatcher(None, str1, str2).ratio()
+def upload_pending_logos(pending, store, workers=8):
+    """
+    并发处理、上传尚未上传过的logo
 
-def find_best_match(logo_name, company_names):
-    """找到最匹配的公司名称"""
-    best_match = None
-    best_score = 0
-    
-    for company_name in company_names:
-        score = calculate_similarity(logo_name, company_name)
-        if score > best_score:
-            best_score = score
-            best_match = company_name
-            
-    return best_match, best_score
+    参数:
+        pending: {内容键: 源文件路径}
 
-def upload_logo_to_firebase(local_path, company_name):
-    """上传logo到Firebase Storage"""
-    try:
-        # 创建临时文件以处理logo
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-            temp_path = temp_file.name
-        
-        # 处理logo为1:1比例
-        processed_path = process_logo(local_path, temp_path, size=(300, 300))
-        if not processed_path:
-            print(f"处理logo失败 {company_name}")
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            return None
-        
-        # 生成存储路径
-        storage_path = f"company-logos/{company_name}.png"  # 统一使用PNG格式
-        
-        # 上传处理后的文件
-        blob = bucket.blob(storage_path)
-        blob.upload_from_filename(processed_path)
-        
-        # 删除临时文件
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
-        # 生成公开URL
-        url = f"https://firebasestorage.googleapis.com/v0/b/{bucket.name}/o/{storage_path.replace('/', '%2F')}?alt=media"
-        return url
-    except Exception as e:
-        print(f"上传logo失败 {company_name}: {str(e)}")
-        # 清理临时文件
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
-        return None
+    返回:
+        {内容键: URL}，处理或上传失败的键不在结果中
+    """
+    futures = {}
+    with StorageUploader(bucket, max_workers=workers) as uploader:
+        for key, local_path in pending.items():
+            try:
+                data = render_logo_bytes(local_path, size=(300, 300))
+            except Exception as e:
+                print(f"处理logo失败 {os.path.basename(local_path)}: {str(e)}")
+                continue
+            futures[key] = (uploader.submit(store.storage_path(key), data), store.storage_path(key))
+    uploader.report()
+    
+    urls = {}
+    for key, (future, storage_path) in futures.items():
+        url = future.result()
+        if url:
+            store.record(key, storage_path, url)
+            urls[key] = url
+    return urls
 
 def main():
+    parser = argparse.ArgumentParser(description='匹配公司logo并上传到Firebase Storage')
+    parser.add_argument('-w', '--workers', type=int, default=8, help='并发上传数 (默认: 8)')
+    args = parser.parse_args()
+    
     # 桌面路径
     desktop_path = "/Users/alex/Desktop"
     logo_dir = os.path.join(desktop_path, "logo_image")
@@ -115,34 +96,60 @@ def main():
             clean_name = clean_company_name(filename)
             logo_files[clean_name] = os.path.join(logo_dir, filename)
     
+    # logo名称的候选索引，模糊匹配时只对少数候选计算相似度
+    matcher = LogoMatcher(logo_files.keys())
+    
+    # 按内容寻址的上传清单
+    store = LogoStore()
+    
     # 记录未匹配的logo
     unmatched_logos = []
     matched_logos = []
     
-    # 更新CSV中的logo URL
-    for index, row in df.iterrows():
-        company_name = clean_company_name(row['name_en'])
+    # 先完成匹配，收集需要上传的不同logo内容
+    assignments = []  # (行索引, 原公司名称, 清理后的名称, 内容键, 匹配说明)
+    pending = {}
+    for index, name_en in df['name_en'].items():
+        company_name = clean_company_name(name_en)
         if company_name in logo_files:
             # 精确匹配
-            logo_url = upload_logo_to_firebase(logo_files[company_name], company_name)
-            if logo_url:
-                df.at[index, 'logo'] = logo_url
-                print(f"已更新 {row['name_en']} 的logo URL (精确匹配)")
-                matched_logos.append((company_name, company_name, 1.0))
+            logo_path = logo_files[company_name]
+            label = "精确匹配"
+            matched = (company_name, company_name, 1.0)
         else:
             # 模糊匹配
-            best_match, similarity = find_best_match(company_name, logo_files.keys())
-            if similarity > 0.7:  # 相似度阈值
-                logo_url = upload_logo_to_firebase(logo_files[best_match], company_name)
-                if logo_url:
-                    df.at[index, 'logo'] = logo_url
-                    print(f"已更新 {row['name_en']} 的logo URL (模糊匹配，相似度: {similarity:.2f})")
-                    matched_logos.append((company_name, best_match, similarity))
-            else:
+            best_match, similarity = matcher.find_best_match(company_name, MATCH_THRESHOLD)
+            if similarity <= MATCH_THRESHOLD:  # 相似度阈值
                 unmatched_logos.append((company_name, best_match, similarity))
+                continue
+            logo_path = logo_files[best_match]
+            label = f"模糊匹配，相似度: {similarity:.2f}"
+            matched = (company_name, best_match, similarity)
+        
+        key = store.content_key(logo_path)
+        if not store.lookup(key):
+            pending.setdefault(key, logo_path)
+        assignments.append((index, name_en, company_name, key, label, matched))
     
-    # 保存更新后的CSV
+    # 并发处理、上传新的logo内容
+    print(f"\n需要上传的logo: {len(pending)}")
+    upload_pending_logos(pending, store, workers=args.workers)
+    
+    # 更新CSV中的logo URL；本次新上传的内容只有第一个使用它的公司不算复用
+    assigned = set()
+    for index, name_en, company_name, key, label, matched in assignments:
+        existing = store.lookup(key)
+        if not existing:
+            continue
+        store.assign(company_name, key, reused=key not in pending or key in assigned)
+        assigned.add(key)
+        df.at[index, 'logo'] = existing['url']
+        print(f"已更新 {name_en} 的logo URL ({label})")
+        matched_logos.append(matched)
+    
+    # 保存更新后的CSV和上传清单
     df.to_csv(csv_path, index=False)
+    store.save()
     
     # 打印匹配结果报告
     print("\n=== 匹配结果报告 ===")
@@ -153,6 +160,9 @@ def main():
         print(f"最相似logo: {best_match} (相似度: {similarity:.2f})")
         print("---")
     
+    print("\n=== 上传统计 ===")
+    store.summary()
+    
     print("\n所有logo已上传并更新到CSV文件")
 
 if __name__ == "__main__":
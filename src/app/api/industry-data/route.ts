@@ -1,20 +1,41 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { firestore } from '@/lib/firebase/admin';
+import { expandCube, IndustryCube } from '@/lib/industryCubes';
+
+const CUBE_COLLECTION = 'industry_visualization_cubes';
+
+// 读取预聚合的完整组合立方体（按年份拆分，只有几个小文档）；没有立方体时返回null
+async function fetchFromCubes() {
+  const index = await firestore.collection(CUBE_COLLECTION).doc('index').get();
+  const cubeIds = Object.keys(index.data()?.cubes ?? {}).filter(id => id.startsWith('full_'));
+  if (cubeIds.length === 0) {
+    return null;
+  }
+
+  const docs = await firestore.getAll(...cubeIds.map(id => firestore.collection(CUBE_COLLECTION).doc(id)));
+  return docs.flatMap(doc => (doc.exists ? expandCube(doc.id, doc.data() as IndustryCube) : []));
+}
 
 export async function GET(request: NextRequest) {
   try {
+    const cubeData = await fetchFromCubes();
+    if (cubeData && cubeData.length > 0) {
+      return NextResponse.json({ data: cubeData });
+    }
+
+    // 没有预聚合数据时回退到逐行的原始记录
     const collection = firestore.collection('industry_visualization_data');
     const snapshot = await collection.get();
-    
+
     if (snapshot.empty) {
       return NextResponse.json({ data: [] });
     }
-    
+
     const data = snapshot.docs.map(doc => ({
       id: doc.id,
       ...doc.data()
     }));
-    
+
     return NextResponse.json({ data });
   } catch (error) {
     console.error('Error fetching industry data:', error);
@@ -23,4 +44,4 @@ export async function GET(request: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
@@ -15,6 +15,8 @@ import {
   Download
 } from 'lucide-react';
 import dynamic from 'next/dynamic';
+import { listSnapshots, loadSnapshot } from '@/lib/snapshots';
+import { expandCube, IndustryCube } from '@/lib/industryCubes';
 
 // Dynamically import ECharts to avoid SSR issues
 const ReactECharts = dynamic(() => import('echarts-for-react'), {
@@ -213,6 +215,17 @@ function StateDistributionChart({ data }: { data: any[] }) {
 }
 
 
+// 从静态快照读取按年份拆分的完整组合立方体，不经过Firestore；没有快照时返回null
+async function fetchFromSnapshots(): Promise<IndustryData[] | null> {
+  const names = await listSnapshots('industry-visualization/full_');
+  if (names.length === 0) {
+    return null;
+  }
+
+  const cubes = await Promise.all(names.map(name => loadSnapshot<IndustryCube>(name)));
+  return cubes.flatMap((cube, i) => expandCube(names[i].split('/').pop()!, cube)) as unknown as IndustryData[];
+}
+
 export default function IndustryDataVisualizationPage() {
   const [data, setData] = useState<IndustryData[]>(mockData);
   const [loading, setLoading] = useState(true);
@@ -222,6 +235,18 @@ export default function IndustryDataVisualizationPage() {
     const fetchData = async () => {
       try {
         setLoading(true);
+
+        // 优先读取CDN上的静态快照，快照不可用时再请求API
+        try {
+          const snapshotData = await fetchFromSnapshots();
+          if (snapshotData && snapshotData.length > 0) {
+            setData(snapshotData);
+            return;
+          }
+        } catch (snapshotError) {
+          console.warn('Snapshots unavailable, falling back to API:', snapshotError);
+        }
+
         const response = await fetch('/api/industry-data');
         
         if (!response.ok) {
@@ -0,0 +1,24 @@
+// Column-oriented industry visualization cubes built by scripts/industry_cubes.py.
+// The same cube documents are stored in Firestore and published as static snapshots.
+
+export interface IndustryCube {
+  dimensions: string[];
+  values: Record<string, (string | number)[]>;
+  keys: Record<string, number[]>;
+  measures: Record<string, number[]>;
+  rows: number;
+}
+
+// 把列式立方体（维度值字典 + 整数编码 + 指标数组）展开为页面使用的行
+export function expandCube(cubeId: string, cube: IndustryCube) {
+  return Array.from({ length: cube.rows }, (_, row) => {
+    const item: Record<string, string | number> = { id: `${cubeId}_${row}` };
+    for (const dimension of cube.dimensions) {
+      item[dimension] = cube.values[dimension][cube.keys[dimension][row]];
+    }
+    for (const [measure, values] of Object.entries(cube.measures)) {
+      item[measure] = values[row];
+    }
+    return item;
+  });
+}
@@ -0,0 +1,78 @@
+// Static dataset snapshots published by scripts/publish_snapshots.py into public/snapshots.
+// The manifest is small and revalidated; snapshot files are content-hashed and cached immutably.
+
+export interface SnapshotEntry {
+  file: string;
+  url: string;
+  sha256: string;
+  bytes: number;
+  encodings: Record<string, string>;
+  encoded_bytes: Record<string, number>;
+}
+
+export interface SnapshotManifest {
+  version: string;
+  datasets: Record<string, SnapshotEntry>;
+}
+
+const SNAPSHOT_URL_PREFIX = '/snapshots';
+const MANIFEST_URL = `${SNAPSHOT_URL_PREFIX}/manifest.json`;
+
+let manifestPromise: Promise<SnapshotManifest> | null = null;
+
+// Load the manifest once per page session
+export function loadSnapshotManifest(): Promise<SnapshotManifest> {
+  if (!manifestPromise) {
+    manifestPromise = fetch(MANIFEST_URL, { cache: 'no-cache' })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`Failed to load snapshot manifest: ${response.status}`);
+        }
+        return response.json();
+      })
+      .catch(error => {
+        manifestPromise = null;
+        throw error;
+      });
+  }
+  return manifestPromise;
+}
+
+// Names of all published snapshots starting with prefix (e.g. 'industry-visualization/full_')
+export async function listSnapshots(prefix: string): Promise<string[]> {
+  const manifest = await loadSnapshotManifest();
+  return Object.keys(manifest.datasets).filter(name => name.startsWith(prefix)).sort();
+}
+
+// Precompressed variant to request. The .gz/.br files are served with Content-Encoding
+// (next.config.js, firebase.json), so the browser decompresses them transparently.
+// Browsers only accept brotli over HTTPS; gzip is accepted everywhere.
+function snapshotUrl(entry: SnapshotEntry): string {
+  const secure = typeof window === 'undefined' || window.location.protocol === 'https:';
+  for (const encoding of secure ? ['br', 'gz'] : ['gz']) {
+    const file = entry.encodings?.[encoding];
+    if (file) {
+      return `${SNAPSHOT_URL_PREFIX}/${file}`;
+    }
+  }
+  return entry.url;
+}
+
+// Load a dataset snapshot by name (e.g. 'anzsic', 'industry-visualization/full_2021')
+export async function loadSnapshot<T = unknown>(name: string): Promise<T> {
+  const manifest = await loadSnapshotManifest();
+  const entry = manifest.datasets[name];
+  if (!entry) {
+    throw new Error(`Unknown snapshot: ${name}`);
+  }
+
+  let response = await fetch(snapshotUrl(entry));
+  if (!response.ok && snapshotUrl(entry) !== entry.url) {
+    // Precompressed file missing: fall back to the plain JSON
+    response = await fetch(entry.url);
+  }
+  if (!response.ok) {
+    throw new Error(`Failed to load snapshot ${name}: ${response.status}`);
+  }
+  return response.json();
+}
@@ -7,6 +7,10 @@ from datetime import datetime
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+from firestore_purge import purge_collection
+from firestore_batch_writer import BatchWriter
+
 # 行业映射
 INDUSTRY_MAPPING = {
     # 农林渔业
@@ -356,16 +360,8 @@ def process_excel_data(file_path: str):
         process_history(history_df)
 
 def delete_collection(collection_ref):
-    """删除集合中的所有文档"""
-    docs = collection_ref.limit(500).stream()
-    deleted = 0
-    
-    for doc in docs:
-        doc.reference.delete()
-        deleted += 1
-        
-    if deleted >= 500:
-        delete_collection(collection_ref)
+    """删除集合中的所有文档（游标分页 + 批量删除，按分区并行）"""
+    return purge_collection(db, collection_ref.id)
 
 def clean_data(value):
     """清理数据值"""
@@ -431,29 +427,58 @@ def process_offices(df: pd.DataFrame):
             print(f"添加办公室: {office_data['city']} (ID: {office_id})")
 
 def process_services(df: pd.DataFrame):
-    """处理服务数据"""
+    """
+    处理服务数据
+
+    按companyId分组汇总服务标题，与服务文档在同一个批量写入过程中提交，
+    每个公司文档的services数组只写入一次。
+    公司文档不存在时update会使整个batch失败，所以先用一次get_all确认公司存在，只更新存在的公司。
+    """
     print("处理服务数据...")
     services_ref = db.collection('services')
+    companies_ref = db.collection('companies')
     
-    for _, row in df.iterrows():
-        service_data = {
-            'companyId': clean_data(row.get('companyId')),
-            'serviceId': clean_data(row.get('serviceId')),
-            'title': clean_data(row.get('title')),
-            'description': clean_data(row.get('description')),
-        }
+    columns = ['companyId', 'serviceId', 'title', 'description']
+    services = df.reindex(columns=columns).astype(object).apply(lambda column: column.map(clean_data))
+    
+    # 使用 serviceId 作为文档 ID，没有serviceId的行跳过
+    services = services.astype(object).where(services.notna(), None)
+    services = services[services['serviceId'].map(bool)]
+    
+    # 每个公司的服务标题，保持首次出现的顺序并去重（与ArrayUnion的结果一致）；没有标题的服务不进入数组
+    titled = services[services['title'].map(bool) & services['companyId'].map(bool)]
+    titles_by_company = titled.groupby('companyId', sort=False)['title'].agg(lambda titles: list(dict.fromkeys(titles)))
+    
+    # 只读取文档是否存在，不读取字段
+    company_refs = [companies_ref.document(company_id) for company_id in titles_by_company.index]
+    existing_companies = {snapshot.id for snapshot in db.get_all(company_refs, field_paths=[]) if snapshot.exists} if company_refs else set()
+    missing_companies = [company_id for company_id in titles_by_company.index if company_id not in existing_companies]
+    
+    updated_companies = 0
+    with BatchWriter(db) as writer:
+        for service_data in services.to_dict('records'):
+            writer.set(services_ref.document(service_data['serviceId']), service_data)
         
-        # 使用 serviceId 作为文档 ID
-        service_id = service_data['serviceId']
-        if service_id:
-            services_ref.document(service_id).set(service_data)
-            print(f"添加服务: {service_data['title']} (ID: {service_id})")
-            
-            # 更新公司的服务列表
-            company_ref = db.collection('companies').document(service_data['companyId'])
-            company_ref.update({
-                'services': firestore.ArrayUnion([service_data['title']])
+        # 更新公司的服务列表：每个公司一次写入
+        for company_id, titles in titles_by_company.items():
+            if company_id not in existing_companies:
+                continue
+            writer.update(companies_ref.document(company_id), {
+                'services': firestore.ArrayUnion(titles)
             })
+            updated_companies += 1
+    
+    print(f"添加服务: {len(services)} 条，更新公司服务列表: {updated_companies} 个公司")
+    if missing_companies:
+        print(f"警告: {len(missing_companies)} 个companyId没有对应的公司文档，未更新服务列表: {', '.join(missing_companies[:10])}")
+    if writer.failed_batches:
+        print(f"警告: {len(writer.failed_references)} 个写入失败")
+    
+    return {
+        'services': len(services),
+        'companies': updated_companies,
+        'missing_companies': len(missing_companies)
+    }
 
 def process_history(df: pd.DataFrame):
     """处理历史数据"""
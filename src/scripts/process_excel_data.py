@@ -2,9 +2,13 @@ import pandas as pd
 import firebase_admin
 from firebase_admin import credentials, firestore
 import os
+import sys
 from datetime import datetime
 import json
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+from firestore_batch_writer import BatchWriter
+
 def initialize_firebase():
     """初始化Firebase连接"""
     try:
@@ -29,7 +33,11 @@ def load_excel_data(file_path):
         print(f"读取Excel文件时出错: {str(e)}")
         return None
 
-def process_company_data(db, companies_df):
+def process_company_data(db, companies_df, writer):
+    """
+    处理公司数据，返回已写入的公司ID集合
+    """
+    company_ids = set()
     for _, row in companies_df.iterrows():
         try:
             company_id = str(row['companyId'])
@@ -60,96 +68,126 @@ def process_company_data(db, companies_df):
             }
             
             # 使用set而不是add，这样可以更新现有记录
-            db.collection('companies').document(company_id).set(company_data, merge=True)
-            print(f'成功处理公司数据: {company_id}')
+            writer.set(db.collection('companies').document(company_id), company_data, merge=True)
+            company_ids.add(company_id)
             
         except Exception as e:
             print(f'处理公司数据时出错 {company_id if "company_id" in locals() else "Unknown"}: {str(e)}')
             continue
+    
+    print(f'成功处理公司数据: {len(company_ids)} 条')
+    return company_ids
 
-def process_office_data(db, offices_df):
-    for _, row in offices_df.iterrows():
-        try:
-            company_id = str(row['companyId'])
-            office_id = str(row['officeId'])
-            
-            office_data = {
-                'officeId': office_id,
-                'companyId': company_id,
-                'state': str(row['state']) if pd.notna(row['state']) else '',
-                'city': str(row['city']) if pd.notna(row['city']) else '',
-                'address': str(row['address']) if pd.notna(row['address']) else '',
-                'postalCode': str(row['postalCode']) if pd.notna(row['postalCode']) else '',
-                'contactPerson': str(row['contactPerson']) if pd.notna(row['contactPerson']) else '',
-                'email': str(row['email']) if pd.notna(row['email']) else '',
-                'phone': str(row['phone']) if pd.notna(row['phone']) else '',
-                'isHeadquarter': bool(row['isHeadquarter']) if pd.notna(row['isHeadquarter']) else False,
-                'updated_at': firestore.SERVER_TIMESTAMP
-            }
-            
-            # 检查公司是否存在
-            company_ref = db.collection('companies').document(company_id)
-            if company_ref.get().exists:
-                db.collection('offices').document(office_id).set(office_data, merge=True)
-                print(f'成功处理办公室数据: {office_id}')
-            else:
-                print(f'警告: 找不到对应的公司ID {company_id} 的办公室记录')
-                
-        except Exception as e:
-            print(f'处理办公室数据时出错: {str(e)}')
-            continue
+def resolve_company_ids(db, company_ids, child_frames):
+    """
+    确定子表引用的公司ID中哪些存在
 
-def process_service_data(db, services_df):
-    for _, row in services_df.iterrows():
-        try:
-            company_id = str(row['companyId'])
-            service_id = str(row['serviceId'])
-            
-            service_data = {
-                'serviceId': service_id,
-                'companyId': company_id,
-                'title': str(row['title']) if pd.notna(row['title']) else '',
-                'description': str(row['description']) if pd.notna(row['description']) else '',
-                'updated_at': firestore.SERVER_TIMESTAMP
-            }
-            
-            # 检查公司是否存在
-            company_ref = db.collection('companies').document(company_id)
-            if company_ref.get().exists:
-                db.collection('services').document(service_id).set(service_data, merge=True)
-                print(f'成功处理服务数据: {service_id}')
-            else:
-                print(f'警告: 找不到对应的公司ID {company_id} 的服务记录')
-                
-        except Exception as e:
-            print(f'处理服务数据时出错: {str(e)}')
-            continue
+    Companies表中的公司ID直接视为存在；子表引用的其他公司ID去重后
+    用一次get_all批量读取，读取次数与子表行数无关。
 
-def process_history_data(db, history_df):
-    for _, row in history_df.iterrows():
+    返回:
+        (存在的公司ID集合, Firestore读取次数)
+    """
+    referenced = set()
+    for df in child_frames:
+        if 'companyId' in df.columns:
+            referenced.update(str(company_id) for company_id in df['companyId'].unique())
+    unknown = sorted(company_id for company_id in referenced - company_ids if company_id)
+    
+    existing = set(company_ids)
+    if unknown:
+        refs = [db.collection('companies').document(company_id) for company_id in unknown]
+        for snapshot in db.get_all(refs, field_paths=[]):
+            if snapshot.exists:
+                existing.add(snapshot.id)
+    return existing, len(unknown)
+
+def _load_child_rows(db, df, sheet, collection, id_field, build_data, company_ids, writer, rejected):
+    """
+    在内存中检查子表行对应的公司是否存在，有效行批量写入，无效行记录到rejected
+    """
+    written = 0
+    for index, row in df.iterrows():
+        company_id = str(row.get('companyId', ''))
+        record_id = str(row.get(id_field, ''))
         try:
-            company_id = str(row['companyId'])
-            history_id = str(row['historyId'])
+            if company_id not in company_ids:
+                rejected.append({
+                    'sheet': sheet,
+                    'row': index + 2,  # Excel行号（含表头）
+                    'id': record_id,
+                    'companyId': company_id,
+                    'reason': '找不到对应的公司ID'
+                })
+                continue
             
-            history_data = {
-                'historyId': history_id,
-                'companyId': company_id,
-                'year': int(row['year']) if pd.notna(row['year']) and row['year'] != '' else None,
-                'event': str(row['event']) if pd.notna(row['event']) else '',
-                'updated_at': firestore.SERVER_TIMESTAMP
-            }
+            writer.set(db.collection(collection).document(record_id), build_data(row, record_id, company_id), merge=True)
+            written += 1
             
-            # 检查公司是否存在
-            company_ref = db.collection('companies').document(company_id)
-            if company_ref.get().exists:
-                db.collection('history').document(history_id).set(history_data, merge=True)
-                print(f'成功处理历史数据: {history_id}')
-            else:
-                print(f'警告: 找不到对应的公司ID {company_id} 的历史记录')
-                
         except Exception as e:
-            print(f'处理历史数据时出错: {str(e)}')
+            rejected.append({
+                'sheet': sheet,
+                'row': index + 2,
+                'id': record_id,
+                'companyId': company_id,
+                'reason': f'处理出错: {str(e)}'
+            })
             continue
+    
+    print(f'成功处理{sheet}数据: {written} 条，拒绝 {len(df) - written} 条')
+    return written
+
+def build_office_data(row, office_id, company_id):
+    return {
+        'officeId': office_id,
+        'companyId': company_id,
+        'state': str(row['state']) if pd.notna(row['state']) else '',
+        'city': str(row['city']) if pd.notna(row['city']) else '',
+        'address': str(row['address']) if pd.notna(row['address']) else '',
+        'postalCode': str(row['postalCode']) if pd.notna(row['postalCode']) else '',
+        'contactPerson': str(row['contactPerson']) if pd.notna(row['contactPerson']) else '',
+        'email': str(row['email']) if pd.notna(row['email']) else '',
+        'phone': str(row['phone']) if pd.notna(row['phone']) else '',
+        'isHeadquarter': bool(row['isHeadquarter']) if pd.notna(row['isHeadquarter']) else False,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }
+
+def build_service_data(row, service_id, company_id):
+    return {
+        'serviceId': service_id,
+        'companyId': company_id,
+        'title': str(row['title']) if pd.notna(row['title']) else '',
+        'description': str(row['description']) if pd.notna(row['description']) else '',
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }
+
+def build_history_data(row, history_id, company_id):
+    return {
+        'historyId': history_id,
+        'companyId': company_id,
+        'year': int(row['year']) if pd.notna(row['year']) and row['year'] != '' else None,
+        'event': str(row['event']) if pd.notna(row['event']) else '',
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }
+
+def process_office_data(db, offices_df, company_ids, writer, rejected):
+    return _load_child_rows(db, offices_df, 'Offices', 'offices', 'officeId', build_office_data, company_ids, writer, rejected)
+
+def process_service_data(db, services_df, company_ids, writer, rejected):
+    return _load_child_rows(db, services_df, 'Services', 'services', 'serviceId', build_service_data, company_ids, writer, rejected)
+
+def process_history_data(db, history_df, company_ids, writer, rejected):
+    return _load_child_rows(db, history_df, 'History', 'history', 'historyId', build_history_data, company_ids, writer, rejected)
+
+def save_rejected_report(rejected):
+    """把被拒绝的子表行写入报告文件"""
+    if not rejected:
+        return None
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    report_path = f'rejected_rows_{timestamp}.csv'
+    pd.DataFrame(rejected, columns=['sheet', 'row', 'id', 'companyId', 'reason']).to_csv(
+        report_path, index=False, encoding='utf-8-sig')
+    return report_path
 
 def main():
     """主函数"""
@@ -167,20 +205,35 @@ def main():
         print("无法加载Excel数据，程序终止")
         return
     
-    # 按照依赖关系顺序处理数据
+    # 按照依赖关系顺序处理数据，所有写入都通过并发批量写入器
+    writer = BatchWriter(db)
+    rejected = []
+    
     print("\n1. 处理公司数据...")
-    process_company_data(db, data['companies'])
+    company_ids = process_company_data(db, data['companies'], writer)
+    
+    # 一次性确定所有子表引用的公司是否存在
+    child_frames = [data['offices'], data['services'], data['history']]
+    company_ids, reads = resolve_company_ids(db, company_ids, child_frames)
+    print(f"公司ID校验: Firestore读取 {reads} 次")
     
     print("\n2. 处理办公室数据...")
-    process_office_data(db, data['offices'])
+    process_office_data(db, data['offices'], company_ids, writer, rejected)
     
     print("\n3. 处理服务数据...")
-    process_service_data(db, data['services'])
+    process_service_data(db, data['services'], company_ids, writer, rejected)
     
     print("\n4. 处理历史数据...")
-    process_history_data(db, data['history'])
+    process_history_data(db, data['history'], company_ids, writer, rejected)
+    
+    writer.close()
+    writer.report()
+    
+    report_path = save_rejected_report(rejected)
+    if report_path:
+        print(f"\n警告: {len(rejected)} 条子表记录被拒绝，详见 {report_path}")
     
     print("\n数据处理完成!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
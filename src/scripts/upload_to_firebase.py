@@ -2,8 +2,12 @@ import pandas as pd
 import firebase_admin
 from firebase_admin import credentials, firestore
 import os
+import sys
 import uuid
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+from firestore_purge import purge_collections
+
 def init_firebase():
     """初始化Firebase Admin SDK"""
     cred = credentials.Certificate('firebase-admin-key.json')
@@ -64,17 +68,8 @@ def process_company_data(company_row):
 def delete_all_data(db):
     """删除所有现有数据"""
     print("正在删除现有数据...")
-    # 删除offices集合中的所有文档
-    offices_ref = db.collection('offices')
-    docs = offices_ref.stream()
-    for doc in docs:
-        doc.reference.delete()
-    
-    # 删除companies集合中的所有文档
-    companies_ref = db.collection('companies')
-    docs = companies_ref.stream()
-    for doc in docs:
-        doc.reference.delete()
+    # 删除offices和companies集合中的所有文档（批量删除，按分区并行）
+    purge_collections(db, ['offices', 'companies'])
     
     print("现有数据已删除！")
 
@@ -2,8 +2,13 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
 import json
+import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from firestore_batch_writer import BatchWriter
+
 # 示例数据结构 - 根据实际Excel内容调整
 sample_data = [
     {
@@ -104,23 +109,24 @@ def upload_to_firebase(data_records):
         
         print(f"Uploading {len(data_records)} records to Firebase...")
         
-        # Upload in batches
+        # Upload in batches, several batches in flight at once
         batch_size = 500
         total_batches = (len(data_records) + batch_size - 1) // batch_size
         
-        for batch_num in range(total_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, len(data_records))
-            batch_data = data_records[start_idx:end_idx]
-            
-            batch = db.batch()
-            
-            for record in batch_data:
+        writer = BatchWriter(
+            db,
+            batch_size=batch_size,
+            on_commit=lambda batch_number, count: print(f"Uploaded batch {batch_number}/{total_batches} ({count} records)")
+        )
+        with writer:
+            for record in data_records:
                 doc_ref = db.collection(collection_name).document(record['id'])
-                batch.set(doc_ref, record)
-            
-            batch.commit()
-            print(f"Uploaded batch {batch_num + 1}/{total_batches} ({len(batch_data)} records)")
+                writer.set(doc_ref, record)
+        writer.report()
+        
+        if writer.failed_batches:
+            print(f"❌ {len(writer.failed_batches)} batches failed to upload")
+            return False
         
         print("✅ Firebase upload completed successfully!")
         return True
@@ -2,6 +2,11 @@ import pandas as pd
 import firebase_admin
 from firebase_admin import credentials, firestore
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from firestore_batch_writer import BatchWriter
+from firestore_purge import purge_collection
 
 # 初始化Firebase
 cred = credentials.Certificate('firebase-admin-key.json')
@@ -20,13 +25,12 @@ df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
 services_ref = db.collection('services')
 # 批量删除所有旧文档
 print('正在清空原有services集合...')
-for doc in services_ref.stream():
-    doc.reference.delete()
+purge_collection(db, 'services')
 print('原有services集合已清空。')
 
-# 批量上传新数据
+# 批量上传新数据（Firestore批处理限制500，多个batch并发提交）
 print('正在上传新services数据...')
-batch = db.batch()
+writer = BatchWriter(db)
 count = 0
 for idx, row in df.iterrows():
     service_id = str(row.get('serviceId') or row.get('serviceID') or row.get('ServiceId') or row.get('ServiceID'))
@@ -34,12 +38,16 @@ for idx, row in df.iterrows():
         continue  # 跳过无效ID
     data = {k: (v if pd.notna(v) else None) for k, v in row.items() if not k.startswith('Unnamed')}
     doc_ref = services_ref.document(service_id)
-    batch.set(doc_ref, data)
+    writer.set(doc_ref, data)
     count += 1
-    # Firestore批处理限制500，分批提交
-    if count % 500 == 0:
-        batch.commit()
-        batch = db.batch()
-if count % 500 != 0:
-    batch.commit()
-print(f'上传完成，共上传{count}条服务数据。') 
\ No newline at end of file
+writer.close()
+writer.report()
+
+# services集合已被清空，写入失败的服务不会自动恢复，需要重新运行
+if writer.failed_batches:
+    for batch_number, _, error in writer.failed_batches:
+        print(f"Error uploading batch {batch_number}: {str(error)}")
+    print(f'上传未完成：已写入{writer.committed_writes}/{count}条，{len(writer.failed_references)}条写入失败，请重新运行。')
+    sys.exit(1)
+
+print(f'上传完成，共上传{writer.committed_writes}条服务数据。')